@@ -0,0 +1,227 @@
+# src/api/analysis.py
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Sequence
+
+import numpy as np
+
+from src.api.optimization import INGREDIENT_BOUNDS
+from src.features import ALL_FEATURES, BASE_FEATURES, derive_features
+
+"""
+Analyses de sensibilité du modèle, chacune évaluée en un seul appel batch au modèle.
+
+- Sensibilité locale (one-at-a-time) : autour d'un mélange donné, chaque feature de base varie seule
+  sur une grille, les autres restant fixes. Toutes les grilles sont empilées dans une même matrice.
+  Pour chaque feature : la courbe, la pente locale (régression linéaire sur la grille, robuste aux
+  modèles en escalier comme les arbres) et l'élasticité au point de référence.
+- Dépendance partielle globale : pour chaque valeur de la grille d'une feature, la prédiction moyenne
+  sur un jeu de référence dont cette feature est forcée à cette valeur. Ces courbes ne dépendent que
+  du modèle et des données de référence : elles sont calculées une fois par version de modèle
+  (empreinte de l'artefact) et mises en cache.
+
+Configuration (variables d'environnement) :
+- PD_REFERENCE_PATH : jeu de référence (jeu nettoyé par défaut ; CSV, Parquet ou Arrow).
+- PD_REFERENCE_ROWS : nombre maximal de lignes de référence échantillonnées (500 par défaut).
+- PD_SYNTHETIC_REFERENCE : 1 pour accepter, en l'absence du jeu de référence, des mélanges uniformes
+  synthétiques (0 par défaut : la dépendance partielle est alors indisponible, car ces mélanges combinent
+  des dosages physiquement impossibles et ne reflètent pas le modèle sur ses données).
+"""
+
+PD_REFERENCE_PATH = os.getenv("PD_REFERENCE_PATH", os.path.join("data", "processed", "concrete_data_clean.csv"))
+PD_REFERENCE_ROWS = int(os.getenv("PD_REFERENCE_ROWS", "500"))
+PD_SYNTHETIC_REFERENCE = os.getenv("PD_SYNTHETIC_REFERENCE", "0").lower() in ("1", "true", "yes")
+
+# Plages de variation de chaque feature de base
+FEATURE_BOUNDS = {**INGREDIENT_BOUNDS, "age": (1.0, 365.0)}
+
+# Nombre maximal de courbes de dépendance partielle conservées (une entrée par modèle et taille de grille)
+PD_CACHE_SIZE = 8
+
+
+class ReferenceUnavailableError(RuntimeError):
+    """
+    Jeu de référence de la dépendance partielle absent (et référence synthétique non autorisée).
+    """
+
+
+def local_sensitivity(
+    predict: Callable[[np.ndarray], np.ndarray],
+    mix: Sequence[float],
+    features: Sequence[str],
+    n_points: int = 21,
+    span: float = 0.2,
+) -> dict:
+    """
+    Sensibilités one-at-a-time autour d'un mélange, en un seul appel au modèle.
+
+    Args:
+        predict (Callable): Prédiction sur une matrice (n, 11) dans l'ordre ALL_FEATURES.
+        mix (list[float]): Les 8 features de base du mélange de référence.
+        features (list[str]): Features de base à faire varier.
+        n_points (int): Nombre de points de chaque grille.
+        span (float): Demi-largeur de la grille, en fraction de la plage de la feature (FEATURE_BOUNDS).
+
+    Returns:
+        dict: Prédiction de référence et, par feature, grille, prédictions, pente et élasticité.
+    """
+
+    base = np.asarray(mix, dtype=np.float64)[:len(BASE_FEATURES)]
+    columns = [BASE_FEATURES.index(name) for name in features]
+
+    grids = np.empty((len(features), n_points))
+    for k, (name, col) in enumerate(zip(features, columns)):
+        low, high = FEATURE_BOUNDS[name]
+        half_width = span * (high - low)
+        grids[k] = np.linspace(max(low, base[col] - half_width), min(high, base[col] + half_width), n_points)
+
+    # Une ligne pour le mélange de référence puis n_points lignes par feature, en une allocation
+    X = np.empty((1 + len(features) * n_points, len(ALL_FEATURES)))
+    X[:, :len(BASE_FEATURES)] = base
+    rows = X[1:].reshape(len(features), n_points, len(ALL_FEATURES))
+    rows[np.arange(len(features)), :, columns] = grids
+    derive_features(X)
+
+    predictions = np.asarray(predict(X), dtype=np.float64)
+    base_prediction = float(predictions[0])
+    curves = predictions[1:].reshape(len(features), n_points)
+
+    result = {}
+    for k, (name, col) in enumerate(zip(features, columns)):
+        grid, curve = grids[k], curves[k]
+        slope = float(np.polyfit(grid, curve, 1)[0]) if np.ptp(grid) > 0 else 0.0
+        elasticity = slope * base[col] / base_prediction if base_prediction and base[col] else None
+        result[name] = {
+            "values": np.round(grid, 3).tolist(),
+            "predicted_strengths_MPa": np.round(curve, 3).tolist(),
+            "slope_MPa_per_unit": round(slope, 5),
+            "elasticity": round(elasticity, 4) if elasticity is not None else None,
+        }
+    return {"base_prediction_MPa": round(base_prediction, 3), "sensitivities": result}
+
+
+def partial_dependence(
+    predict: Callable[[np.ndarray], np.ndarray],
+    reference: np.ndarray,
+    features: Sequence[str] = BASE_FEATURES,
+    n_points: int = 20,
+) -> Dict[str, dict]:
+    """
+    Courbes de dépendance partielle de plusieurs features, en un seul appel au modèle.
+
+    La grille de chaque feature suit les quantiles 5 %–95 % de la référence.
+
+    Args:
+        predict (Callable): Prédiction sur une matrice (n, 11) dans l'ordre ALL_FEATURES.
+        reference (np.ndarray): Matrice (n_ref, 8) des features de base de référence.
+        features (list[str]): Features dont calculer la courbe.
+        n_points (int): Nombre de points de chaque grille.
+
+    Returns:
+        dict: Par feature, grille et prédiction moyenne correspondante.
+    """
+
+    n_ref = reference.shape[0]
+    columns = [BASE_FEATURES.index(name) for name in features]
+    grids = np.quantile(reference[:, columns], np.linspace(0.05, 0.95, n_points), axis=0).T
+
+    # Bloc (feature, point de grille, ligne de référence) : la référence est recopiée puis une colonne forcée
+    X = np.empty((len(features) * n_points * n_ref, len(ALL_FEATURES)))
+    blocks = X.reshape(len(features), n_points, n_ref, len(ALL_FEATURES))
+    blocks[..., :len(BASE_FEATURES)] = reference
+    for k, col in enumerate(columns):
+        blocks[k, :, :, col] = grids[k][:, None]
+    derive_features(X)
+
+    means = np.asarray(predict(X), dtype=np.float64).reshape(len(features), n_points, n_ref).mean(axis=2)
+    return {
+        name: {
+            "values": np.round(grids[k], 3).tolist(),
+            "predicted_strengths_MPa": np.round(means[k], 3).tolist(),
+        }
+        for k, name in enumerate(features)
+    }
+
+
+def load_reference(path: str = PD_REFERENCE_PATH, max_rows: int = PD_REFERENCE_ROWS, seed: int = 0,
+                   allow_synthetic: bool = PD_SYNTHETIC_REFERENCE):
+    """
+    Charge les features de base de référence pour la dépendance partielle.
+
+    Returns:
+        tuple: (matrice (n_ref, 8), source) où source vaut le chemin du fichier ou 'synthetic'.
+
+    Raises:
+        ReferenceUnavailableError: Si le fichier est absent et que la référence synthétique n'est pas autorisée.
+    """
+
+    rng = np.random.default_rng(seed)
+    if os.path.exists(path):
+        from src.storage import read_table
+
+        reference = read_table(path, columns=BASE_FEATURES).dropna().to_numpy(dtype=np.float64)
+        if len(reference) > max_rows:
+            reference = reference[rng.choice(len(reference), max_rows, replace=False)]
+        return reference, path
+
+    if not allow_synthetic:
+        raise ReferenceUnavailableError(
+            f"Jeu de référence introuvable : {path} (PD_SYNTHETIC_REFERENCE=1 pour des mélanges synthétiques)."
+        )
+    # Sans données, sur demande explicite : mélanges uniformes dans les plages d'entraînement
+    low, high = np.array([FEATURE_BOUNDS[name] for name in BASE_FEATURES]).T
+    return low + rng.random((max_rows, len(BASE_FEATURES))) * (high - low), "synthetic"
+
+
+class PartialDependenceCache:
+    """
+    Cache des courbes de dépendance partielle, par empreinte de modèle et taille de grille.
+
+    Les courbes de toutes les features de base sont calculées ensemble (un seul appel au modèle)
+    à la première demande pour un modèle, puis servies depuis le cache.
+
+    Args:
+        max_entries (int): Nombre maximal d'entrées conservées (LRU).
+    """
+
+    def __init__(self, max_entries: int = PD_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._reference = None
+
+    def reference(self):
+        with self._lock:
+            if self._reference is None:
+                self._reference = load_reference()
+            return self._reference
+
+    def get(self, model_id: str, n_points: int, predict: Callable[[np.ndarray], np.ndarray]):
+        """
+        Retourne les courbes de toutes les features pour un modèle, en les calculant si nécessaire.
+
+        Returns:
+            tuple: (courbes par feature, source de la référence, nombre de lignes de référence, en cache ou non)
+        """
+
+        key = (model_id, n_points)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return (*entry, True)
+
+        reference, source = self.reference()
+        curves = partial_dependence(predict, reference, BASE_FEATURES, n_points)
+        with self._lock:
+            self._entries[key] = (curves, source, len(reference))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return curves, source, len(reference), False
+
+    def invalidate(self, model_id: Optional[str] = None):
+        with self._lock:
+            for key in [key for key in self._entries if model_id is None or key[0] == model_id]:
+                del self._entries[key]
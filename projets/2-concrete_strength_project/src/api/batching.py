@@ -0,0 +1,158 @@
+# src/api/batching.py
+
+import asyncio
+import os
+from typing import Awaitable, Callable, Hashable, List, Optional, Sequence
+
+"""
+Regroupement dynamique (micro-batching) des requêtes /predict concurrentes.
+
+Au lieu d'appeler `model.predict` une fois par requête sur un DataFrame d'une seule ligne,
+les requêtes arrivant presque en même temps sont retenues quelques millisecondes
+(ou jusqu'à ce que N lignes soient disponibles), puis évaluées en un seul appel vectorisé.
+Chaque appelant reçoit ensuite sa propre prédiction. Les lignes destinées à des versions de modèle
+différentes (groupes) ne sont jamais mélangées dans un même appel.
+
+Configuration (variables d'environnement) :
+- PREDICT_BATCHING : "1" pour activer le regroupement (désactivé par défaut).
+- PREDICT_BATCH_MAX_SIZE : nombre maximal de lignes par lot (64 par défaut).
+- PREDICT_BATCH_MAX_WAIT_MS : attente maximale avant l'envoi d'un lot incomplet (5 ms par défaut).
+"""
+
+BATCHING_ENABLED = os.getenv("PREDICT_BATCHING", "0").lower() in ("1", "true", "yes")
+BATCH_MAX_SIZE = int(os.getenv("PREDICT_BATCH_MAX_SIZE", "64"))
+BATCH_MAX_WAIT_MS = float(os.getenv("PREDICT_BATCH_MAX_WAIT_MS", "5"))
+
+
+class MicroBatcher:
+    """
+    Coalesce les prédictions unitaires concurrentes en lots vectorisés.
+
+    Args:
+        predict_fn (Callable): Coroutine recevant une liste de lignes (listes de floats) et le groupe
+                               de ces lignes, et retournant une séquence de prédictions de même longueur.
+        max_batch_size (int): Nombre maximal de lignes par appel au modèle.
+        max_wait_ms (float): Temps d'attente maximal (ms) après la première requête d'un lot.
+    """
+
+    def __init__(
+        self,
+        predict_fn: Callable[[List[List[float]], Hashable], Awaitable[Sequence[float]]],
+        max_batch_size: int = BATCH_MAX_SIZE,
+        max_wait_ms: float = BATCH_MAX_WAIT_MS,
+    ):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size doit être supérieur ou égal à 1.")
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max(max_wait_ms, 0.0) / 1000.0
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._flushes = set()
+
+    async def start(self):
+        """
+        Démarre la boucle de regroupement dans la boucle d'évènements courante.
+        """
+
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """
+        Arrête la boucle et fait échouer les requêtes encore en attente.
+        """
+
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        if self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
+
+        while self._queue is not None and not self._queue.empty():
+            _, _, future = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("Le service de prédiction est arrêté."))
+
+    async def submit(self, row: List[float], group: Hashable = None) -> float:
+        """
+        Ajoute une ligne au prochain lot et attend sa prédiction.
+
+        Args:
+            row (list[float]): Features d'un échantillon, dans l'ordre attendu par le modèle.
+            group (Hashable): Groupe de la ligne (ex. version du modèle) transmis à `predict_fn`.
+
+        Returns:
+            float: Prédiction correspondant à cette ligne.
+        """
+
+        if self._queue is None:
+            raise RuntimeError("Le micro-batcher n'est pas démarré.")
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((row, group, future))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+
+            while len(batch) < self.max_batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                    continue
+                except asyncio.QueueEmpty:
+                    pass
+
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            groups = {}
+            for row, group, future in batch:
+                groups.setdefault(group, []).append((row, future))
+
+            # Chaque lot est évalué en tâche de fond : la collecte du lot suivant continue pendant le calcul
+            for group, items in groups.items():
+                flush = asyncio.create_task(self._flush(items, group))
+                self._flushes.add(flush)
+                flush.add_done_callback(self._flushes.discard)
+
+    async def _flush(self, batch, group):
+        rows = [row for row, _ in batch]
+        try:
+            predictions = await self.predict_fn(rows, group)
+        except Exception as e:
+            if len(batch) == 1:
+                self._resolve(batch[0][1], error=e)
+                return
+            # Une ligne invalide ne doit pas faire échouer les autres appelants :
+            # on isole les erreurs en repassant le lot ligne par ligne.
+            for row, future in batch:
+                try:
+                    self._resolve(future, value=(await self.predict_fn([row], group))[0])
+                except Exception as row_error:
+                    self._resolve(future, error=row_error)
+            return
+
+        for (_, future), prediction in zip(batch, predictions):
+            self._resolve(future, value=prediction)
+
+    @staticmethod
+    def _resolve(future, value=None, error=None):
+        if future.done():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(float(value))
@@ -0,0 +1,151 @@
+# src/api/binary_io.py
+
+import importlib
+import io
+from typing import Dict, Sequence
+
+import numpy as np
+
+"""
+Décodage et encodage des charges utiles binaires colonnaires pour les prédictions en masse.
+
+Formats supportés (type MIME -> format) :
+- `application/x-npy` : matrice NumPy .npy (n_samples, 8 ou 11), colonnes dans l'ordre BASE_FEATURES
+  (les 3 features dérivées éventuelles sont ignorées et recalculées).
+- `application/vnd.apache.arrow.stream` / `application/vnd.apache.arrow.file` : table Arrow IPC
+  contenant au moins les colonnes BASE_FEATURES (nécessite `pyarrow`).
+- `application/msgpack` : dictionnaire {colonne: liste de nombres ou buffer binaire little-endian},
+  le type des buffers étant précisé par la clé optionnelle "dtype" ('<f4' par défaut) (nécessite `msgpack`).
+
+Les colonnes sont converties directement en tableaux NumPy, sans objet Python par ligne.
+La réponse reprend le format de la requête, avec la colonne `predicted_strengths_MPa` (float32).
+"""
+
+NPY_MEDIA_TYPE = "application/x-npy"
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+ARROW_FILE_MEDIA_TYPE = "application/vnd.apache.arrow.file"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+
+MEDIA_TYPES = {
+    NPY_MEDIA_TYPE: "npy",
+    "application/octet-stream": "npy",
+    ARROW_STREAM_MEDIA_TYPE: "arrow",
+    ARROW_FILE_MEDIA_TYPE: "arrow",
+    MSGPACK_MEDIA_TYPE: "msgpack",
+    "application/x-msgpack": "msgpack",
+}
+
+RESPONSE_MEDIA_TYPES = {
+    "npy": NPY_MEDIA_TYPE,
+    "arrow": ARROW_STREAM_MEDIA_TYPE,
+    "msgpack": MSGPACK_MEDIA_TYPE,
+}
+
+OUTPUT_COLUMN = "predicted_strengths_MPa"
+
+
+class UnsupportedFormatError(ValueError):
+    """
+    Format binaire inconnu ou dépendance optionnelle manquante.
+    """
+
+
+def payload_format(content_type: str) -> str:
+    """
+    Détermine le format binaire à partir de l'en-tête Content-Type.
+
+    Raises:
+        UnsupportedFormatError: Si le type MIME n'est pas supporté.
+    """
+
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    if media_type not in MEDIA_TYPES:
+        supported = ", ".join(sorted(set(MEDIA_TYPES) - {"application/octet-stream", "application/x-msgpack"}))
+        raise UnsupportedFormatError(f"Content-Type non supporté : '{media_type}' (attendu : {supported})")
+    return MEDIA_TYPES[media_type]
+
+
+def decode_columns(body: bytes, fmt: str, columns: Sequence[str]) -> Dict[str, np.ndarray]:
+    """
+    Décode une charge utile binaire en colonnes NumPy.
+
+    Args:
+        body (bytes): Corps de la requête.
+        fmt (str): 'npy', 'arrow' ou 'msgpack'.
+        columns (list[str]): Colonnes attendues (dans l'ordre des matrices .npy).
+
+    Returns:
+        dict[str, np.ndarray]: Tableau 1-D par colonne attendue.
+
+    Raises:
+        ValueError: Si la charge utile est invalide ou incomplète.
+    """
+
+    if fmt == "npy":
+        matrix = np.load(io.BytesIO(body), allow_pickle=False)
+        if matrix.ndim != 2 or matrix.shape[1] < len(columns):
+            raise ValueError(f"Matrice .npy de forme {matrix.shape} : au moins {len(columns)} colonnes attendues.")
+        return {name: matrix[:, i] for i, name in enumerate(columns)}
+
+    if fmt == "arrow":
+        ipc = _import_optional("pyarrow.ipc", "pyarrow")
+        reader = ipc.open_stream(body) if not body.startswith(b"ARROW1") else ipc.open_file(body)
+        table = reader.read_all()
+        _check_columns(table.column_names, columns)
+        return {name: table.column(name).to_numpy() for name in columns}
+
+    if fmt == "msgpack":
+        msgpack = _import_optional("msgpack", "msgpack")
+        payload = msgpack.unpackb(body, raw=False)
+        if not isinstance(payload, dict):
+            raise ValueError("La charge utile msgpack doit être un dictionnaire {colonne: valeurs}.")
+        _check_columns(payload.keys(), columns)
+        dtype = np.dtype(payload.get("dtype", "<f4"))
+        return {
+            name: np.frombuffer(payload[name], dtype=dtype) if isinstance(payload[name], bytes)
+            else np.asarray(payload[name], dtype=np.float64)
+            for name in columns
+        }
+
+    raise UnsupportedFormatError(f"Format binaire inconnu : {fmt}")
+
+
+def encode_predictions(predictions: np.ndarray, fmt: str) -> bytes:
+    """
+    Encode les prédictions dans le format binaire demandé (float32).
+    """
+
+    predictions = np.ascontiguousarray(predictions, dtype=np.float32)
+
+    if fmt == "npy":
+        buffer = io.BytesIO()
+        np.save(buffer, predictions, allow_pickle=False)
+        return buffer.getvalue()
+
+    if fmt == "arrow":
+        pa = _import_optional("pyarrow", "pyarrow")
+        ipc = _import_optional("pyarrow.ipc", "pyarrow")
+        table = pa.table({OUTPUT_COLUMN: predictions})
+        sink = pa.BufferOutputStream()
+        with ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+
+    if fmt == "msgpack":
+        msgpack = _import_optional("msgpack", "msgpack")
+        return msgpack.packb({OUTPUT_COLUMN: predictions.tobytes(), "dtype": "<f4"}, use_bin_type=True)
+
+    raise UnsupportedFormatError(f"Format binaire inconnu : {fmt}")
+
+
+def _check_columns(available, columns):
+    missing = [col for col in columns if col not in available]
+    if missing:
+        raise ValueError(f"Colonnes manquantes dans la charge utile : {', '.join(missing)}")
+
+
+def _import_optional(module: str, package: str):
+    try:
+        return importlib.import_module(module)
+    except ImportError:
+        raise UnsupportedFormatError(f"Format indisponible : le paquet '{package}' n'est pas installé.")
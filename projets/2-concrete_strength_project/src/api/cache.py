@@ -0,0 +1,172 @@
+# src/api/cache.py
+
+import os
+import threading
+from collections import OrderedDict
+from time import monotonic
+from typing import List, Optional
+
+import numpy as np
+
+"""
+Cache de prédictions en mémoire, placé devant le modèle.
+
+Les clients QC renvoient très souvent les mêmes formulations : la prédiction est mise en cache,
+indexée par l'empreinte de l'artefact du modèle et par le vecteur des 11 features quantifié
+à une précision configurable (deux mélanges qui ne diffèrent que sous cette précision partagent la même entrée).
+
+- Éviction LRU au-delà de PREDICTION_CACHE_SIZE entrées et expiration après PREDICTION_CACHE_TTL secondes.
+- Invalidation automatique lorsqu'un autre artefact de modèle est chargé : les clés incluent l'empreinte
+  du fichier, et les entrées d'une version déchargée sont purgées.
+- Statistiques : hits, misses, évictions, expirations.
+
+Configuration (variables d'environnement) :
+- PREDICTION_CACHE_SIZE : nombre maximal d'entrées (0 = cache désactivé, valeur par défaut).
+- PREDICTION_CACHE_TTL : durée de vie d'une entrée en secondes (0 = pas d'expiration ; 3600 par défaut).
+- PREDICTION_CACHE_PRECISION : pas de quantification des features (0.001 par défaut).
+"""
+
+PREDICTION_CACHE_SIZE = int(os.getenv("PREDICTION_CACHE_SIZE", "0"))
+PREDICTION_CACHE_TTL = float(os.getenv("PREDICTION_CACHE_TTL", "3600"))
+PREDICTION_CACHE_PRECISION = float(os.getenv("PREDICTION_CACHE_PRECISION", "0.001"))
+
+
+class PredictionCache:
+    """
+    Cache LRU + TTL de prédictions, indexé par vecteur de features quantifié.
+
+    Args:
+        max_size (int): Nombre maximal d'entrées ; 0 désactive le cache.
+        ttl (float): Durée de vie d'une entrée en secondes ; 0 pour ne jamais expirer.
+        precision (float): Pas de quantification appliqué à chaque feature.
+    """
+
+    def __init__(
+        self,
+        max_size: int = PREDICTION_CACHE_SIZE,
+        ttl: float = PREDICTION_CACHE_TTL,
+        precision: float = PREDICTION_CACHE_PRECISION,
+    ):
+        if precision <= 0:
+            raise ValueError("La précision de quantification doit être strictement positive.")
+        self.max_size = max(0, max_size)
+        self.ttl = max(0.0, ttl)
+        self.precision = precision
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    def invalidate(self, model_id: str):
+        """
+        Supprime toutes les entrées associées à un artefact de modèle.
+
+        Args:
+            model_id (str): Empreinte de l'artefact déchargé.
+        """
+
+        prefix = model_id.encode() + b":"
+        with self._lock:
+            stale = [key for key in self._entries if key.startswith(prefix)]
+            for key in stale:
+                del self._entries[key]
+            if stale:
+                self._invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def keys(self, model_id: str, X: np.ndarray) -> List[bytes]:
+        """
+        Calcule les clés de chaque ligne : empreinte du modèle + features quantifiées
+        (quantification vectorisée sur toute la matrice).
+        """
+
+        prefix = model_id.encode() + b":"
+        quantized = np.rint(np.asarray(X, dtype=np.float64) / self.precision).astype(np.int64)
+        return [prefix + row.tobytes() for row in quantized]
+
+    def lookup(self, model_id: str, X: np.ndarray):
+        """
+        Recherche les prédictions de chaque ligne de X pour un artefact de modèle donné.
+
+        Args:
+            model_id (str): Empreinte de l'artefact utilisé.
+            X (np.ndarray): Matrice (n_samples, n_features).
+
+        Returns:
+            tuple: (keys, predictions, miss) où `predictions` contient les valeurs en cache
+                   (NaN pour les absentes) et `miss` est le masque booléen des lignes à prédire.
+        """
+
+        n_rows = len(X)
+        predictions = np.full(n_rows, np.nan)
+        if not self.enabled:
+            return None, predictions, np.ones(n_rows, dtype=bool)
+
+        keys = self.keys(model_id, X)
+        miss = np.ones(n_rows, dtype=bool)
+        now = monotonic()
+        with self._lock:
+            for i, key in enumerate(keys):
+                entry = self._entries.get(key)
+                if entry is None:
+                    continue
+                value, expires_at = entry
+                if expires_at is not None and expires_at <= now:
+                    del self._entries[key]
+                    self._expirations += 1
+                    continue
+                self._entries.move_to_end(key)
+                predictions[i] = value
+                miss[i] = False
+            n_miss = int(miss.sum())
+            self._hits += n_rows - n_miss
+            self._misses += n_miss
+        return keys, predictions, miss
+
+    def store(self, keys: Optional[List[bytes]], miss: np.ndarray, values):
+        """
+        Enregistre les prédictions calculées pour les lignes absentes du cache.
+
+        Args:
+            keys (list[bytes] | None): Clés retournées par `lookup`.
+            miss (np.ndarray): Masque des lignes prédites.
+            values: Prédictions des lignes du masque, dans l'ordre.
+        """
+
+        if not self.enabled or keys is None:
+            return
+        expires_at = monotonic() + self.ttl if self.ttl > 0 else None
+        with self._lock:
+            for i, value in zip(np.flatnonzero(miss), values):
+                self._entries[keys[i]] = (float(value), expires_at)
+                self._entries.move_to_end(keys[i])
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "enabled": self.enabled,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_s": self.ttl,
+                "precision": self.precision,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "invalidations": self._invalidations,
+            }
@@ -0,0 +1,118 @@
+# src/api/compression.py
+
+import gzip
+import importlib
+import os
+from typing import BinaryIO, Optional
+
+"""
+Fichiers uploadés compressés (gzip, zstd) et compression optionnelle des réponses.
+
+Les exports CSV des centrales sont très compressibles : /predict-batch et /jobs acceptent des fichiers
+compressés, détectés par l'en-tête Content-Encoding (ou le Content-Type) de la part multipart, sinon
+par les octets magiques du fichier. La décompression se fait en flux, directement dans le lecteur CSV
+par blocs : le fichier décompressé n'est jamais entièrement en mémoire.
+
+zstd nécessite le paquet optionnel `zstandard`.
+
+Configuration (variables d'environnement) :
+- GZIP_MIN_SIZE : taille minimale (octets) des réponses compressées en gzip quand le client l'accepte
+  (0 = compression des réponses désactivée, valeur par défaut).
+"""
+
+GZIP_MIN_SIZE = int(os.getenv("GZIP_MIN_SIZE", "0"))
+
+MAGIC_BYTES = {
+    b"\x1f\x8b": "gzip",
+    b"\x28\xb5\x2f\xfd": "zstd",
+}
+
+CONTENT_ENCODINGS = {
+    "gzip": "gzip",
+    "x-gzip": "gzip",
+    "zstd": "zstd",
+    "identity": None,
+}
+
+CONTENT_TYPES = {
+    "application/gzip": "gzip",
+    "application/x-gzip": "gzip",
+    "application/zstd": "zstd",
+}
+
+
+class UnsupportedEncodingError(ValueError):
+    """
+    Encodage de contenu inconnu ou dépendance optionnelle manquante.
+    """
+
+
+def detect_encoding(head: bytes, content_encoding: Optional[str] = None, content_type: Optional[str] = None) -> Optional[str]:
+    """
+    Détermine la compression d'un fichier : en-tête Content-Encoding, puis Content-Type, puis octets magiques.
+
+    Args:
+        head (bytes): Premiers octets du fichier.
+        content_encoding (str, optionnel): En-tête Content-Encoding déclaré.
+        content_type (str, optionnel): En-tête Content-Type déclaré.
+
+    Returns:
+        str: 'gzip', 'zstd' ou None (non compressé).
+
+    Raises:
+        UnsupportedEncodingError: Si l'encodage déclaré n'est pas supporté.
+    """
+
+    if content_encoding:
+        encoding = content_encoding.split(",")[0].strip().lower()
+        if encoding not in CONTENT_ENCODINGS:
+            supported = ", ".join(name for name in CONTENT_ENCODINGS if name != "x-gzip")
+            raise UnsupportedEncodingError(f"Content-Encoding non supporté : '{encoding}' (attendu : {supported})")
+        return CONTENT_ENCODINGS[encoding]
+
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    if media_type in CONTENT_TYPES:
+        return CONTENT_TYPES[media_type]
+
+    for magic, encoding in MAGIC_BYTES.items():
+        if head.startswith(magic):
+            return encoding
+    return None
+
+
+def open_decompressed(fileobj: BinaryIO, encoding: Optional[str]) -> BinaryIO:
+    """
+    Enveloppe un fichier compressé dans un lecteur qui décompresse à la demande, bloc par bloc.
+
+    Args:
+        fileobj (BinaryIO): Fichier source (compressé ou non).
+        encoding (str, optionnel): 'gzip', 'zstd' ou None.
+
+    Returns:
+        BinaryIO: Flux des octets décompressés.
+    """
+
+    if encoding is None:
+        return fileobj
+    if encoding == "gzip":
+        return gzip.GzipFile(fileobj=fileobj, mode="rb")
+    if encoding == "zstd":
+        try:
+            zstandard = importlib.import_module("zstandard")
+        except ImportError:
+            raise UnsupportedEncodingError("Encodage indisponible : le paquet 'zstandard' n'est pas installé.")
+        return zstandard.ZstdDecompressor().stream_reader(fileobj, read_across_frames=True)
+    raise UnsupportedEncodingError(f"Encodage inconnu : {encoding}")
+
+
+def open_upload(fileobj: BinaryIO, content_encoding: Optional[str] = None, content_type: Optional[str] = None) -> BinaryIO:
+    """
+    Ouvre un fichier uploadé (déjà spoolé, donc repositionnable) en décompressant si nécessaire.
+
+    Returns:
+        BinaryIO: Flux des octets décompressés.
+    """
+
+    head = fileobj.read(max(len(magic) for magic in MAGIC_BYTES))
+    fileobj.seek(0)
+    return open_decompressed(fileobj, detect_encoding(head, content_encoding, content_type))
@@ -0,0 +1,184 @@
+# src/api/executor.py
+
+import asyncio
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+
+from src.api.model_loader import load_model_version
+
+"""
+Exécution de l'inférence (CPU-bound) en dehors de la boucle d'évènements.
+
+Trois modes, choisis via la variable d'environnement INFERENCE_EXECUTOR :
+- 'inline'  : appel direct de `model.predict` (comportement historique, par défaut).
+- 'thread'  : pool de threads ; XGBoost et NumPy relâchent le GIL pendant le calcul.
+- 'process' : pool de processus, chaque worker chargeant sa propre copie du modèle au démarrage
+                (puis, à la demande, les autres versions ciblées par les requêtes), depuis la copie figée
+                de l'artefact de chaque version (cf. registry), lisible jusqu'au retrait de la version.
+
+La taille du pool est fixée par INFERENCE_WORKERS (nombre de CPU par défaut).
+L'exécuteur expose sa profondeur de file d'attente pour faciliter son dimensionnement.
+"""
+
+EXECUTOR_MODES = ("inline", "thread", "process")
+
+INFERENCE_EXECUTOR = os.getenv("INFERENCE_EXECUTOR", "inline").lower()
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", str(os.cpu_count() or 1)))
+
+# Nombre maximal de versions de modèle conservées par processus worker (mode 'process')
+WORKER_MAX_MODELS = 2
+
+# Modèles chargés dans chaque processus worker, indexés par (copie figée, empreinte) ; la copie d'une
+# version n'est supprimée qu'après la fin des requêtes qui l'utilisent
+_worker_models = OrderedDict()
+
+
+def _worker_model(path, fingerprint):
+    key = (path, fingerprint)
+    model = _worker_models.get(key)
+    if model is None:
+        model = load_model_version(path, fingerprint)
+        _worker_models[key] = model
+        while len(_worker_models) > WORKER_MAX_MODELS:
+            _worker_models.popitem(last=False)
+    _worker_models.move_to_end(key)
+    return model
+
+
+def _init_worker(path=None, fingerprint=None):
+    if path is not None:
+        try:
+            _worker_model(path, fingerprint)
+        except (RuntimeError, OSError) as e:
+            # Version retirée avant le démarrage du worker : elle ne recevra plus de requêtes
+            print(f"Préchargement du modèle ignoré : {e}")
+
+
+def _worker_predict(path, fingerprint, X):
+    return _worker_model(path, fingerprint).predict(X)
+
+
+def _worker_ready():
+    return True
+
+
+class InferenceExecutor:
+    """
+    Exécuteur d'inférence configurable (inline, threads ou processus).
+
+    Les prédictions sont demandées pour une version de modèle (`ModelVersion` du registre) :
+    en modes 'inline' et 'thread' son modèle est utilisé directement, en mode 'process'
+    chaque worker charge la copie figée de l'artefact de cette version (chemin + empreinte) à la demande.
+
+    Args:
+        mode (str): 'inline', 'thread' ou 'process'.
+        workers (int): Taille du pool de threads ou de processus.
+    """
+
+    def __init__(self, mode: str = INFERENCE_EXECUTOR, workers: int = INFERENCE_WORKERS):
+        if mode not in EXECUTOR_MODES:
+            raise ValueError(f"Exécuteur d'inférence inconnu : {mode} (attendu : {', '.join(EXECUTOR_MODES)})")
+        self.mode = mode
+        self.workers = max(1, workers)
+        self._pool = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._completed = 0
+        self._failed = 0
+
+    def start(self, preload=None):
+        """
+        Crée le pool et, en mode 'process', précharge le modèle dans chaque worker.
+
+        Args:
+            preload (ModelVersion, optionnel): Version à précharger dans les workers de processus.
+        """
+
+        if self.mode == "thread":
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="inference")
+        elif self.mode == "process":
+            # 'spawn' évite d'hériter d'un état OpenMP/threads incohérent du processus parent
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(preload.artifact, preload.fingerprint) if preload is not None else (),
+            )
+            warmups = [self._pool.submit(_worker_ready) for _ in range(self.workers)]
+            for future in warmups:
+                future.result()
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+    def submit(self, entry, X) -> Future:
+        """
+        Soumet une prédiction et retourne un `concurrent.futures.Future` (utilisable depuis du code synchrone).
+
+        Args:
+            entry (ModelVersion): Version de modèle à utiliser.
+            X: Matrice de features au format attendu par le modèle.
+        """
+
+        self._track_start()
+        if self._pool is None:
+            future = Future()
+            try:
+                future.set_result(entry.model.predict(X))
+            except Exception as e:
+                future.set_exception(e)
+        elif self.mode == "process":
+            future = self._pool.submit(_worker_predict, entry.artifact, entry.fingerprint, X)
+        else:
+            future = self._pool.submit(entry.model.predict, X)
+        future.add_done_callback(self._track_done)
+        return future
+
+    def predict_sync(self, entry, X):
+        """
+        Prédiction bloquante (pour les générateurs exécutés hors de la boucle d'évènements).
+        """
+
+        return self.submit(entry, X).result()
+
+    async def predict(self, entry, X):
+        """
+        Prédiction asynchrone : la boucle d'évènements reste libre pendant le calcul.
+        """
+
+        return await asyncio.wrap_future(self.submit(entry, X))
+
+    def stats(self) -> dict:
+        """
+        Retourne l'état de l'exécuteur : mode, taille du pool, tâches en cours et en file d'attente.
+        """
+
+        with self._lock:
+            pending = self._pending
+            completed = self._completed
+            failed = self._failed
+        return {
+            "mode": self.mode,
+            "workers": self.workers if self.mode != "inline" else 0,
+            "in_flight": min(pending, self.workers),
+            "queue_depth": max(0, pending - self.workers),
+            "completed": completed,
+            "failed": failed,
+        }
+
+    def _track_start(self):
+        with self._lock:
+            self._pending += 1
+
+    def _track_done(self, future: Future):
+        with self._lock:
+            self._pending -= 1
+            if future.cancelled() or future.exception() is not None:
+                self._failed += 1
+            else:
+                self._completed += 1
@@ -0,0 +1,365 @@
+# src/api/jobs.py
+
+import json
+import os
+import queue
+import shutil
+import threading
+import uuid
+from time import time
+from typing import BinaryIO, Callable, Iterator, List, Optional
+
+"""
+Jobs de prédiction batch asynchrones, avec résultats sur disque.
+
+Les fichiers de plusieurs millions de lignes ne tiennent pas dans le délai d'une requête HTTP :
+le fichier soumis est recopié sur disque (spool) et un identifiant de job est renvoyé immédiatement.
+Des workers de fond lisent le fichier par blocs, prédisent chaque bloc et écrivent le résultat dans
+une part numérotée ; le client suit la progression puis récupère les parts concaténées en flux.
+
+Arborescence d'un job (JOBS_DIR/<id>/) :
+- input.csv : fichier soumis ;
+- job.json : état du job (statut, progression, paramètres), réécrit atomiquement après chaque bloc ;
+- parts/part-NNNNNN.<csv|ndjson> : résultats de chaque bloc, écrits atomiquement (fichier temporaire puis renommage).
+
+Reprise : au démarrage, les jobs en attente ou interrompus (statut 'queued' ou 'running') sont remis
+en file et reprennent après le dernier bloc terminé, sans recalculer les blocs déjà écrits. Les blocs
+déjà écrits sont relus par le parseur CSV et écartés (sans prédiction) : les lignes sont comptées comme
+des enregistrements et non comme des lignes physiques, ce qui reste exact avec des champs entre
+guillemets contenant des sauts de ligne ou des lignes vides.
+
+Progression : le nombre total de lignes est estimé au spool d'après les sauts de ligne, sans relire le
+fichier avec le parseur CSV (coûteux sur plusieurs millions de lignes, et bloquant pour la soumission).
+Cette estimation majore le nombre d'enregistrements (champs multilignes, lignes vides) : l'état du job
+l'indique (total_rows_estimated) et la progression reste inférieure à 1 tant que le job n'est pas terminé.
+À la fin du job, total_rows est remplacé par le nombre exact d'enregistrements prédits.
+
+Concurrence bornée : JOBS_WORKERS threads traitent les jobs un bloc à la fois, de sorte qu'au plus
+JOBS_WORKERS prédictions de bloc occupent l'exécuteur d'inférence en même temps que le trafic interactif.
+
+Configuration (variables d'environnement) :
+- JOBS_DIR : répertoire des jobs (data/jobs par défaut).
+- JOBS_WORKERS : nombre de workers de fond (1 par défaut).
+- JOBS_CHUNK_ROWS : nombre de lignes par bloc (50 000 par défaut).
+"""
+
+JOBS_DIR = os.getenv("JOBS_DIR", os.path.join("data", "jobs"))
+JOBS_WORKERS = int(os.getenv("JOBS_WORKERS", "1"))
+JOBS_CHUNK_ROWS = int(os.getenv("JOBS_CHUNK_ROWS", "50000"))
+
+JOB_STATUSES = ("queued", "running", "done", "failed")
+
+# Taille des blocs d'octets copiés lors du spool et de la restitution des résultats
+COPY_BUFFER_BYTES = 1 << 20
+
+
+class Job:
+    """
+    État d'un job de prédiction, persisté dans job.json.
+
+    Args:
+        job_id (str): Identifiant du job.
+        directory (str): Répertoire du job.
+        fmt (str): Format des résultats ('csv' ou 'ndjson').
+        chunk_size (int): Nombre de lignes par bloc.
+        model_version (str, optionnel): Version de modèle demandée (version active au traitement sinon).
+        total_rows (int, optionnel): Nombre de lignes de données du fichier soumis.
+        total_rows_estimated (bool): total_rows est une estimation (sauts de ligne comptés au spool)
+            et non le nombre d'enregistrements lus par le parseur CSV.
+    """
+
+    def __init__(
+        self,
+        job_id: str,
+        directory: str,
+        fmt: str,
+        chunk_size: int,
+        model_version: Optional[str] = None,
+        total_rows: Optional[int] = None,
+        total_rows_estimated: bool = True,
+    ):
+        self.job_id = job_id
+        self.directory = directory
+        self.fmt = fmt
+        self.chunk_size = chunk_size
+        self.model_version = model_version
+        self.total_rows = total_rows
+        self.total_rows_estimated = total_rows_estimated
+        self.status = "queued"
+        self.chunks_done = 0
+        self.rows_done = 0
+        self.error: Optional[str] = None
+        self.created_at = time()
+        self.updated_at = self.created_at
+
+    @property
+    def input_path(self) -> str:
+        return os.path.join(self.directory, "input.csv")
+
+    @property
+    def parts_dir(self) -> str:
+        return os.path.join(self.directory, "parts")
+
+    def part_path(self, index: int) -> str:
+        return os.path.join(self.parts_dir, f"part-{index:06d}.{self.fmt}")
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "format": self.fmt,
+            "chunk_size": self.chunk_size,
+            "model_version": self.model_version,
+            "total_rows": self.total_rows,
+            "total_rows_estimated": self.total_rows_estimated,
+            "rows_done": self.rows_done,
+            "chunks_done": self.chunks_done,
+            "error": self.error,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+        }
+
+    def describe(self) -> dict:
+        state = self.to_dict()
+        # Estimation majorante : plafonnée pour ne pas dépasser 1 avant la fin du job
+        state["progress"] = min(round(self.rows_done / self.total_rows, 4), 1.0) if self.total_rows else None
+        return state
+
+    def save(self):
+        """
+        Écrit job.json de manière atomique.
+        """
+
+        self.updated_at = time()
+        tmp_path = os.path.join(self.directory, "job.json.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(self.to_dict(), f)
+        os.replace(tmp_path, os.path.join(self.directory, "job.json"))
+
+    @classmethod
+    def load(cls, directory: str) -> "Job":
+        with open(os.path.join(directory, "job.json")) as f:
+            state = json.load(f)
+        job = cls(state["job_id"], directory, state["format"], state["chunk_size"],
+                  state.get("model_version"), state.get("total_rows"), state.get("total_rows_estimated", True))
+        job.status = state["status"]
+        job.chunks_done = state["chunks_done"]
+        job.rows_done = state["rows_done"]
+        job.error = state.get("error")
+        job.created_at = state["created_at"]
+        job.updated_at = state["updated_at"]
+        return job
+
+
+class JobManager:
+    """
+    File de jobs persistée sur disque, traitée par un nombre borné de workers.
+
+    Args:
+        process_chunk (Callable): Prédit et sérialise un bloc : (DataFrame, première ligne, job) -> texte.
+        jobs_dir (str): Répertoire des jobs.
+        workers (int): Nombre de workers de fond.
+    """
+
+    def __init__(
+        self,
+        process_chunk: Callable[..., str],
+        jobs_dir: str = JOBS_DIR,
+        workers: int = JOBS_WORKERS,
+    ):
+        self.process_chunk = process_chunk
+        self.jobs_dir = jobs_dir
+        self.workers = max(1, workers)
+        self._jobs = {}
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def start(self):
+        """
+        Recharge les jobs présents sur disque, remet en file ceux qui n'étaient pas terminés,
+        puis démarre les workers.
+        """
+
+        os.makedirs(self.jobs_dir, exist_ok=True)
+        resumed = []
+        for name in os.listdir(self.jobs_dir):
+            directory = os.path.join(self.jobs_dir, name)
+            if not os.path.exists(os.path.join(directory, "job.json")):
+                continue
+            try:
+                job = Job.load(directory)
+            except (OSError, ValueError, KeyError) as e:
+                print(f"Job illisible ignoré ({directory}) : {e}")
+                continue
+            with self._lock:
+                self._jobs[job.job_id] = job
+            if job.status in ("queued", "running"):
+                resumed.append(job)
+
+        # File neuve : les sentinelles d'arrêt d'un cycle précédent ne doivent pas arrêter les nouveaux workers
+        self._queue = queue.Queue()
+        for job in sorted(resumed, key=lambda job: job.created_at):
+            print(f"Reprise du job {job.job_id} au bloc {job.chunks_done} ({job.rows_done} lignes déjà prédites)")
+            self._queue.put(job.job_id)
+
+        self._stop.clear()
+        self._threads = [
+            threading.Thread(target=self._work, name=f"job-worker-{i}", daemon=True) for i in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        """
+        Arrête les workers à la fin de leur bloc en cours ; les jobs inachevés reprendront au prochain démarrage.
+        """
+
+        self._stop.set()
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def submit(self, source: BinaryIO, fmt: str, chunk_size: int = JOBS_CHUNK_ROWS, model_version: Optional[str] = None) -> Job:
+        """
+        Recopie le fichier soumis sur disque et met le job en file.
+
+        Args:
+            source (BinaryIO): Fichier CSV soumis.
+            fmt (str): Format des résultats ('csv' ou 'ndjson').
+            chunk_size (int): Nombre de lignes par bloc.
+            model_version (str, optionnel): Version de modèle demandée.
+
+        Returns:
+            Job: Le job créé, au statut 'queued'.
+        """
+
+        job_id = uuid.uuid4().hex
+        directory = os.path.join(self.jobs_dir, job_id)
+        job = Job(job_id, directory, fmt, chunk_size, model_version)
+        os.makedirs(job.parts_dir)
+        try:
+            job.total_rows = spool(source, job.input_path)
+            job.save()
+        except Exception:
+            shutil.rmtree(directory, ignore_errors=True)
+            raise
+
+        with self._lock:
+            self._jobs[job_id] = job
+        self._queue.put(job_id)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def delete(self, job_id: str):
+        """
+        Supprime un job terminé (ou en échec) et ses fichiers.
+
+        Raises:
+            LookupError: Si le job n'existe pas.
+            ValueError: Si le job est en attente ou en cours.
+        """
+
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                raise LookupError(f"Job inconnu : {job_id}")
+            if job.status in ("queued", "running"):
+                raise ValueError(f"Le job {job_id} est en cours ({job.status}).")
+            del self._jobs[job_id]
+        shutil.rmtree(job.directory, ignore_errors=True)
+
+    def iter_result(self, job: Job) -> Iterator[bytes]:
+        """
+        Générateur : résultats d'un job terminé, parts concaténées dans l'ordre, par blocs d'octets.
+        """
+
+        for index in range(job.chunks_done):
+            with open(job.part_path(index), "rb") as f:
+                while True:
+                    block = f.read(COPY_BUFFER_BYTES)
+                    if not block:
+                        break
+                    yield block
+
+    def stats(self) -> dict:
+        with self._lock:
+            counts = {status: 0 for status in JOB_STATUSES}
+            for job in self._jobs.values():
+                counts[job.status] += 1
+        return {"workers": self.workers, "queue_depth": self._queue.qsize(), "jobs": counts}
+
+    def _work(self):
+        while not self._stop.is_set():
+            job_id = self._queue.get()
+            if job_id is None:
+                break
+            job = self.get(job_id)
+            if job is None:
+                continue
+            try:
+                self._run(job)
+            except Exception as e:
+                job.status = "failed"
+                job.error = str(e)
+                job.save()
+                print(f"Échec du job {job.job_id} : {e}")
+
+    def _run(self, job: Job):
+        import pandas as pd
+
+        job.status = "running"
+        job.save()
+
+        # Reprise : les blocs déjà écrits sont relus et écartés ; sauter des lignes physiques (skiprows)
+        # décalerait les blocs en présence de sauts de ligne entre guillemets ou de lignes vides
+        chunks = pd.read_csv(job.input_path, chunksize=job.chunk_size)
+        for index, chunk in enumerate(chunks):
+            if index < job.chunks_done:
+                continue
+            if self._stop.is_set():
+                # Arrêt : le job reste 'running' et reprendra au prochain démarrage
+                return
+            text = self.process_chunk(chunk, job.rows_done, job)
+            part_path = job.part_path(job.chunks_done)
+            with open(part_path + ".tmp", "w") as f:
+                f.write(text)
+            os.replace(part_path + ".tmp", part_path)
+            job.chunks_done += 1
+            job.rows_done += len(chunk)
+            job.save()
+
+        job.status = "done"
+        job.total_rows = job.rows_done
+        job.total_rows_estimated = False
+        job.save()
+        print(f"Job {job.job_id} terminé : {job.rows_done} lignes en {job.chunks_done} blocs")
+
+
+def spool(source: BinaryIO, path: str) -> int:
+    """
+    Recopie un fichier CSV sur disque par blocs en estimant son nombre de lignes de données (en-tête exclu).
+
+    Returns:
+        int: Nombre de lignes physiques hors en-tête : majore le nombre d'enregistrements lorsque des
+        champs entre guillemets contiennent des sauts de ligne ou que le fichier contient des lignes vides.
+    """
+
+    newlines = 0
+    last = b""
+    with open(path, "wb") as out:
+        while True:
+            block = source.read(COPY_BUFFER_BYTES)
+            if not block:
+                break
+            out.write(block)
+            newlines += block.count(b"\n")
+            last = block[-1:]
+    lines = newlines + (1 if last and last != b"\n" else 0)
+    return max(lines - 1, 0)
@@ -1,101 +1,1081 @@
 # src/api/main.py
 
-from fastapi import FastAPI, File, HTTPException, UploadFile
-import pandas as pd
+import asyncio
+import json
+import os
+from contextlib import asynccontextmanager, nullcontext
+from time import perf_counter
+from typing import List, Literal, Optional
 
-from src.api.model_loader import load_model
-from src.api.schemas import PredictionInput, PredictionOutput, BatchPredictionOutput
+from fastapi import Depends, FastAPI, File, Header, HTTPException, Query, Request, Response, UploadFile
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+import numpy as np
 
-app = FastAPI(title="Concrete Strength Prediction API")
+from src.api.analysis import PartialDependenceCache, ReferenceUnavailableError, local_sensitivity
+from src.api.batching import BATCHING_ENABLED, MicroBatcher
+from src.api.binary_io import (
+    RESPONSE_MEDIA_TYPES,
+    UnsupportedFormatError,
+    decode_columns,
+    encode_predictions,
+    payload_format,
+)
+from src.api.cache import PredictionCache
+from src.api.compression import GZIP_MIN_SIZE, UnsupportedEncodingError, open_upload
+from src.api.executor import InferenceExecutor
+from src.api.jobs import JOBS_CHUNK_ROWS, JobManager
+from src.api.metrics import Metrics, MetricsMiddleware
+from src.api.model_loader import INFERENCE_ENGINE
+from src.api.registry import DEFAULT_MODEL_VERSION, ModelRegistry
+from src.api.neighbors import NEIGHBORS_REFRESH_INTERVAL, NeighborService
+from src.api.optimization import DEFAULT_COSTS, optimize_mix
+from src.api.prediction_log import PredictionLog
+from src.api.schemas import (
+    BatchPredictionOutput,
+    MixOptimizationInput,
+    MixOptimizationOutput,
+    PartialDependenceOutput,
+    PredictionInput,
+    PredictionOutput,
+    SensitivityInput,
+    SensitivityOutput,
+    SimilarMixesInput,
+    SimilarMixesOutput,
+    StrengthCurveInput,
+    StrengthCurveOutput,
+)
+from src.api.startup import API_LAZY_STARTUP, StartupState
+from src.features import ALL_FEATURES, BASE_FEATURES, assemble_features, build_age_grid, build_feature_matrix
 
-# Chargement du modéle au démarrage
-model = load_model()
+# Taille par défaut des blocs de lignes lus en mode streaming
+STREAM_CHUNK_ROWS = 10_000
 
-BASE_FEATURES = [
-    "cement", "slag", "fly_ash", "water",
-    "superplasticizer", "coarse_aggregate", "fine_aggregate", "age"
-]
+STREAM_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
 
-DERIVED_FEATURES = [
-    "water_cement_ratio",
-    "binder",
-    "fine_to_coarse_ratio"
-]
+# Première colonne de la ligne CSV signalant l'interruption d'un flux de prédictions
+STREAM_ERROR_MARKER = "#error"
 
-ALL_FEATURES = BASE_FEATURES + DERIVED_FEATURES
+# Mélange de référence utilisé pour chauffer chaque modèle avant sa mise en service
+WARMUP_ROWS = [[540.0, 0.0, 0.0, 162.0, 2.5, 1040.0, 676.0, 28.0, 0.3, 540.0, 0.65]]
+
+# Nombre maximal de couples mélange × âge par requête /strength-curve
+MAX_CURVE_POINTS = int(os.getenv("MAX_CURVE_POINTS", "1000000"))
+
+# pandas est importé par `import_heavy_modules` : au chargement du module, ou en arrière-plan si API_LAZY_STARTUP=1
+pd = None
+
+# Intervalle (s) de vérification de l'artefact actif sur disque pour rechargement à chaud (0 = désactivé)
+MODEL_WATCH_INTERVAL = float(os.getenv("MODEL_WATCH_INTERVAL", "0"))
+
+def to_model_input(rows):
+    """
+    Met en forme des lignes de features (ordonnées selon ALL_FEATURES) pour le moteur d'inférence :
+    matrice NumPy contiguë pour le moteur natif, DataFrame pour le pipeline sklearn.
+    """
+
+    if INFERENCE_ENGINE == "native":
+        return np.asarray(rows, dtype=np.float64)
+    return pd.DataFrame(rows, columns=ALL_FEATURES)
+
+def warmup_model(model):
+    """
+    Prédiction factice sur un mélange de référence, pour que la première vraie requête ne paie pas l'initialisation.
+    """
+
+    with startup.phase("warmup") if not startup.ready else nullcontext():
+        model.predict(to_model_input(WARMUP_ROWS))
+
+def import_heavy_modules():
+    """
+    Importe pandas et joblib ; sklearn et xgboost sont importés au désérialisage du modèle.
+    """
+
+    global pd
+    import joblib  # noqa: F401
+    import pandas
+
+    pd = pandas
+
+def load_active_model():
+    """
+    Imports lourds puis chargement (et chauffe) de la version active du modèle.
+    """
+
+    with startup.phase("imports"):
+        import_heavy_modules()
+    with startup.phase("model_load"):
+        registry.load(DEFAULT_MODEL_VERSION, activate=True)
+
+def build_neighbor_index():
+    with startup.phase("neighbors"):
+        neighbors.try_build()
+
+def start_executor():
+    with startup.phase("executor"):
+        executor.start(preload=registry.active)
+
+def complete_startup():
+    """
+    Séquence de démarrage exécutée en arrière-plan en mode paresseux.
+    """
+
+    load_active_model()
+    build_neighbor_index()
+    start_executor()
+    jobs.start()
+
+# Suivi du démarrage (phases chronométrées, readiness)
+startup = StartupState()
+
+# Cache de prédictions (PREDICTION_CACHE_SIZE > 0 pour l'activer), indexé par empreinte d'artefact
+cache = PredictionCache()
+
+# Temps par étape, latences et débits exposés sur /metrics (METRICS_ENABLED=0 pour désactiver)
+metrics = Metrics()
+
+# Registre des versions de modèle ; chargement de la version active au démarrage
+registry = ModelRegistry(warmup=warmup_model)
+registry.on_unload(lambda entry: cache.invalidate(entry.fingerprint))
+
+# Courbes de dépendance partielle, calculées une fois par version de modèle
+pd_cache = PartialDependenceCache()
+registry.on_unload(lambda entry: pd_cache.invalidate(entry.fingerprint))
+
+# Exécuteur d'inférence (INFERENCE_EXECUTOR = inline | thread | process)
+executor = InferenceExecutor()
+
+# Journal des prédictions dans PostgreSQL, écrit en différé (PREDICTION_LOG_ENABLED=1)
+prediction_log = PredictionLog()
+
+# Index des mélanges historiques (table concrete_strength ou CSV nettoyé) pour /similar-mixes
+neighbors = NeighborService()
+
+# Démarrage classique : modèle chargé avant que uvicorn ne réponde ; sinon dans le lifespan, en arrière-plan
+if not API_LAZY_STARTUP:
+    load_active_model()
+    build_neighbor_index()
+
+async def predict_rows(rows, entry):
+    """
+    Prédit un lot de lignes de features (déjà ordonnées selon ALL_FEATURES) en un seul appel au modèle.
+
+    Args:
+        rows: Lignes de features.
+        entry (ModelVersion): Version de modèle à utiliser.
+    """
+
+    return await executor.predict(entry, to_model_input(rows))
+
+async def predict_matrix(X, entry, endpoint):
+    """
+    Prédit une matrice de features (ordonnées selon ALL_FEATURES) en passant par le cache :
+    seules les lignes absentes du cache sont envoyées au modèle, en un seul appel.
+
+    Args:
+        X (np.ndarray): Matrice (n_samples, 11).
+        entry (ModelVersion): Version de modèle à utiliser.
+        endpoint (str): Endpoint appelant, pour les métriques de taille de lot.
+
+    Returns:
+        np.ndarray: Prédictions (float64).
+    """
+
+    keys, predictions, miss = cache.lookup(entry.fingerprint, X)
+    if miss.any():
+        metrics.observe_batch(endpoint, int(miss.sum()))
+        values = await executor.predict(entry, to_model_input(X if miss.all() else X[miss]))
+        predictions[miss] = values
+        cache.store(keys, miss, values)
+    return predictions
+
+def predict_matrix_sync(X, entry, endpoint):
+    """
+    Version bloquante de `predict_matrix`, pour le code exécuté hors de la boucle d'évènements.
+    """
+
+    keys, predictions, miss = cache.lookup(entry.fingerprint, X)
+    if miss.any():
+        metrics.observe_batch(endpoint, int(miss.sum()))
+        values = executor.predict_sync(entry, to_model_input(X if miss.all() else X[miss]))
+        predictions[miss] = values
+        cache.store(keys, miss, values)
+    return predictions
+
+def requested_model_version(
+    model_version: Optional[str] = Query(None, description="Version de modèle à utiliser (version active par défaut)."),
+    x_model_version: Optional[str] = Header(None, description="Version de modèle à utiliser (alternative au paramètre)."),
+) -> Optional[str]:
+    """
+    Dépendance FastAPI : version de modèle demandée par paramètre `model_version` ou en-tête `X-Model-Version`.
+    """
+
+    return model_version or x_model_version
+
+async def checkout_model(version):
+    """
+    Réserve la version demandée pour la durée d'une requête (à libérer avec `registry.release`).
+    Une version présente sur disque mais pas encore en mémoire est chargée à la demande.
+
+    Raises:
+        HTTPException: 404 si la version n'existe pas, 503 tant que le démarrage n'est pas terminé
+                       (modèle, exécuteur d'inférence et chauffe) ou s'il a échoué.
+    """
+
+    # Le modèle peut être actif avant le démarrage de l'exécuteur (mode paresseux) : sans ce contrôle,
+    # les premières requêtes seraient prédites directement sur la boucle d'évènements
+    if not startup.ready or registry.active is None:
+        detail = f"Échec du démarrage : {startup.error}" if startup.error else "Démarrage en cours."
+        raise HTTPException(status_code=503, detail=detail, headers={"Retry-After": "1"})
+
+    if version is not None and not registry.is_loaded(version):
+        try:
+            await asyncio.to_thread(registry.load, version)
+        except (FileNotFoundError, ValueError) as e:
+            raise HTTPException(status_code=404, detail=str(e))
+    try:
+        return registry.checkout(version)
+    except LookupError as e:
+        raise HTTPException(status_code=404 if version is not None else 503, detail=str(e))
+
+async def predict_micro_batch(rows, entry):
+    """
+    Prédit un lot formé par le micro-batcher (requêtes /predict regroupées).
+    """
+
+    metrics.observe_batch("/predict", len(rows))
+    return await predict_rows(rows, entry)
+
+# Regroupement optionnel des requêtes /predict concurrentes (PREDICT_BATCHING=1)
+batcher = MicroBatcher(predict_micro_batch) if BATCHING_ENABLED else None
+
+def observe_parsing(request, endpoint):
+    """
+    Mesure le temps écoulé entre l'arrivée de la requête et l'entrée dans l'endpoint
+    (lecture du corps, parsing multipart/JSON et validation).
+    """
+
+    started_at = getattr(request.state, "started_at", None)
+    if started_at is not None:
+        metrics.observe_stage(endpoint, "parse", perf_counter() - started_at)
+
+def open_uploaded_csv(file):
+    """
+    Ouvre un CSV uploadé, décompressé en flux s'il est compressé (gzip ou zstd).
+
+    Raises:
+        HTTPException: 415 si l'encodage déclaré n'est pas supporté.
+    """
+
+    try:
+        return open_upload(file.file, file.headers.get("content-encoding"), file.content_type)
+    except UnsupportedEncodingError as e:
+        raise HTTPException(status_code=415, detail=str(e))
+
+def check_base_columns(columns):
+    """
+    Vérifie la présence des colonnes de base nécessaires.
+
+    Raises:
+        HTTPException: Si des colonnes de base sont manquantes.
+    """
+
+    missing_cols = [col for col in BASE_FEATURES if col not in columns]
+    if missing_cols:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Colonnes manquantes dans le fichier uploadé : {', '.join(missing_cols)}"
+        )
+
+def prepare_batch(df):
+    """
+    Vérifie les colonnes de base et construit la matrice de features (dérivées calculées par le noyau commun).
+
+    Args:
+        df (pd.DataFrame): Données brutes contenant au moins BASE_FEATURES.
+
+    Returns:
+        np.ndarray: Matrice (n_samples, 11) prête pour le modèle, colonnes dans l'ordre ALL_FEATURES.
+
+    Raises:
+        HTTPException: Si des colonnes de base sont manquantes.
+    """
+
+    check_base_columns(df.columns)
+    return assemble_features({name: df[name].to_numpy(dtype=np.float64) for name in BASE_FEATURES})
+
+def format_chunk(predictions, first_row, fmt, header):
+    """
+    Sérialise les prédictions d'un bloc au format NDJSON ou CSV.
+
+    Args:
+        predictions (np.ndarray): Prédictions du bloc.
+        first_row (int): Indice (dans le fichier) de la première ligne du bloc.
+        fmt (str): 'ndjson' ou 'csv'.
+        header (bool): Ajouter la ligne d'en-tête (CSV, premier bloc uniquement).
+
+    Returns:
+        str: Texte du bloc, terminé par un saut de ligne.
+    """
+
+    out = pd.DataFrame({
+        "row": np.arange(first_row, first_row + len(predictions)),
+        "predicted_strength_MPa": np.round(np.asarray(predictions, dtype=np.float64), 3),
+    })
+    if fmt == "ndjson":
+        return out.to_json(orient="records", lines=True)
+    return out.to_csv(index=False, header=header)
+
+def format_stream_error(message, row, fmt):
+    """
+    Dernière ligne d'un flux interrompu par une erreur (cf. /predict-batch).
+
+    Args:
+        message (str): Description de l'erreur.
+        row (int): Indice de la première ligne sans prédiction.
+        fmt (str): 'ndjson' ou 'csv'.
+
+    Returns:
+        str: `{"error": ..., "row": ...}` en NDJSON, `#error,<row>,"<message>"` en CSV.
+    """
+
+    if fmt == "ndjson":
+        return json.dumps({"error": message, "row": row}, ensure_ascii=False) + "\n"
+    quoted = '"' + " ".join(message.split()).replace('"', '""') + '"'
+    return f"{STREAM_ERROR_MARKER},{row},{quoted}\n"
+
+def stream_predictions(chunks, first_chunk, fmt, entry):
+    """
+    Générateur : prédit et sérialise le fichier bloc par bloc, pendant que la lecture se poursuit.
+    La mémoire utilisée est bornée par la taille d'un bloc, indépendamment de la taille du fichier.
+    La version de modèle réservée est libérée à la fin du flux.
+
+    Le statut 200 étant déjà envoyé, une erreur sur un bloc suivant (ligne CSV invalide, valeur non
+    numérique, échec de l'inférence) termine le flux par une ligne d'erreur (cf. `format_stream_error`)
+    au lieu de le couper sans signal.
+    """
+
+    endpoint = "/predict-batch"
+    row = 0
+    try:
+        chunk = first_chunk
+        while chunk is not None:
+            with metrics.stage(endpoint, "features"):
+                X = prepare_batch(chunk)
+            with metrics.stage(endpoint, "predict"):
+                predictions = predict_matrix_sync(X, entry, endpoint)
+            prediction_log.log(endpoint, entry.version, X, predictions)
+            with metrics.stage(endpoint, "serialize"):
+                text = format_chunk(predictions, row, fmt, header=(row == 0))
+            metrics.count_rows(endpoint, len(chunk))
+            yield text
+            row += len(chunk)
+            with metrics.stage(endpoint, "read_csv"):
+                chunk = next(chunks, None)
+    except Exception as e:
+        message = e.detail if isinstance(e, HTTPException) else str(e)
+        print(f"Flux {endpoint} interrompu à la ligne {row} : {message}")
+        yield format_stream_error(message, row, fmt)
+    finally:
+        registry.release(entry)
+
+def process_job_chunk(chunk, first_row, job):
+    """
+    Prédit et sérialise un bloc d'un job batch asynchrone, avec la version de modèle fixée à la soumission.
+
+    Args:
+        chunk (pd.DataFrame): Bloc de lignes brutes.
+        first_row (int): Indice (dans le fichier) de la première ligne du bloc.
+        job (Job): Job traité.
+
+    Returns:
+        str: Résultats du bloc au format du job.
+    """
+
+    endpoint = "/jobs"
+    if not registry.is_loaded(job.model_version):
+        registry.load(job.model_version)
+    entry = registry.checkout(job.model_version)
+    try:
+        with metrics.stage(endpoint, "features"):
+            X = prepare_batch(chunk)
+        with metrics.stage(endpoint, "predict"):
+            predictions = predict_matrix_sync(X, entry, endpoint)
+        prediction_log.log(endpoint, entry.version, X, predictions)
+        with metrics.stage(endpoint, "serialize"):
+            text = format_chunk(predictions, first_row, job.fmt, header=(first_row == 0))
+        metrics.count_rows(endpoint, len(chunk))
+        return text
+    finally:
+        registry.release(entry)
+
+# Jobs batch asynchrones (JOBS_WORKERS workers de fond, résultats dans JOBS_DIR)
+jobs = JobManager(process_job_chunk)
+
+async def watch_models():
+    """
+    Tâche de fond : recharge à chaud la version active si son artefact change sur disque.
+    """
+
+    while True:
+        await asyncio.sleep(MODEL_WATCH_INTERVAL)
+        try:
+            await asyncio.to_thread(registry.reload_if_changed)
+        except Exception as e:
+            print(f"Erreur lors du rechargement du modèle : {e}")
+
+async def watch_neighbors():
+    """
+    Tâche de fond : met à jour l'index des mélanges historiques quand sa source change.
+    """
+
+    while True:
+        await asyncio.sleep(NEIGHBORS_REFRESH_INTERVAL)
+        try:
+            await asyncio.to_thread(neighbors.refresh)
+        except Exception as e:
+            neighbors.error = str(e)
+            print(f"Erreur lors de la mise à jour de l'index des mélanges historiques : {e}")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    prediction_log.start()
+    if API_LAZY_STARTUP:
+        startup.run_in_background(complete_startup)
+    else:
+        start_executor()
+        jobs.start()
+        startup.mark_ready()
+    if batcher is not None:
+        await batcher.start()
+    watcher = asyncio.create_task(watch_models()) if MODEL_WATCH_INTERVAL > 0 else None
+    neighbors_watcher = asyncio.create_task(watch_neighbors()) if NEIGHBORS_REFRESH_INTERVAL > 0 else None
+    yield
+    if watcher is not None:
+        watcher.cancel()
+    if neighbors_watcher is not None:
+        neighbors_watcher.cancel()
+    if batcher is not None:
+        await batcher.stop()
+    # Ne pas arrêter l'exécuteur pendant que le démarrage en arrière-plan le crée
+    await asyncio.to_thread(startup.wait, 60)
+    # Les jobs inachevés reprendront au prochain démarrage après leur dernier bloc terminé
+    await asyncio.to_thread(jobs.stop, 60)
+    executor.shutdown()
+    # Dernier vidage du journal des prédictions en attente
+    await asyncio.to_thread(prediction_log.stop, 10)
+
+app = FastAPI(title="Concrete Strength Prediction API", lifespan=lifespan)
+# Compression gzip des réponses volumineuses pour les clients qui l'acceptent (GZIP_MIN_SIZE > 0)
+if GZIP_MIN_SIZE > 0:
+    app.add_middleware(GZipMiddleware, minimum_size=GZIP_MIN_SIZE)
+if metrics.enabled:
+    app.add_middleware(MetricsMiddleware, metrics=metrics)
 
 @app.get("/")
 async def root():
     """
-    Endpoint racine pour vérifier que l'API est en ligne.
+    Endpoint racine pour vérifier que l'API est en ligne (liveness) ;
+    `ready` indique si le modèle est chargé et chauffé (voir aussi /ready).
+    """
+
+    return {"message": "Concrete Strength Prediction API est en ligne.", "ready": startup.ready}
+
+@app.get("/ready")
+async def ready():
+    """
+    Sonde de disponibilité (readiness) : 200 une fois le modèle chargé, chauffé et l'exécuteur démarré,
+    503 sinon. Inclut la décomposition du temps de démarrage.
     """
 
-    return {"message": "Concrete Strength Prediction API est en ligne."}
+    state = startup.describe()
+    return JSONResponse(state, status_code=200 if startup.ready else 503)
+
+@app.get("/stats")
+async def stats():
+    """
+    Statistiques d'exécution de l'inférence : exécuteur (tâches en cours, profondeur de file),
+    cache de prédictions (hits, misses, évictions), jobs batch (file, jobs par statut)
+    journal des prédictions (lignes en attente, écrites, rejetées) et index des mélanges historiques.
+    """
+
+    return {
+        "executor": executor.stats(),
+        "cache": cache.stats(),
+        "jobs": jobs.stats(),
+        "prediction_log": prediction_log.stats(),
+        "neighbors": neighbors.stats(),
+    }
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """
+    Métriques au format texte Prometheus : latences par endpoint, temps par étape
+    (parse, read_csv, features, predict, serialize...), tailles de lot, lignes prédites et erreurs,
+    ainsi que l'état de l'exécuteur, du cache et du journal des prédictions.
+    """
+
+    content = metrics.render({"executor": executor.stats(), "cache": cache.stats(), "prediction_log": prediction_log.stats()})
+    return PlainTextResponse(content, media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.get("/models")
+async def list_models():
+    """
+    Versions de modèle : version active, versions chargées (requêtes en cours) et artefacts disponibles.
+    """
+
+    return registry.describe()
+
+@app.post("/models/{version}/activate", status_code=202)
+async def activate_model(version: str):
+    """
+    Charge une version en arrière-plan, la chauffe, puis en fait la version active de manière atomique.
+    Les requêtes en cours terminent sur la version avec laquelle elles ont commencé.
+    """
+
+    try:
+        if not os.path.exists(registry.path_for(version)):
+            raise HTTPException(status_code=404, detail=f"Artefact introuvable pour la version : {version}")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    registry.load_in_background(version, activate=True)
+    return {"status": "loading", "version": version}
+
+@app.delete("/models/{version}")
+async def unload_model(version: str):
+    """
+    Décharge une version non active (effectif dès que ses requêtes en cours sont terminées).
+    """
+
+    try:
+        registry.unload(version)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {"status": "unloaded", "version": version}
 
 @app.post("/predict", response_model=PredictionOutput)
-async def predict(input_data: PredictionInput):
+async def predict(
+    input_data: PredictionInput,
+    request: Request,
+    response: Response,
+    model_version: Optional[str] = Depends(requested_model_version),
+):
     """
-    Prédiction unique à partir des features fournies.
+    Prédiction unique à partir des 8 features de base (les features dérivées sont calculées par l'API).
 
     Args:
         input_data (PredictionInput): Données d'entrée validées par Pydantic.
+        model_version (str, optionnel): Version de modèle demandée (version active par défaut).
 
     Returns:
         PredictionOutput: Résultat de la prédiction (résistance béton).
     """
 
+    endpoint = "/predict"
+    observe_parsing(request, endpoint)
+    entry = await checkout_model(model_version)
+    response.headers["X-Model-Version"] = entry.version
     try:
-        # Convertir les features dict en DataFrame ligne unique
-        df = pd.DataFrame([input_data.features], columns=ALL_FEATURES)
+        # Features dérivées toujours recalculées côté serveur
+        with metrics.stage(endpoint, "features"):
+            X = build_feature_matrix([input_data.features])
+        with metrics.stage(endpoint, "cache"):
+            keys, cached, miss = cache.lookup(entry.fingerprint, X)
 
-        # Prédiction
-        prediction = model.predict(df)[0]
+        if not miss[0]:
+            prediction = cached[0]
+        elif batcher is not None:
+            # Prédiction mutualisée avec les requêtes concurrentes sur la même version
+            with metrics.stage(endpoint, "predict"):
+                prediction = await batcher.submit(X[0], entry)
+            cache.store(keys, miss, [prediction])
+        else:
+            # Prédiction sur une ligne unique
+            metrics.observe_batch(endpoint, 1)
+            with metrics.stage(endpoint, "predict"):
+                prediction = (await predict_rows(X, entry))[0]
+            cache.store(keys, miss, [prediction])
+        metrics.count_rows(endpoint, 1)
+        prediction_log.log(endpoint, entry.version, X, [prediction])
 
         # Retour formatté, arrondi à 3 décimales
         return {"predicted_strength_MPa": f"{round(float(prediction), 3)}"}
 
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Erreur lors de la prédiction: {e}")
+    finally:
+        registry.release(entry)
 
 @app.post("/predict-batch", response_model=BatchPredictionOutput)
-async def predict_batch(file: UploadFile = File(...)):
+async def predict_batch(
+    request: Request,
+    file: UploadFile = File(...),
+    stream: Optional[Literal["ndjson", "csv"]] = Query(None, description="Renvoie les prédictions en flux (NDJSON ou CSV)."),
+    chunk_size: int = Query(STREAM_CHUNK_ROWS, ge=1, le=1_000_000, description="Nombre de lignes par bloc en mode streaming."),
+    model_version: Optional[str] = Depends(requested_model_version),
+):
     """
-    Prédiction batch à partir d'un fichier CSV uploadé.
+    Prédiction batch à partir d'un fichier CSV uploadé, éventuellement compressé (gzip ou zstd, détecté
+    par l'en-tête Content-Encoding de la part ou par les octets magiques) et décompressé en flux.
+
+    En mode streaming (`?stream=ndjson` ou `?stream=csv`), le fichier est lu et prédit par blocs de
+    `chunk_size` lignes, et chaque bloc de résultats est envoyé au client dès qu'il est prêt.
+    Une erreur sur le premier bloc renvoie une erreur 400 ; sur un bloc suivant, le flux (statut 200 déjà
+    envoyé) se termine par une ligne d'erreur que le client doit tester :
+    - NDJSON : objet `{"error": "<message>", "row": <première ligne sans prédiction>}` ;
+    - CSV : ligne `#error,<première ligne sans prédiction>,"<message>"`.
 
     Args:
         file (UploadFile): Fichier CSV contenant les features de plusieurs échantillons.
+        stream (str, optionnel): Format de sortie en flux ('ndjson' ou 'csv').
+        chunk_size (int): Nombre de lignes lues et prédites à la fois en mode streaming.
+        model_version (str, optionnel): Version de modèle demandée (version active par défaut).
 
     Returns:
-        BatchPredictionOutput: Liste des prédictions.
+        BatchPredictionOutput: Liste des prédictions (ou StreamingResponse en mode streaming).
     """
 
+    endpoint = "/predict-batch"
+    observe_parsing(request, endpoint)
+    source = open_uploaded_csv(file)
+    entry = await checkout_model(model_version)
+
+    if stream is not None:
+        try:
+            chunks = pd.read_csv(source, chunksize=chunk_size)
+            # Le premier bloc est lu avant d'ouvrir le flux pour pouvoir renvoyer une erreur 400 propre
+            with metrics.stage(endpoint, "read_csv"):
+                first_chunk = next(chunks, None)
+            if first_chunk is None:
+                raise pd.errors.EmptyDataError
+            check_base_columns(first_chunk.columns)
+        except Exception as e:
+            registry.release(entry)
+            if isinstance(e, pd.errors.EmptyDataError):
+                raise HTTPException(status_code=400, detail="Le fichier uploadé est vide ou invalide.")
+            if isinstance(e, HTTPException):
+                raise
+            raise HTTPException(status_code=400, detail=f"Erreur lors de la prédiction batch : {e}")
+
+        # La version réservée est libérée par le générateur à la fin du flux
+        return StreamingResponse(
+            stream_predictions(chunks, first_chunk, stream, entry),
+            media_type=STREAM_MEDIA_TYPES[stream],
+            headers={"X-Model-Version": entry.version},
+        )
+
     try:
         # Lire le CSV uploadé en DataFrame
-        df = pd.read_csv(file.file)
-
-        # Vérifier la présence des colonnes de base nécessaires
-        missing_cols = [col for col in BASE_FEATURES if col not in df.columns]
-        if missing_cols:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Colonnes manquantes dans le fichier uploadé : {', '.join(missing_cols)}"
-            )
-
-        # Calculer les features dérivées
-        df["water_cement_ratio"] = df["water"] / df["cement"]
-        df["binder"] = df["cement"] + df["slag"] + df["fly_ash"]
-        df["fine_to_coarse_ratio"] = df["fine_aggregate"] / df["coarse_aggregate"]
+        with metrics.stage(endpoint, "read_csv"):
+            df = pd.read_csv(source)
 
-        # Réorganiser les colonnes dans l'ordre attendu par le modèle
-        df_final = df[ALL_FEATURES]
+        # Vérifier les colonnes et construire la matrice de features dans l'ordre du modèle
+        with metrics.stage(endpoint, "features"):
+            X = prepare_batch(df)
 
         # Faire la prédiction batch
-        predictions = model.predict(df_final)
-        preds = [float(round(p, 3)) for p in predictions]
+        with metrics.stage(endpoint, "predict"):
+            predictions = await predict_matrix(X, entry, endpoint)
+        prediction_log.log(endpoint, entry.version, X, predictions)
 
-        return {"predicted_strengths_MPa": preds}
+        # Sérialisation JSON mesurée ici plutôt que laissée à FastAPI après le retour de l'endpoint
+        with metrics.stage(endpoint, "serialize"):
+            preds = [float(round(p, 3)) for p in predictions]
+            content = JSONResponse({"predicted_strengths_MPa": preds}, headers={"X-Model-Version": entry.version})
+        metrics.count_rows(endpoint, len(preds))
+        return content
 
     except pd.errors.EmptyDataError:
         raise HTTPException(status_code=400, detail="Le fichier uploadé est vide ou invalide.")
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Erreur lors de la prédiction batch : {e}")
+    finally:
+        registry.release(entry)
+
+@app.post("/jobs", status_code=202)
+async def submit_job(
+    request: Request,
+    file: UploadFile = File(...),
+    fmt: Literal["csv", "ndjson"] = Query("csv", alias="format", description="Format des résultats."),
+    chunk_size: int = Query(JOBS_CHUNK_ROWS, ge=1, le=1_000_000, description="Nombre de lignes par bloc."),
+    model_version: Optional[str] = Depends(requested_model_version),
+):
+    """
+    Soumet un fichier CSV volumineux (éventuellement compressé en gzip ou zstd) pour une prédiction batch asynchrone.
+
+    Le fichier est décompressé en flux et recopié sur disque et un identifiant de job est renvoyé immédiatement ; des workers
+    de fond le prédisent par blocs. Suivre la progression avec GET /jobs/{job_id} et récupérer les
+    résultats avec GET /jobs/{job_id}/result. La version de modèle (active par défaut) est fixée à la soumission.
+
+    Args:
+        file (UploadFile): Fichier CSV contenant au moins les colonnes BASE_FEATURES.
+        fmt (str): Format des résultats ('csv' ou 'ndjson').
+        chunk_size (int): Nombre de lignes lues et prédites à la fois.
+        model_version (str, optionnel): Version de modèle demandée (version active par défaut).
+
+    Returns:
+        dict: Identifiant et état du job.
+    """
+
+    observe_parsing(request, "/jobs")
+    entry = await checkout_model(model_version)
+    registry.release(entry)
+    try:
+        columns = pd.read_csv(open_uploaded_csv(file), nrows=0).columns
+    except HTTPException:
+        raise
+    except Exception:
+        raise HTTPException(status_code=400, detail="Le fichier uploadé est vide ou invalide.")
+    check_base_columns(columns)
+    file.file.seek(0)
+
+    job = await asyncio.to_thread(jobs.submit, open_uploaded_csv(file), fmt, chunk_size, entry.version)
+    return job.describe()
+
+def get_job(job_id):
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job inconnu : {job_id}")
+    return job
+
+@app.get("/jobs/{job_id}")
+async def job_status(job_id: str):
+    """
+    État d'un job : statut, lignes prédites, progression et éventuelle erreur.
+
+    Tant que le job n'est pas terminé, total_rows est une estimation majorante (total_rows_estimated) ;
+    il devient le nombre exact d'enregistrements prédits une fois le job terminé.
+    """
+
+    return get_job(job_id).describe()
+
+@app.get("/jobs/{job_id}/result")
+async def job_result(job_id: str):
+    """
+    Résultats d'un job terminé, renvoyés en flux (parts concaténées dans l'ordre des lignes).
+
+    Raises:
+        HTTPException: 404 si le job est inconnu, 409 s'il n'est pas terminé.
+    """
+
+    job = get_job(job_id)
+    if job.status != "done":
+        detail = f"Job en échec : {job.error}" if job.status == "failed" else f"Job non terminé ({job.status})."
+        raise HTTPException(status_code=409, detail=detail)
+    return StreamingResponse(
+        jobs.iter_result(job),
+        media_type=STREAM_MEDIA_TYPES[job.fmt],
+        headers={"X-Model-Version": job.model_version},
+    )
+
+@app.delete("/jobs/{job_id}")
+async def delete_job(job_id: str):
+    """
+    Supprime un job terminé ou en échec et ses fichiers.
+    """
+
+    try:
+        jobs.delete(job_id)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {"status": "deleted", "job_id": job_id}
+
+@app.post("/predict-batch-binary")
+async def predict_batch_binary(
+    request: Request,
+    model_version: Optional[str] = Depends(requested_model_version),
+):
+    """
+    Prédiction batch à partir d'une charge utile binaire colonnaire (Arrow IPC, .npy ou msgpack).
+
+    Destiné aux échanges de service à service sur de gros volumes : pas d'analyse de texte en entrée,
+    ni de liste JSON en sortie. Les colonnes sont assemblées en une matrice contiguë transmise
+    directement au modèle (sans passer par le cache ligne à ligne), et la réponse reprend le format
+    de la requête avec la colonne `predicted_strengths_MPa` (float32), comme BatchPredictionOutput.
+
+    Returns:
+        Response: Prédictions encodées dans le format de la requête.
+    """
+
+    endpoint = "/predict-batch-binary"
+    try:
+        fmt = payload_format(request.headers.get("content-type"))
+    except UnsupportedFormatError as e:
+        raise HTTPException(status_code=415, detail=str(e))
+
+    body = await request.body()
+    observe_parsing(request, endpoint)
+    entry = await checkout_model(model_version)
+    try:
+        with metrics.stage(endpoint, "decode"):
+            columns = await asyncio.to_thread(decode_columns, body, fmt, BASE_FEATURES)
+        with metrics.stage(endpoint, "features"):
+            X = assemble_features(columns)
+        metrics.observe_batch(endpoint, len(X))
+        with metrics.stage(endpoint, "predict"):
+            predictions = await executor.predict(entry, to_model_input(X))
+        prediction_log.log(endpoint, entry.version, X, predictions)
+        with metrics.stage(endpoint, "serialize"):
+            content = await asyncio.to_thread(encode_predictions, predictions, fmt)
+        metrics.count_rows(endpoint, len(X))
+    except UnsupportedFormatError as e:
+        raise HTTPException(status_code=415, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Erreur lors de la prédiction batch binaire : {e}")
+    finally:
+        registry.release(entry)
+
+    return Response(content, media_type=RESPONSE_MEDIA_TYPES[fmt], headers={"X-Model-Version": entry.version})
+
+@app.post("/optimize-mix", response_model=MixOptimizationOutput)
+async def optimize_mix_design(
+    params: MixOptimizationInput,
+    request: Request,
+    response: Response,
+    model_version: Optional[str] = Depends(requested_model_version),
+):
+    """
+    Formulation inverse : recherche les mélanges les moins chers atteignant une résistance cible à un âge donné.
+
+    Évolution différentielle vectorisée sous budget de temps : chaque génération est prédite en un seul
+    appel au modèle, avec les features dérivées calculées comme pour /predict-batch.
+
+    Args:
+        params (MixOptimizationInput): Cible, âge, bornes, coûts et paramètres de recherche.
+        model_version (str, optionnel): Version de modèle demandée (version active par défaut).
+
+    Returns:
+        MixOptimizationOutput: Front de Pareto coût / résistance et meilleur mélange conforme.
+    """
+
+    endpoint = "/optimize-mix"
+    observe_parsing(request, endpoint)
+    entry = await checkout_model(model_version)
+    response.headers["X-Model-Version"] = entry.version
+
+    def predict(X):
+        metrics.observe_batch(endpoint, len(X))
+        return executor.predict_sync(entry, to_model_input(X))
+
+    try:
+        with metrics.stage(endpoint, "optimize"):
+            # Recherche exécutée hors de la boucle d'évènements
+            result = await asyncio.to_thread(
+                optimize_mix,
+                predict,
+                params.target_strength_MPa,
+                params.age,
+                {name: tuple(limits) for name, limits in params.bounds.items()},
+                params.costs if params.costs is not None else DEFAULT_COSTS,
+                population=params.population,
+                time_budget=params.time_budget_s,
+                max_generations=params.max_generations,
+                max_pareto=params.max_pareto,
+                seed=params.seed,
+            )
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Erreur lors de la recherche de formulation : {e}")
+    finally:
+        registry.release(entry)
+
+    metrics.count_rows(endpoint, result["evaluations"])
+    return result
+
+@app.post("/strength-curve", response_model=StrengthCurveOutput)
+async def strength_curve(
+    params: StrengthCurveInput,
+    request: Request,
+    model_version: Optional[str] = Depends(requested_model_version),
+):
+    """
+    Courbes de montée en résistance : prédit chaque mélange à chaque âge de la grille.
+
+    La matrice mélange × âge est construite en une seule allocation et prédite en un seul appel
+    au modèle ; la réponse est colonnaire (une ligne de prédictions par mélange, alignée sur `ages`).
+
+    Args:
+        params (StrengthCurveInput): Mélanges et grille d'âges.
+        model_version (str, optionnel): Version de modèle demandée (version active par défaut).
+
+    Returns:
+        StrengthCurveOutput: Grille d'âges et prédictions (n_mixes × n_ages).
+    """
+
+    endpoint = "/strength-curve"
+    observe_parsing(request, endpoint)
+    n_points = len(params.mixes) * len(params.ages)
+    if n_points > MAX_CURVE_POINTS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"{n_points} couples mélange × âge demandés (maximum : {MAX_CURVE_POINTS}).",
+        )
+
+    entry = await checkout_model(model_version)
+    try:
+        with metrics.stage(endpoint, "features"):
+            X = build_age_grid(params.mixes, params.ages)
+        metrics.observe_batch(endpoint, len(X))
+        with metrics.stage(endpoint, "predict"):
+            predictions = await executor.predict(entry, to_model_input(X))
+        with metrics.stage(endpoint, "serialize"):
+            curves = np.round(np.asarray(predictions, dtype=np.float64), 3).reshape(len(params.mixes), len(params.ages))
+            content = JSONResponse(
+                {"ages": params.ages, "predicted_strengths_MPa": curves.tolist()},
+                headers={"X-Model-Version": entry.version},
+            )
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Erreur lors du calcul des courbes de résistance : {e}")
+    finally:
+        registry.release(entry)
+
+    metrics.count_rows(endpoint, n_points)
+    return content
+
+@app.post("/sensitivity", response_model=SensitivityOutput)
+async def sensitivity(
+    params: SensitivityInput,
+    request: Request,
+    model_version: Optional[str] = Depends(requested_model_version),
+):
+    """
+    Sensibilité locale one-at-a-time : fait varier chaque feature de base seule autour d'un mélange.
+
+    Toutes les grilles sont empilées dans une seule matrice, prédite en un seul appel au modèle.
+
+    Args:
+        params (SensitivityInput): Mélange de référence, features à faire varier et grille.
+        model_version (str, optionnel): Version de modèle demandée (version active par défaut).
+
+    Returns:
+        SensitivityOutput: Prédiction de référence et, par feature, courbe, pente et élasticité.
+    """
+
+    endpoint = "/sensitivity"
+    observe_parsing(request, endpoint)
+    vary = params.vary or BASE_FEATURES
+    entry = await checkout_model(model_version)
+
+    def predict(X):
+        metrics.observe_batch(endpoint, len(X))
+        return executor.predict_sync(entry, to_model_input(X))
+
+    try:
+        with metrics.stage(endpoint, "predict"):
+            result = await asyncio.to_thread(
+                local_sensitivity, predict, params.features, vary, params.n_points, params.span
+            )
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Erreur lors de l'analyse de sensibilité : {e}")
+    finally:
+        registry.release(entry)
+
+    metrics.count_rows(endpoint, 1 + len(vary) * params.n_points)
+    return JSONResponse(result, headers={"X-Model-Version": entry.version})
+
+@app.get("/partial-dependence", response_model=PartialDependenceOutput)
+async def partial_dependence_curves(
+    request: Request,
+    features: Optional[List[str]] = Query(None, description="Features de base (toutes par défaut)."),
+    n_points: int = Query(20, ge=2, le=100),
+    model_version: Optional[str] = Depends(requested_model_version),
+):
+    """
+    Courbes de dépendance partielle globales des features de base.
+
+    Les courbes de toutes les features sont calculées ensemble, en un seul appel au modèle sur le jeu
+    de référence, à la première demande pour une version de modèle ; elles sont ensuite servies depuis
+    le cache jusqu'au déchargement de cette version.
+
+    Args:
+        features (List[str], optionnel): Features dont renvoyer la courbe.
+        n_points (int): Nombre de points de chaque grille (quantiles 5 %–95 % de la référence).
+        model_version (str, optionnel): Version de modèle demandée (version active par défaut).
+
+    Returns:
+        PartialDependenceOutput: Courbes par feature et description de la référence.
+
+    Raises:
+        HTTPException: 503 si le jeu de référence est absent (sauf PD_SYNTHETIC_REFERENCE=1).
+    """
+
+    endpoint = "/partial-dependence"
+    unknown = set(features or []) - set(BASE_FEATURES)
+    if unknown:
+        raise HTTPException(status_code=422, detail=f"Features inconnues : {sorted(unknown)} (attendues : {BASE_FEATURES}).")
+
+    entry = await checkout_model(model_version)
+
+    def predict(X):
+        metrics.observe_batch(endpoint, len(X))
+        return executor.predict_sync(entry, to_model_input(X))
+
+    try:
+        with metrics.stage(endpoint, "predict"):
+            curves, source, n_ref, cached = await asyncio.to_thread(pd_cache.get, entry.fingerprint, n_points, predict)
+    except ReferenceUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Erreur lors du calcul de la dépendance partielle : {e}")
+    finally:
+        registry.release(entry)
+
+    return JSONResponse(
+        {
+            "reference": source,
+            "reference_rows": n_ref,
+            "cached": cached,
+            "curves": {name: curves[name] for name in (features or BASE_FEATURES)},
+        },
+        headers={"X-Model-Version": entry.version},
+    )
+
+@app.post("/similar-mixes", response_model=SimilarMixesOutput)
+async def similar_mixes(params: SimilarMixesInput, request: Request):
+    """
+    Mélanges historiques testés en laboratoire les plus proches de chaque mélange demandé, avec leur
+    résistance mesurée (distance calculée sur les features de base standardisées).
+
+    Args:
+        params (SimilarMixesInput): Mélanges recherchés et nombre de voisins.
+
+    Returns:
+        SimilarMixesOutput: Voisins de chaque mélange, du plus proche au plus éloigné.
+
+    Raises:
+        HTTPException: 503 si l'index n'est pas disponible.
+    """
+
+    endpoint = "/similar-mixes"
+    observe_parsing(request, endpoint)
+    index = neighbors.index
+    if index is None:
+        detail = f"Index des mélanges historiques indisponible : {neighbors.error}" if neighbors.error else "Index en cours de construction."
+        raise HTTPException(status_code=503, detail=detail, headers={"Retry-After": "5"})
+
+    with metrics.stage(endpoint, "query"):
+        distances, positions = index.query(params.mixes, params.k)
+    with metrics.stage(endpoint, "serialize"):
+        # Seules les lignes des voisins trouvés sont converties
+        ids = index.ids[positions].tolist()
+        mixes = np.round(index.mixes[positions].astype(np.float64), 3).tolist()
+        strengths = np.round(index.strengths[positions].astype(np.float64), 3).tolist()
+        distances = np.round(distances, 4).tolist()
+        results = [
+            [
+                {"id": i, "mix": dict(zip(BASE_FEATURES, mix)), "measured_strength_MPa": strength, "distance": distance}
+                for i, mix, strength, distance in zip(*row)
+            ]
+            for row in zip(ids, mixes, strengths, distances)
+        ]
+        content = JSONResponse({"neighbors": results})
+    return content
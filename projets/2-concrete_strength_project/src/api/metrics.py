@@ -0,0 +1,264 @@
+# src/api/metrics.py
+
+import os
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager, nullcontext
+from time import perf_counter
+from typing import Dict, Iterable, Optional, Tuple
+
+"""
+Instrumentation de l'API : temps par étape, histogrammes de latence et compteurs de débit,
+exposés au format texte Prometheus sur `/metrics`.
+
+Métriques exposées :
+- concrete_api_request_duration_seconds{endpoint,method} : latence de bout en bout (jusqu'au dernier octet envoyé).
+- concrete_api_requests_total{endpoint,method,status} et concrete_api_request_errors_total{endpoint,status}.
+- concrete_api_stage_duration_seconds{endpoint,stage} : temps passé dans chaque étape
+  (parse, read_csv, features, cache, predict, serialize, ...).
+- concrete_api_batch_rows{endpoint} : distribution du nombre de lignes envoyées au modèle par appel.
+- concrete_api_predicted_rows_total{endpoint} : lignes prédites renvoyées (débit en lignes/s via `rate()`).
+- concrete_api_executor_* et concrete_api_cache_* : état instantané de l'exécuteur et du cache.
+
+Les histogrammes sont à seaux fixes (un compteur par seau, recherche dichotomique) et le middleware
+est un middleware ASGI pur : le surcoût reste de l'ordre de la microseconde par mesure.
+METRICS_ENABLED=0 désactive l'instrumentation.
+"""
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+
+PREFIX = "concrete_api"
+
+# Seaux de latence (secondes) et de taille de lot (lignes)
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+BATCH_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+
+class Histogram:
+    """
+    Histogramme cumulatif à seaux fixes (sémantique Prometheus : `le` inclusif).
+
+    Args:
+        buckets (tuple[float]): Bornes supérieures croissantes des seaux (+Inf ajouté implicitement).
+    """
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Metrics:
+    """
+    Registre thread-safe des métriques de l'API.
+
+    Args:
+        enabled (bool): Si False, toutes les mesures sont ignorées.
+    """
+
+    def __init__(self, enabled: bool = METRICS_ENABLED):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._requests: Dict[tuple, int] = {}
+        self._errors: Dict[tuple, int] = {}
+        self._rows: Dict[str, int] = {}
+        self._latency: Dict[tuple, Histogram] = {}
+        self._stages: Dict[tuple, Histogram] = {}
+        self._batches: Dict[str, Histogram] = {}
+
+    def observe_request(self, endpoint: str, method: str, status: int, seconds: float):
+        """
+        Enregistre une requête terminée (latence, statut, erreurs).
+        """
+
+        with self._lock:
+            key = (endpoint, method, str(status))
+            self._requests[key] = self._requests.get(key, 0) + 1
+            if status >= 400:
+                error_key = (endpoint, str(status))
+                self._errors[error_key] = self._errors.get(error_key, 0) + 1
+            self._histogram(self._latency, (endpoint, method), LATENCY_BUCKETS).observe(seconds)
+
+    def observe_stage(self, endpoint: str, stage: str, seconds: float):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._histogram(self._stages, (endpoint, stage), LATENCY_BUCKETS).observe(seconds)
+
+    def observe_batch(self, endpoint: str, n_rows: int):
+        """
+        Enregistre la taille d'un lot envoyé au modèle (lignes absentes du cache).
+        """
+
+        if not self.enabled:
+            return
+        with self._lock:
+            self._histogram(self._batches, endpoint, BATCH_BUCKETS).observe(n_rows)
+
+    def count_rows(self, endpoint: str, n_rows: int):
+        """
+        Comptabilise les lignes prédites renvoyées au client (cache compris).
+        """
+
+        if not self.enabled:
+            return
+        with self._lock:
+            self._rows[endpoint] = self._rows.get(endpoint, 0) + n_rows
+
+    def stage(self, endpoint: str, stage: str):
+        """
+        Contexte chronométrant une étape du traitement d'une requête.
+
+        Exemple :
+            with metrics.stage("/predict-batch", "read_csv"):
+                df = pd.read_csv(file.file)
+        """
+
+        if not self.enabled:
+            return nullcontext()
+        return self._timed(endpoint, stage)
+
+    def render(self, gauges: Optional[Dict[str, Dict[str, float]]] = None) -> str:
+        """
+        Sérialise toutes les métriques au format d'exposition texte Prometheus (version 0.0.4).
+
+        Args:
+            gauges (dict, optionnel): Jauges instantanées supplémentaires {groupe: {nom: valeur}},
+                                      exposées sous `concrete_api_<groupe>_<nom>`.
+
+        Returns:
+            str: Corps de la réponse `/metrics`.
+        """
+
+        with self._lock:
+            requests = dict(self._requests)
+            errors = dict(self._errors)
+            rows = dict(self._rows)
+            latency = {key: _snapshot(h) for key, h in self._latency.items()}
+            stages = {key: _snapshot(h) for key, h in self._stages.items()}
+            batches = {key: _snapshot(h) for key, h in self._batches.items()}
+
+        lines = []
+        _counter(lines, "requests_total", "Requêtes HTTP traitées.",
+                 (({"endpoint": e, "method": m, "status": s}, v) for (e, m, s), v in requests.items()))
+        _counter(lines, "request_errors_total", "Requêtes HTTP terminées en erreur (statut >= 400).",
+                 (({"endpoint": e, "status": s}, v) for (e, s), v in errors.items()))
+        _histograms(lines, "request_duration_seconds", "Latence des requêtes HTTP (jusqu'au dernier octet).",
+                    (({"endpoint": e, "method": m}, h) for (e, m), h in latency.items()))
+        _histograms(lines, "stage_duration_seconds", "Temps passé dans chaque étape du traitement.",
+                    (({"endpoint": e, "stage": s}, h) for (e, s), h in stages.items()))
+        _histograms(lines, "batch_rows", "Nombre de lignes envoyées au modèle par appel.",
+                    (({"endpoint": e}, h) for e, h in batches.items()))
+        _counter(lines, "predicted_rows_total", "Lignes prédites.",
+                 (({"endpoint": e}, v) for e, v in rows.items()))
+
+        for group, values in (gauges or {}).items():
+            for name, value in values.items():
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    continue
+                metric = f"{PREFIX}_{group}_{name}"
+                lines.append(f"# TYPE {metric} gauge")
+                lines.append(f"{metric} {_number(value)}")
+
+        return "\n".join(lines) + "\n"
+
+    @contextmanager
+    def _timed(self, endpoint, stage):
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.observe_stage(endpoint, stage, perf_counter() - start)
+
+    @staticmethod
+    def _histogram(store, key, buckets) -> Histogram:
+        histogram = store.get(key)
+        if histogram is None:
+            histogram = store[key] = Histogram(buckets)
+        return histogram
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI mesurant la latence et le statut de chaque requête HTTP.
+
+    Le libellé `endpoint` est le chemin de la route (ex. `/models/{version}`) et non l'URL brute,
+    pour borner la cardinalité. L'instant d'arrivée est déposé dans `request.state.started_at`
+    afin que les endpoints puissent mesurer le temps de lecture/parsing de la requête.
+
+    Args:
+        app: Application ASGI encapsulée.
+        metrics (Metrics): Registre de métriques.
+    """
+
+    def __init__(self, app, metrics: Metrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.metrics.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        start = perf_counter()
+        scope.setdefault("state", {})["started_at"] = start
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            endpoint = getattr(route, "path", None) or "unmatched"
+            self.metrics.observe_request(endpoint, scope["method"], status, perf_counter() - start)
+
+
+def _snapshot(histogram: Histogram):
+    return histogram.buckets, list(histogram.counts), histogram.sum, histogram.count
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: Dict[str, str], **extra) -> str:
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in {**labels, **extra}.items()) + "}"
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _counter(lines, name, help_text, samples: Iterable):
+    metric = f"{PREFIX}_{name}"
+    lines.append(f"# HELP {metric} {help_text}")
+    lines.append(f"# TYPE {metric} counter")
+    for labels, value in samples:
+        lines.append(f"{metric}{_labels(labels)} {value}")
+
+
+def _histograms(lines, name, help_text, samples: Iterable):
+    metric = f"{PREFIX}_{name}"
+    lines.append(f"# HELP {metric} {help_text}")
+    lines.append(f"# TYPE {metric} histogram")
+    for labels, (buckets, counts, total, count) in samples:
+        cumulative = 0
+        for bound, n in zip(buckets, counts):
+            cumulative += n
+            lines.append(f"{metric}_bucket{_labels(labels, le=_number(bound))} {cumulative}")
+        lines.append(f"{metric}_bucket{_labels(labels, le='+Inf')} {count}")
+        lines.append(f"{metric}_sum{_labels(labels)} {_number(total)}")
+        lines.append(f"{metric}_count{_labels(labels)} {count}")
@@ -1,29 +1,177 @@
 # src/api/model_loader.py
 
-import joblib
+import hashlib
+import io
 import os
+import shutil
+import threading
+
+from src.ml.native_inference import NativeModel, compile_pipeline
 
 MODEL_PATH = os.path.join("models", "best_model.joblib")
 
-def load_model():
+# Moteur d'inférence : 'sklearn' (pipeline joblib tel quel) ou 'native' (pipeline compilé en tableaux NumPy)
+INFERENCE_ENGINE = os.getenv("INFERENCE_ENGINE", "sklearn").lower()
+
+# Projection mémoire du modèle natif (MODEL_MMAP=1) : les tableaux compilés sont écrits une fois en .npy
+# dans MODEL_MMAP_DIR, puis projetés en lecture seule par chaque worker, qui partagent ainsi les mêmes pages.
+MODEL_MMAP = os.getenv("MODEL_MMAP", "0") == "1"
+MODEL_MMAP_DIR = os.getenv("MODEL_MMAP_DIR", os.path.join("models", ".mmap"))
+
+def load_model(path=MODEL_PATH, engine=INFERENCE_ENGINE, mmap=MODEL_MMAP):
     """
     Charge et retourne le modèle ML sauvegardé.
 
-    Vérifie que le fichier du modèle existe à l'emplacement défini par MODEL_PATH.
+    Vérifie que le fichier du modèle existe à l'emplacement indiqué (MODEL_PATH par défaut).
+
+    Args:
+        path (str): Chemin de l'artefact .joblib.
+        engine (str): 'sklearn' pour le pipeline joblib, 'native' pour sa version compilée NumPy.
+        mmap (bool): Projeter en mémoire les tableaux du modèle natif (partagés entre processus).
+                     Les arbres sklearn et le booster XGBoost recopient leurs tableaux au désérialisage :
+                     seul le moteur natif peut s'exécuter directement sur des pages partagées.
 
     Returns:
-        model: Objet modèle chargé via joblib.
+        model: Objet modèle chargé via joblib (ou NativeModel), exposant une méthode `predict`.
 
     Raises:
         FileNotFoundError: Si le fichier du modèle n'est pas trouvé.
         Exception: Pour toute autre erreur de chargement.
     """
 
-    if not os.path.exists(MODEL_PATH):
-        raise FileNotFoundError(f"Modèle introuvable à l’emplacement : {MODEL_PATH}")
+    if engine not in ("sklearn", "native"):
+        raise ValueError(f"Moteur d'inférence inconnu : {engine} (attendu : 'sklearn' ou 'native')")
+    if mmap and engine != "native":
+        raise ValueError("MODEL_MMAP=1 nécessite INFERENCE_ENGINE=native.")
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Modèle introuvable à l’emplacement : {path}")
+    if mmap:
+        return load_mapped_model(path)
     try:
-        model = joblib.load(MODEL_PATH)
+        # Import différé : joblib (et sklearn/xgboost au désérialisage) ne sont chargés qu'avec le modèle
+        import joblib
+
+        model = joblib.load(path)
+        if engine == "native":
+            return compile_pipeline(model)
         return model
     except Exception as e:
         raise RuntimeError(f"Erreur lors du chargement du modèle : {e}")
 
+
+def load_mapped_model(path=MODEL_PATH, mmap_dir=MODEL_MMAP_DIR):
+    """
+    Charge le modèle natif en projection mémoire, en le compilant au préalable si nécessaire.
+
+    Le dossier compilé est indexé par l'empreinte de l'artefact : le premier processus le crée,
+    les suivants (et les redémarrages) le projettent directement, sans joblib ni sklearn.
+
+    Args:
+        path (str): Chemin de l'artefact .joblib.
+        mmap_dir (str): Dossier racine des modèles compilés.
+
+    Returns:
+        NativeModel: Modèle dont les tableaux sont des `np.memmap` en lecture seule.
+    """
+
+    directory = mapped_model_dir(path, model_fingerprint(path), mmap_dir)
+    try:
+        if not os.path.exists(os.path.join(directory, "model.json")):
+            import joblib
+
+            compile_pipeline(joblib.load(path)).save(directory)
+        return NativeModel.load(directory, mmap_mode="r")
+    except Exception as e:
+        raise RuntimeError(f"Erreur lors du chargement du modèle projeté en mémoire : {e}")
+
+
+def mapped_model_dir(path, fingerprint, mmap_dir=MODEL_MMAP_DIR):
+    name = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(mmap_dir, f"{name}-{fingerprint}")
+
+
+def load_model_version(path, fingerprint, engine=INFERENCE_ENGINE, mmap=MODEL_MMAP, mmap_dir=MODEL_MMAP_DIR):
+    """
+    Charge exactement la version d'empreinte `fingerprint` de l'artefact (workers de processus).
+
+    Le modèle natif projeté en mémoire est chargé depuis son dossier compilé, indexé par l'empreinte, s'il
+    existe. Sinon l'artefact est lu une seule fois en mémoire, son empreinte vérifiée sur ces octets, puis
+    désérialisé depuis ces mêmes octets : un artefact remplacé sur disque entre-temps n'est jamais chargé
+    sous l'ancienne empreinte.
+
+    Args:
+        path (str): Chemin de l'artefact .joblib.
+        fingerprint (str): Empreinte attendue (cf. model_fingerprint).
+        engine (str): 'sklearn' ou 'native'.
+        mmap (bool): Projeter en mémoire les tableaux du modèle natif.
+        mmap_dir (str): Dossier racine des modèles compilés.
+
+    Raises:
+        RuntimeError: Si l'artefact sur disque n'a plus l'empreinte attendue.
+    """
+
+    directory = mapped_model_dir(path, fingerprint, mmap_dir)
+    if mmap and os.path.exists(os.path.join(directory, "model.json")):
+        return NativeModel.load(directory, mmap_mode="r")
+
+    with open(path, "rb") as f:
+        data = f.read()
+    actual = hashlib.sha256(data).hexdigest()[:16]
+    if actual != fingerprint:
+        raise RuntimeError(f"L'artefact {path} a été remplacé (empreinte {actual}, attendue {fingerprint}).")
+
+    import joblib
+
+    model = joblib.load(io.BytesIO(data))
+    if mmap:
+        compile_pipeline(model).save(directory)
+        return NativeModel.load(directory, mmap_mode="r")
+    if engine == "native":
+        return compile_pipeline(model)
+    return model
+
+
+def snapshot_artifact(path, snapshot_dir):
+    """
+    Fige une copie de l'artefact, rangée sous son empreinte : `<snapshot_dir>/<empreinte>/<nom>.joblib`.
+
+    Les workers de processus chargent une version depuis cette copie, qui reste lisible tant que la version
+    n'est pas retirée, même si l'artefact d'origine est remplacé entre-temps (bascule à chaud).
+    Une copie plutôt qu'un lien physique : un artefact réécrit sur place modifierait aussi le lien.
+
+    Args:
+        path (str): Chemin de l'artefact .joblib.
+        snapshot_dir (str): Dossier des copies.
+
+    Returns:
+        tuple[str, str]: Chemin de la copie et son empreinte (calculée sur la copie).
+    """
+
+    os.makedirs(snapshot_dir, exist_ok=True)
+    tmp_path = os.path.join(snapshot_dir, f".{os.path.basename(path)}.{threading.get_ident()}.tmp")
+    shutil.copyfile(path, tmp_path)
+    fingerprint = model_fingerprint(tmp_path)
+    artifact = os.path.join(snapshot_dir, fingerprint, os.path.basename(path))
+    os.makedirs(os.path.dirname(artifact), exist_ok=True)
+    os.replace(tmp_path, artifact)
+    return artifact, fingerprint
+
+
+def model_fingerprint(path=MODEL_PATH):
+    """
+    Calcule l'empreinte (SHA-256 tronqué) de l'artefact du modèle.
+
+    Permet de détecter qu'un autre artefact a été chargé (invalidation des caches).
+
+    Args:
+        path (str): Chemin de l'artefact.
+
+    Returns:
+        str: Empreinte hexadécimale sur 16 caractères.
+    """
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()[:16]
@@ -0,0 +1,233 @@
+# src/api/neighbors.py
+
+import os
+import threading
+from typing import Optional, Tuple
+
+import numpy as np
+
+from src.api.prediction_log import DB_PARAMS
+from src.features import BASE_FEATURES
+
+"""
+Index des mélanges historiques testés en laboratoire, pour retrouver les k mélanges les plus proches.
+
+Les mélanges (8 features de base) et leurs résistances mesurées sont chargés depuis la table
+`concrete_strength` (créée par src/etl/3-load_to_db.py) si la base est configurée, sinon depuis le CSV
+nettoyé. Ils sont conservés dans des tableaux compacts (float32), et un KD-tree (scipy cKDTree) est
+construit sur les features standardisées : une requête de quelques mélanges prend moins d'une milliseconde,
+et plusieurs mélanges sont interrogés en un seul appel.
+
+Reconstruction incrémentale : la source est surveillée par une signature peu coûteuse (nombre de lignes
+et identifiant maximal pour la table, date et taille pour le CSV). Si seules de nouvelles lignes ont été
+ajoutées, elles sont seules relues puis ajoutées à l'index (avec la standardisation d'origine) ; sinon
+l'index est rechargé entièrement. Le nouvel index remplace l'ancien de manière atomique.
+
+Configuration (variables d'environnement) :
+- NEIGHBORS_TABLE : table source (concrete_strength par défaut ; utilisée si DB_HOST est défini).
+- NEIGHBORS_CSV_PATH : fichier source de repli (jeu nettoyé par défaut ; CSV, Parquet ou Arrow).
+- NEIGHBORS_REFRESH_INTERVAL : intervalle (s) de vérification de la source (0 = désactivé, 60 par défaut).
+"""
+
+NEIGHBORS_TABLE = os.getenv("NEIGHBORS_TABLE", "concrete_strength")
+NEIGHBORS_CSV_PATH = os.getenv("NEIGHBORS_CSV_PATH", os.path.join("data", "processed", "concrete_data_clean.csv"))
+NEIGHBORS_REFRESH_INTERVAL = float(os.getenv("NEIGHBORS_REFRESH_INTERVAL", "60"))
+
+# Nombre maximal de voisins renvoyés par mélange
+MAX_NEIGHBORS = 100
+
+
+class NeighborIndex:
+    """
+    Instantané immuable de l'index : mélanges, résistances, identifiants et KD-tree standardisé.
+
+    Args:
+        ids (np.ndarray): Identifiants des mélanges (id de la table ou numéro de ligne du CSV).
+        mixes (np.ndarray): Matrice (n, 8) des features de base.
+        strengths (np.ndarray): Résistances mesurées (MPa).
+        mean (np.ndarray, optionnel): Moyennes de standardisation (calculées sur les données sinon).
+        scale (np.ndarray, optionnel): Écarts-types de standardisation (calculés sur les données sinon).
+    """
+
+    def __init__(self, ids, mixes, strengths, mean=None, scale=None):
+        from scipy.spatial import cKDTree
+
+        self.ids = np.ascontiguousarray(ids, dtype=np.int64)
+        self.mixes = np.ascontiguousarray(mixes, dtype=np.float32)
+        self.strengths = np.ascontiguousarray(strengths, dtype=np.float32)
+        self.mean = self.mixes.mean(axis=0, dtype=np.float64) if mean is None else mean
+        std = self.mixes.std(axis=0, dtype=np.float64)
+        self.scale = np.where(std > 0, std, 1.0) if scale is None else scale
+        self.tree = cKDTree(self.standardize(self.mixes))
+
+    def __len__(self):
+        return len(self.ids)
+
+    def standardize(self, mixes) -> np.ndarray:
+        return (np.asarray(mixes, dtype=np.float64) - self.mean) / self.scale
+
+    def extend(self, ids, mixes, strengths) -> "NeighborIndex":
+        """
+        Nouvel index avec des mélanges ajoutés, standardisés comme les mélanges existants.
+        """
+
+        return NeighborIndex(
+            np.concatenate([self.ids, ids]),
+            np.vstack([self.mixes, np.asarray(mixes, dtype=np.float32)]),
+            np.concatenate([self.strengths, strengths]),
+            self.mean,
+            self.scale,
+        )
+
+    def query(self, mixes, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        k plus proches mélanges historiques de chaque mélange demandé, en un seul appel.
+
+        Args:
+            mixes: Matrice (m, 8) des features de base.
+            k (int): Nombre de voisins par mélange.
+
+        Returns:
+            tuple: (distances (m, k) dans l'espace standardisé, positions (m, k) dans l'index).
+        """
+
+        k = min(k, len(self))
+        distances, positions = self.tree.query(self.standardize(mixes), k=k)
+        return distances.reshape(len(mixes), k), positions.reshape(len(mixes), k)
+
+
+class NeighborSource:
+    """
+    Source des mélanges historiques : table PostgreSQL si la base est configurée, CSV sinon.
+    """
+
+    def __init__(self, table: str = NEIGHBORS_TABLE, csv_path: str = NEIGHBORS_CSV_PATH, db_params: Optional[dict] = None):
+        self.table = table
+        self.csv_path = csv_path
+        self.db_params = {k: v for k, v in (db_params or DB_PARAMS).items() if v is not None}
+
+    @property
+    def uses_database(self) -> bool:
+        return "host" in self.db_params
+
+    def describe(self) -> str:
+        return f"table {self.table}" if self.uses_database else self.csv_path
+
+    def signature(self) -> tuple:
+        """
+        Signature de l'état de la source : (nombre de lignes, id maximal) ou (date de modification, taille).
+        """
+
+        if self.uses_database:
+            rows = self._query(f"SELECT count(*), coalesce(max(id), 0) FROM {self.table}")
+            return tuple(int(value) for value in rows[0])
+        stat = os.stat(self.csv_path)
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def read(self, after_id: Optional[int] = None):
+        """
+        Lit les mélanges (ceux d'identifiant supérieur à `after_id` si précisé, table uniquement).
+
+        Returns:
+            tuple: (ids, mixes (n, 8), strengths)
+        """
+
+        if self.uses_database:
+            where = f" WHERE id > {int(after_id)}" if after_id is not None else ""
+            rows = self._query(f"SELECT id, {', '.join(BASE_FEATURES)}, strength FROM {self.table}{where} ORDER BY id")
+            data = np.array(rows, dtype=np.float64).reshape(-1, len(BASE_FEATURES) + 2)
+            return data[:, 0].astype(np.int64), data[:, 1:-1], data[:, -1]
+
+        from src.storage import read_table
+
+        df = read_table(self.csv_path, columns=[*BASE_FEATURES, "strength"]).dropna()
+        return df.index.to_numpy(dtype=np.int64), df[BASE_FEATURES].to_numpy(dtype=np.float64), df["strength"].to_numpy()
+
+    def _query(self, sql: str) -> list:
+        import psycopg2
+
+        conn = psycopg2.connect(**self.db_params)
+        try:
+            with conn.cursor() as cur:
+                cur.execute(sql)
+                return cur.fetchall()
+        finally:
+            conn.close()
+
+
+class NeighborService:
+    """
+    Index courant des mélanges historiques et sa reconstruction (complète ou incrémentale).
+
+    Args:
+        source (NeighborSource): Source des mélanges.
+    """
+
+    def __init__(self, source: Optional[NeighborSource] = None):
+        self.source = source or NeighborSource()
+        self.index: Optional[NeighborIndex] = None
+        self.error: Optional[str] = None
+        self._signature = None
+        self._lock = threading.Lock()
+
+    def build(self):
+        """
+        Construit l'index complet depuis la source.
+        """
+
+        with self._lock:
+            signature = self.source.signature()
+            self.index = NeighborIndex(*self.source.read())
+            self._signature = signature
+            self.error = None
+        print(f"Index des mélanges historiques : {len(self.index)} mélanges ({self.source.describe()})")
+
+    def try_build(self):
+        """
+        Construit l'index sans interrompre le démarrage si la source est indisponible.
+        """
+
+        try:
+            self.build()
+        except Exception as e:
+            self.error = str(e)
+            print(f"Index des mélanges historiques indisponible : {e}")
+
+    def refresh(self) -> str:
+        """
+        Met l'index à jour si la source a changé : ajout des seules nouvelles lignes si possible.
+
+        Returns:
+            str: 'unchanged', 'incremental' ou 'full'.
+        """
+
+        with self._lock:
+            signature = self.source.signature()
+            if self.index is not None and signature == self._signature:
+                return "unchanged"
+            appended = (
+                self.index is not None and self.source.uses_database
+                and signature[0] > self._signature[0] and signature[1] > self._signature[1]
+            )
+            if appended:
+                ids, mixes, strengths = self.source.read(after_id=self._signature[1])
+                # Ajout cohérent seulement si toutes les lignes nouvelles sont bien au-delà de l'ancien maximum
+                appended = len(ids) == signature[0] - self._signature[0]
+            if appended:
+                self.index = self.index.extend(ids, mixes, strengths)
+                mode = "incremental"
+            else:
+                self.index = NeighborIndex(*self.source.read())
+                mode = "full"
+            self._signature = signature
+            self.error = None
+        print(f"Index des mélanges historiques mis à jour ({mode}) : {len(self.index)} mélanges")
+        return mode
+
+    def stats(self) -> dict:
+        index = self.index
+        return {
+            "source": self.source.describe(),
+            "mixes": len(index) if index is not None else 0,
+            "error": self.error,
+        }
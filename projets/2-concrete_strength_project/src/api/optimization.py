@@ -0,0 +1,202 @@
+# src/api/optimization.py
+
+import os
+from time import perf_counter
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+from src.features import BASE_FEATURES, build_feature_matrix
+
+"""
+Formulation inverse : recherche des mélanges les moins chers atteignant une résistance cible.
+
+La recherche est une évolution différentielle (DE/rand/1/bin) entièrement vectorisée : chaque génération
+évalue toute la population (des milliers de mélanges) en un seul appel au modèle, sur une matrice de
+features construite par le même noyau que /predict-batch (`build_feature_matrix`). L'âge est fixé,
+les 7 constituants varient dans leurs bornes.
+
+Objectif : minimiser le coût du mélange, avec une pénalité proportionnelle au déficit de résistance
+sous la cible. Tous les mélanges évalués qui atteignent la cible alimentent un front de Pareto
+coût / résistance (moins cher d'un côté, plus résistant de l'autre), renvoyé au client.
+La recherche s'arrête à l'épuisement du budget de temps ou du nombre de générations.
+"""
+
+INGREDIENTS = [name for name in BASE_FEATURES if name != "age"]
+
+# Bornes par défaut des constituants (kg/m³), issues des plages du jeu de données d'entraînement
+INGREDIENT_BOUNDS = {
+    "cement": (102.0, 540.0),
+    "slag": (0.0, 359.4),
+    "fly_ash": (0.0, 200.1),
+    "water": (121.8, 247.0),
+    "superplasticizer": (0.0, 32.2),
+    "coarse_aggregate": (801.0, 1145.0),
+    "fine_aggregate": (594.0, 992.6),
+}
+
+# Coûts par défaut (par kg) : seul le ciment est compté, ce qui revient à minimiser le dosage en ciment
+DEFAULT_COSTS = {"cement": 1.0}
+
+# Paramètres de l'évolution différentielle
+MUTATION_FACTOR = 0.7
+CROSSOVER_RATE = 0.9
+
+# Limites imposées aux requêtes /optimize-mix
+MAX_POPULATION = 5000
+MAX_TIME_BUDGET = float(os.getenv("OPTIMIZE_MAX_TIME_BUDGET", "10"))
+
+# Pénalité appliquée par MPa manquant sous la résistance cible, relative à l'échelle des coûts
+DEFICIT_PENALTY = 1e3
+
+
+def pareto_front(cost: np.ndarray, strength: np.ndarray) -> np.ndarray:
+    """
+    Indices des points non dominés (coût minimal, résistance maximale), triés par coût croissant.
+
+    Args:
+        cost (np.ndarray): Coût de chaque point.
+        strength (np.ndarray): Résistance de chaque point.
+
+    Returns:
+        np.ndarray: Indices du front de Pareto.
+    """
+
+    # Tri par coût croissant (résistance décroissante à coût égal) : un point est retenu
+    # s'il est strictement plus résistant que tous les points moins chers.
+    order = np.lexsort((-strength, cost))
+    best_so_far = np.maximum.accumulate(strength[order])
+    keep = np.empty(len(order), dtype=bool)
+    keep[:1] = True
+    keep[1:] = strength[order][1:] > best_so_far[:-1]
+    return order[keep]
+
+
+def optimize_mix(
+    predict: Callable[[np.ndarray], np.ndarray],
+    target_strength: float,
+    age: float,
+    bounds: Dict[str, Tuple[float, float]],
+    costs: Dict[str, float],
+    population: int = 1000,
+    time_budget: float = 2.0,
+    max_generations: int = 200,
+    max_pareto: int = 20,
+    seed: Optional[int] = None,
+) -> dict:
+    """
+    Recherche par évolution différentielle les mélanges les moins chers atteignant la résistance cible.
+
+    Args:
+        predict (Callable): Fonction de prédiction sur une matrice de features (n, 11) dans l'ordre ALL_FEATURES.
+        target_strength (float): Résistance cible (MPa).
+        age (float): Âge (jours) auquel la résistance doit être atteinte.
+        bounds (dict): Bornes (min, max) par constituant ; les constituants absents gardent INGREDIENT_BOUNDS.
+        costs (dict): Coût par kg de chaque constituant (0 pour les absents).
+        population (int): Nombre de mélanges évalués par génération.
+        time_budget (float): Durée maximale de la recherche (s).
+        max_generations (int): Nombre maximal de générations.
+        max_pareto (int): Nombre maximal de points renvoyés du front (régulièrement espacés).
+        seed (int, optionnel): Graine du générateur aléatoire.
+
+    Returns:
+        dict: Front de Pareto (mix, résistance, coût), meilleur mélange et statistiques de recherche.
+    """
+
+    start = perf_counter()
+    deadline = start + time_budget
+    rng = np.random.default_rng(seed)
+
+    limits = np.array([bounds.get(name, INGREDIENT_BOUNDS[name]) for name in INGREDIENTS], dtype=np.float64)
+    low, high = limits[:, 0], limits[:, 1]
+    unit_costs = np.array([costs.get(name, 0.0) for name in INGREDIENTS], dtype=np.float64)
+    # Pénalité à l'échelle du coût maximal possible, pour que tout mélange conforme batte tout mélange non conforme
+    penalty = DEFICIT_PENALTY * max(float(unit_costs @ high), 1.0)
+
+    n_dims = len(INGREDIENTS)
+    age_column = np.full((population, 1), age)
+
+    max_strength = -np.inf
+
+    def evaluate(mixes):
+        nonlocal max_strength
+        X = build_feature_matrix(np.hstack([mixes, age_column[:len(mixes)]]))
+        strength = np.asarray(predict(X), dtype=np.float64)
+        max_strength = max(max_strength, float(strength.max()))
+        cost = mixes @ unit_costs
+        fitness = cost + penalty * np.maximum(target_strength - strength, 0.0)
+        return strength, cost, fitness
+
+    front_mixes = np.empty((0, n_dims))
+    front_strength = np.empty(0)
+    front_cost = np.empty(0)
+
+    def update_front(mixes, strength, cost):
+        nonlocal front_mixes, front_strength, front_cost
+        feasible = strength >= target_strength
+        if not feasible.any():
+            return
+        all_mixes = np.vstack([front_mixes, mixes[feasible]])
+        all_strength = np.concatenate([front_strength, strength[feasible]])
+        all_cost = np.concatenate([front_cost, cost[feasible]])
+        keep = pareto_front(all_cost, all_strength)
+        front_mixes, front_strength, front_cost = all_mixes[keep], all_strength[keep], all_cost[keep]
+
+    pop = low + rng.random((population, n_dims)) * (high - low)
+    strength, cost, fitness = evaluate(pop)
+    update_front(pop, strength, cost)
+    evaluations = population
+    generations = 0
+    rows = np.arange(population)
+
+    while generations < max_generations and perf_counter() < deadline:
+        # DE/rand/1 : trois individus tirés par décalage aléatoire non nul (jamais l'individu lui-même)
+        offsets = rng.integers(1, population, size=(population, 3))
+        r1, r2, r3 = ((rows[:, None] + offsets) % population).T
+        mutant = pop[r1] + MUTATION_FACTOR * (pop[r2] - pop[r3])
+
+        # Croisement binomial, avec au moins une coordonnée issue du mutant
+        cross = rng.random((population, n_dims)) < CROSSOVER_RATE
+        cross[rows, rng.integers(0, n_dims, population)] = True
+        trial = np.clip(np.where(cross, mutant, pop), low, high)
+
+        trial_strength, trial_cost, trial_fitness = evaluate(trial)
+        update_front(trial, trial_strength, trial_cost)
+        evaluations += population
+        generations += 1
+
+        better = trial_fitness <= fitness
+        pop[better] = trial[better]
+        strength[better] = trial_strength[better]
+        cost[better] = trial_cost[better]
+        fitness[better] = trial_fitness[better]
+
+    pareto = [
+        {
+            "mix": {name: round(float(value), 2) for name, value in zip(INGREDIENTS, mix)},
+            "predicted_strength_MPa": round(float(s), 3),
+            "cost": round(float(c), 3),
+        }
+        for mix, s, c in zip(front_mixes, front_strength, front_cost)
+    ]
+    return {
+        "feasible": bool(pareto),
+        "best": pareto[0] if pareto else None,
+        "pareto": thin_front(pareto, max_pareto),
+        # Sans solution conforme : meilleure résistance atteinte, pour guider l'élargissement des bornes
+        "max_strength_MPa": round(max_strength, 3),
+        "generations": generations,
+        "evaluations": evaluations,
+        "elapsed_s": round(perf_counter() - start, 3),
+    }
+
+
+def thin_front(pareto: list, max_points: int) -> list:
+    """
+    Réduit un front de Pareto à `max_points` points régulièrement espacés (extrémités conservées).
+    """
+
+    if len(pareto) <= max_points:
+        return pareto
+    keep = np.unique(np.linspace(0, len(pareto) - 1, max_points).round().astype(int))
+    return [pareto[i] for i in keep]
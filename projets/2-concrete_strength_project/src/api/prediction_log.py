@@ -0,0 +1,292 @@
+# src/api/prediction_log.py
+
+import io
+import os
+import threading
+from collections import deque
+from datetime import datetime, timezone
+from time import monotonic, perf_counter
+from typing import Optional
+
+import numpy as np
+
+from src.features import BASE_FEATURES
+
+"""
+Journal des prédictions dans PostgreSQL, en écriture différée (write-behind).
+
+Chaque requête dépose ses lignes prédites dans une file en mémoire (un bloc par requête, sans conversion) ;
+des threads d'écriture les regroupent et les écrivent par COPY FROM STDIN à travers un pool de connexions.
+L'écriture ne rajoute donc aucune latence aux endpoints de prédiction :
+- vidage par taille (PREDICTION_LOG_BATCH_ROWS lignes en attente) ou par temps (PREDICTION_LOG_FLUSH_INTERVAL) ;
+- contre-pression : si la base ralentit, les lots en échec sont retentés avec un délai croissant et la file grossit ;
+  un lot qui échoue PREDICTION_LOG_MAX_ATTEMPTS fois (ligne invalide, schéma incompatible...) est abandonné et
+  compté dans les lignes rejetées, pour ne pas bloquer indéfiniment les lots suivants ;
+- politique de rejet bornée : au-delà de PREDICTION_LOG_MAX_PENDING lignes en attente, les nouveaux blocs sont
+  rejetés (et comptés) plutôt que de bloquer la requête ou d'accroître la mémoire.
+
+Configuration (variables d'environnement) :
+- PREDICTION_LOG_ENABLED : '1' pour activer le journal (désactivé par défaut).
+- DB_HOST, DB_PORT, DB_NAME, DB_USER, DB_PASSWORD : connexion PostgreSQL (cf. docker-compose.yml).
+- PREDICTION_LOG_TABLE : table cible (prediction_log par défaut, créée si absente).
+- PREDICTION_LOG_BATCH_ROWS : nombre de lignes déclenchant un vidage (5 000 par défaut).
+- PREDICTION_LOG_FLUSH_INTERVAL : délai maximal (s) avant vidage des lignes en attente (1 par défaut).
+- PREDICTION_LOG_MAX_PENDING : nombre maximal de lignes en attente (1 000 000 par défaut).
+- PREDICTION_LOG_WRITERS : threads d'écriture, et taille du pool de connexions (1 par défaut).
+- PREDICTION_LOG_MAX_ATTEMPTS : nombre de tentatives d'écriture d'un lot avant abandon (5 par défaut).
+"""
+
+PREDICTION_LOG_ENABLED = os.getenv("PREDICTION_LOG_ENABLED", "0") == "1"
+PREDICTION_LOG_TABLE = os.getenv("PREDICTION_LOG_TABLE", "prediction_log")
+PREDICTION_LOG_BATCH_ROWS = int(os.getenv("PREDICTION_LOG_BATCH_ROWS", "5000"))
+PREDICTION_LOG_FLUSH_INTERVAL = float(os.getenv("PREDICTION_LOG_FLUSH_INTERVAL", "1"))
+PREDICTION_LOG_MAX_PENDING = int(os.getenv("PREDICTION_LOG_MAX_PENDING", "1000000"))
+PREDICTION_LOG_WRITERS = int(os.getenv("PREDICTION_LOG_WRITERS", "1"))
+PREDICTION_LOG_MAX_ATTEMPTS = int(os.getenv("PREDICTION_LOG_MAX_ATTEMPTS", "5"))
+
+DB_PARAMS = {
+    "host": os.getenv("DB_HOST"),
+    "port": os.getenv("DB_PORT"),
+    "dbname": os.getenv("DB_NAME"),
+    "user": os.getenv("DB_USER"),
+    "password": os.getenv("DB_PASSWORD"),
+}
+
+# Délai maximal (s) entre deux tentatives d'écriture quand la base est indisponible
+MAX_RETRY_DELAY = 30.0
+
+LOG_COLUMNS = ["logged_at", "endpoint", "model_version", *BASE_FEATURES, "predicted_strength"]
+
+CREATE_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS {table} (
+        id BIGSERIAL PRIMARY KEY,
+        logged_at TIMESTAMPTZ NOT NULL,
+        endpoint TEXT NOT NULL,
+        model_version TEXT NOT NULL,
+        cement REAL,
+        slag REAL,
+        fly_ash REAL,
+        water REAL,
+        superplasticizer REAL,
+        coarse_aggregate REAL,
+        fine_aggregate REAL,
+        age REAL,
+        predicted_strength REAL
+    )
+"""
+
+
+class PredictionLog:
+    """
+    File bornée de prédictions à journaliser et threads d'écriture par COPY.
+
+    Args:
+        enabled (bool): Active le journal ; désactivé, `log` ne fait rien.
+        db_params (dict): Paramètres de connexion psycopg2.
+        table (str): Table cible.
+        batch_rows (int): Nombre de lignes en attente déclenchant un vidage.
+        flush_interval (float): Délai maximal (s) avant vidage.
+        max_pending (int): Nombre maximal de lignes en attente (au-delà, les nouveaux blocs sont rejetés).
+        writers (int): Nombre de threads d'écriture (et de connexions du pool).
+        max_attempts (int): Tentatives d'écriture d'un lot avant son abandon (lignes comptées comme rejetées).
+    """
+
+    def __init__(
+        self,
+        enabled: bool = PREDICTION_LOG_ENABLED,
+        db_params: Optional[dict] = None,
+        table: str = PREDICTION_LOG_TABLE,
+        batch_rows: int = PREDICTION_LOG_BATCH_ROWS,
+        flush_interval: float = PREDICTION_LOG_FLUSH_INTERVAL,
+        max_pending: int = PREDICTION_LOG_MAX_PENDING,
+        writers: int = PREDICTION_LOG_WRITERS,
+        max_attempts: int = PREDICTION_LOG_MAX_ATTEMPTS,
+    ):
+        self.enabled = enabled
+        self.db_params = {k: v for k, v in (db_params or DB_PARAMS).items() if v is not None}
+        self.table = table
+        self.batch_rows = max(1, batch_rows)
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.writers = max(1, writers)
+        self.max_attempts = max(1, max_attempts)
+
+        self._blocks = deque()
+        self._pending = 0
+        self._condition = threading.Condition()
+        self._stopping = False
+        self._threads = []
+        self._pool = None
+        self._table_ready = False
+
+        self.logged_rows = 0
+        self.written_rows = 0
+        self.dropped_rows = 0
+        self.failed_flushes = 0
+        self.flush_seconds = 0.0
+
+    def log(self, endpoint: str, model_version: str, X: np.ndarray, predictions):
+        """
+        Dépose un bloc de prédictions dans la file (non bloquant).
+
+        Args:
+            endpoint (str): Endpoint ayant produit les prédictions.
+            model_version (str): Version de modèle utilisée.
+            X (np.ndarray): Matrice de features (n, 8 ou 11), colonnes dans l'ordre ALL_FEATURES.
+            predictions: Prédictions correspondantes.
+        """
+
+        if not self.enabled:
+            return
+        n_rows = len(X)
+        block = (datetime.now(timezone.utc).isoformat(), endpoint, model_version, X, predictions)
+        with self._condition:
+            if self._pending + n_rows > self.max_pending:
+                self.dropped_rows += n_rows
+                return
+            self._blocks.append(block)
+            self._pending += n_rows
+            self.logged_rows += n_rows
+            if self._pending >= self.batch_rows:
+                self._condition.notify()
+
+    def start(self):
+        """
+        Crée le pool de connexions et démarre les threads d'écriture.
+        """
+
+        if not self.enabled:
+            return
+        try:
+            from psycopg2.pool import ThreadedConnectionPool
+        except ImportError:
+            print("Journal des prédictions désactivé : le paquet 'psycopg2' n'est pas installé.")
+            self.enabled = False
+            return
+
+        # Connexions ouvertes à la demande : une base indisponible au démarrage ne bloque pas l'API
+        self._pool = ThreadedConnectionPool(0, self.writers, **self.db_params)
+        self._stopping = False
+        self._threads = [
+            threading.Thread(target=self._write_loop, name=f"prediction-log-{i}", daemon=True)
+            for i in range(self.writers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        """
+        Vide la file (dans la limite du délai) puis ferme le pool.
+        """
+
+        if not self._threads:
+            return
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+        self._pool.closeall()
+
+    def stats(self) -> dict:
+        with self._condition:
+            return {
+                "enabled": self.enabled,
+                "pending_rows": self._pending,
+                "logged_rows": self.logged_rows,
+                "written_rows": self.written_rows,
+                "dropped_rows": self.dropped_rows,
+                "failed_flushes": self.failed_flushes,
+                "flush_seconds": round(self.flush_seconds, 3),
+            }
+
+    def _take_batch(self) -> list:
+        """
+        Retire de la file au plus `batch_rows` lignes (blocs entiers), en attendant un seuil ou le délai.
+        """
+
+        with self._condition:
+            deadline = monotonic() + self.flush_interval
+            while not self._stopping and self._pending < self.batch_rows:
+                remaining = deadline - monotonic()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+            batch, rows = [], 0
+            while self._blocks and (not batch or rows + len(self._blocks[0][3]) <= self.batch_rows):
+                block = self._blocks.popleft()
+                batch.append(block)
+                rows += len(block[3])
+            return batch
+
+    def _write_loop(self):
+        delay = self.flush_interval
+        batch, attempts = [], 0
+        while True:
+            if not batch:
+                batch, attempts = self._take_batch(), 0
+                if not batch:
+                    if self._stopping:
+                        return
+                    continue
+            rows = sum(len(block[3]) for block in batch)
+            start = perf_counter()
+            try:
+                self._copy(batch)
+            except Exception as e:
+                # Lot en échec conservé par ce thread : il reste compté dans les lignes en attente (donc dans la borne)
+                attempts += 1
+                with self._condition:
+                    self.failed_flushes += 1
+                if attempts >= self.max_attempts:
+                    print(f"Journal des prédictions : lot de {rows} lignes abandonné après {attempts} échecs ({e})")
+                    with self._condition:
+                        self._pending -= rows
+                        self.dropped_rows += rows
+                    batch, delay = [], self.flush_interval
+                    continue
+                if self._stopping:
+                    print(f"Journal des prédictions : {rows} lignes non écrites à l'arrêt ({e})")
+                    return
+                print(f"Journal des prédictions : échec d'écriture, nouvel essai dans {delay:.1f} s ({e})")
+                with self._condition:
+                    self._condition.wait_for(lambda: self._stopping, timeout=delay)
+                delay = min(delay * 2, MAX_RETRY_DELAY)
+                continue
+            delay = self.flush_interval
+            batch = []
+            with self._condition:
+                self._pending -= rows
+                self.written_rows += rows
+                self.flush_seconds += perf_counter() - start
+
+    def _copy(self, batch: list):
+        """
+        Écrit un lot par COPY FROM STDIN (CSV construit en mémoire) via une connexion du pool.
+        """
+
+        buffer = io.StringIO()
+        for logged_at, endpoint, model_version, X, predictions in batch:
+            values = np.column_stack([np.asarray(X, dtype=np.float64)[:, :len(BASE_FEATURES)], np.asarray(predictions, dtype=np.float64)])
+            prefix = f"{logged_at},{_csv_field(endpoint)},{_csv_field(model_version)},".replace("%", "%%")
+            np.savetxt(buffer, values, fmt=prefix + ",".join(["%.6g"] * values.shape[1]))
+        buffer.seek(0)
+
+        conn = self._pool.getconn()
+        try:
+            with conn.cursor() as cur:
+                if not self._table_ready:
+                    cur.execute(CREATE_TABLE_SQL.format(table=self.table))
+                cur.copy_expert(f"COPY {self.table} ({', '.join(LOG_COLUMNS)}) FROM STDIN WITH CSV", buffer)
+            conn.commit()
+            self._table_ready = True
+        except Exception:
+            self._pool.putconn(conn, close=True)
+            raise
+        self._pool.putconn(conn)
+
+
+def _csv_field(value: str) -> str:
+    return '"' + str(value).replace('"', '""') + '"'
+
@@ -0,0 +1,340 @@
+# src/api/registry.py
+
+import os
+import re
+import shutil
+import threading
+from contextlib import contextmanager
+from time import monotonic, time
+from typing import Callable, Dict, Optional
+
+from src.api.model_loader import INFERENCE_ENGINE, load_model, model_fingerprint, snapshot_artifact
+
+"""
+Registre de modèles versionnés avec bascule à chaud (sans redémarrage).
+
+Chaque artefact `models/<version>.joblib` est une version. Le registre :
+- charge les nouvelles versions en arrière-plan, les « chauffe » par une prédiction factice,
+  puis bascule atomiquement la version active ;
+- permet de cibler une version par requête (en-tête `X-Model-Version` ou paramètre `model_version`) ;
+- compte les requêtes en cours par version : une requête termine toujours sur le modèle
+  avec lequel elle a commencé, et une version remplacée n'est déchargée qu'une fois inutilisée ;
+- décharge les versions non actives restées inutilisées plus de MODEL_IDLE_TTL secondes.
+
+Chaque version est chargée depuis une copie figée de son artefact (MODELS_DIR/.snapshots/<pid>/<version>/<empreinte>/),
+supprimée quand la version est déchargée : les workers de processus, qui chargent les versions à la demande,
+lisent toujours le contenu de la version demandée, même après le remplacement du fichier d'origine.
+
+Configuration (variables d'environnement) :
+- MODELS_DIR : dossier des artefacts ('models' par défaut).
+- MODEL_VERSION : version active au démarrage ('best_model' par défaut).
+- MODEL_IDLE_TTL : délai avant déchargement d'une version non active inutilisée (300 s par défaut).
+"""
+
+MODELS_DIR = os.getenv("MODELS_DIR", "models")
+DEFAULT_MODEL_VERSION = os.getenv("MODEL_VERSION", "best_model")
+MODEL_IDLE_TTL = float(os.getenv("MODEL_IDLE_TTL", "300"))
+
+VERSION_PATTERN = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_.-]*$")
+
+# Dossier des copies figées des artefacts (un sous-dossier par processus API)
+SNAPSHOTS_DIR = ".snapshots"
+
+
+class ModelVersion:
+    """
+    Version de modèle chargée en mémoire.
+
+    Attributs:
+        version (str): Nom de la version (nom du fichier sans extension).
+        path (str): Chemin de l'artefact.
+        fingerprint (str): Empreinte du contenu de l'artefact.
+        artifact (str): Copie figée de l'artefact, de cette empreinte (chargée par les workers de processus).
+        model: Modèle chargé (pipeline sklearn ou NativeModel).
+        in_flight (int): Nombre de requêtes en cours utilisant cette version.
+    """
+
+    def __init__(self, version: str, path: str, fingerprint: str, model, artifact: Optional[str] = None):
+        self.version = version
+        self.path = path
+        self.fingerprint = fingerprint
+        self.artifact = artifact or path
+        self.model = model
+        self.loaded_at = time()
+        self.last_used = monotonic()
+        self.in_flight = 0
+        self.retired = False
+
+    def describe(self) -> dict:
+        return {
+            "version": self.version,
+            "fingerprint": self.fingerprint,
+            "loaded_at": self.loaded_at,
+            "in_flight": self.in_flight,
+            "retired": self.retired,
+        }
+
+
+class ModelRegistry:
+    """
+    Registre thread-safe des versions de modèles chargées.
+
+    Args:
+        models_dir (str): Dossier contenant les artefacts `<version>.joblib`.
+        engine (str): Moteur d'inférence utilisé au chargement ('sklearn' ou 'native').
+        warmup (Callable, optionnel): Fonction appelée sur chaque modèle chargé avant sa mise en service.
+        idle_ttl (float): Délai (s) avant déchargement d'une version non active inutilisée.
+    """
+
+    def __init__(
+        self,
+        models_dir: str = MODELS_DIR,
+        engine: str = INFERENCE_ENGINE,
+        warmup: Optional[Callable] = None,
+        idle_ttl: float = MODEL_IDLE_TTL,
+    ):
+        self.models_dir = models_dir
+        self.engine = engine
+        self.warmup = warmup
+        self.idle_ttl = idle_ttl
+        self.active: Optional[ModelVersion] = None
+        self._versions: Dict[str, ModelVersion] = {}
+        self._retired = []
+        self._loading = set()
+        self._lock = threading.RLock()
+        self._on_unload = []
+        self.snapshot_dir = os.path.join(models_dir, SNAPSHOTS_DIR, str(os.getpid()))
+        self._remove_stale_snapshots()
+
+    def on_unload(self, callback: Callable[[ModelVersion], None]):
+        """
+        Enregistre une fonction appelée lorsqu'une version est déchargée (ex. purge du cache).
+        """
+
+        self._on_unload.append(callback)
+
+    def path_for(self, version: str) -> str:
+        if not VERSION_PATTERN.match(version):
+            raise ValueError(f"Nom de version invalide : {version}")
+        return os.path.join(self.models_dir, f"{version}.joblib")
+
+    def available(self) -> list:
+        """
+        Liste les versions présentes sur disque (artefacts .joblib non vides).
+        """
+
+        if not os.path.isdir(self.models_dir):
+            return []
+        return sorted(
+            name[:-len(".joblib")]
+            for name in os.listdir(self.models_dir)
+            if name.endswith(".joblib") and os.path.getsize(os.path.join(self.models_dir, name)) > 0
+        )
+
+    def load(self, version: str, activate: bool = False) -> ModelVersion:
+        """
+        Charge (et chauffe) une version, puis l'active éventuellement de manière atomique.
+
+        Si la version est déjà chargée avec le même contenu, l'instance existante est réutilisée.
+
+        Args:
+            version (str): Nom de la version.
+            activate (bool): Basculer la version active sur celle-ci une fois prête.
+
+        Returns:
+            ModelVersion: Version chargée.
+
+        Raises:
+            FileNotFoundError: Si l'artefact n'existe pas.
+        """
+
+        path = self.path_for(version)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Modèle introuvable à l’emplacement : {path}")
+
+        fingerprint = model_fingerprint(path)
+        with self._lock:
+            current = self._versions.get(version)
+            if current is not None and current.fingerprint == fingerprint:
+                if activate:
+                    self._activate(current)
+                return current
+            self._loading.add(version)
+
+        try:
+            # Chargement et chauffe hors verrou : les requêtes continuent sur les versions existantes.
+            # Le modèle est chargé depuis la copie figée, dont l'empreinte fait foi (fichier remplacé entre-temps)
+            artifact, fingerprint = snapshot_artifact(path, os.path.join(self.snapshot_dir, version))
+            model = load_model(artifact, engine=self.engine)
+            if self.warmup is not None:
+                self.warmup(model)
+            entry = ModelVersion(version, path, fingerprint, model, artifact)
+        finally:
+            with self._lock:
+                self._loading.discard(version)
+
+        with self._lock:
+            previous = self._versions.get(version)
+            self._versions[version] = entry
+            if previous is not None:
+                self._retire(previous)
+            if activate or (previous is not None and previous is self.active):
+                self._activate(entry)
+            self._collect()
+        print(f"Modèle chargé : {version} ({fingerprint})" + (" [actif]" if entry is self.active else ""))
+        return entry
+
+    def load_in_background(self, version: str, activate: bool = True) -> threading.Thread:
+        """
+        Lance le chargement d'une version dans un thread ; la bascule n'a lieu qu'une fois le modèle chauffé.
+        """
+
+        self.path_for(version)
+
+        def target():
+            try:
+                self.load(version, activate=activate)
+            except Exception as e:
+                print(f"Erreur lors du chargement du modèle {version} : {e}")
+
+        thread = threading.Thread(target=target, name=f"model-load-{version}", daemon=True)
+        thread.start()
+        return thread
+
+    def reload_if_changed(self):
+        """
+        Recharge la version active si son artefact a changé sur disque (ex. après un réentraînement).
+        """
+
+        active = self.active
+        if active is None or not os.path.exists(active.path):
+            return
+        if active.version in self._loading:
+            return
+        if model_fingerprint(active.path) != active.fingerprint:
+            self.load(active.version, activate=True)
+
+    def checkout(self, version: Optional[str] = None) -> ModelVersion:
+        """
+        Réserve une version pour une requête (version active par défaut) ; à libérer avec `release`.
+
+        Raises:
+            LookupError: Si la version demandée n'est pas chargée.
+        """
+
+        with self._lock:
+            if version is None:
+                entry = self.active
+                if entry is None:
+                    raise LookupError("Aucun modèle actif.")
+            else:
+                entry = self._versions.get(version)
+                if entry is None:
+                    raise LookupError(f"Version de modèle non chargée : {version}")
+            entry.in_flight += 1
+            entry.last_used = monotonic()
+            return entry
+
+    def release(self, entry: ModelVersion):
+        with self._lock:
+            entry.in_flight -= 1
+            entry.last_used = monotonic()
+            self._collect()
+
+    @contextmanager
+    def acquire(self, version: Optional[str] = None):
+        """
+        Contexte réservant une version le temps d'une requête.
+        """
+
+        entry = self.checkout(version)
+        try:
+            yield entry
+        finally:
+            self.release(entry)
+
+    def is_loaded(self, version: str) -> bool:
+        with self._lock:
+            return version in self._versions
+
+    def unload(self, version: str):
+        """
+        Décharge une version non active (différé tant que des requêtes l'utilisent).
+
+        Raises:
+            LookupError: Si la version n'est pas chargée.
+            ValueError: Si la version est active.
+        """
+
+        with self._lock:
+            entry = self._versions.get(version)
+            if entry is None:
+                raise LookupError(f"Version de modèle non chargée : {version}")
+            if entry is self.active:
+                raise ValueError("Impossible de décharger la version active.")
+            del self._versions[version]
+            self._retire(entry)
+            self._collect()
+
+    def describe(self) -> dict:
+        with self._lock:
+            return {
+                "active": self.active.version if self.active is not None else None,
+                "loaded": [entry.describe() for entry in self._versions.values()],
+                "retired": [entry.describe() for entry in self._retired],
+                "loading": sorted(self._loading),
+                "available": self.available(),
+            }
+
+    def _activate(self, entry: ModelVersion):
+        # Simple affectation sous verrou : les nouvelles requêtes voient la nouvelle version,
+        # celles en cours conservent la référence obtenue au checkout.
+        self.active = entry
+
+    def _retire(self, entry: ModelVersion):
+        entry.retired = True
+        self._retired.append(entry)
+
+    def _collect(self):
+        now = monotonic()
+        for version, entry in list(self._versions.items()):
+            idle = now - entry.last_used
+            if entry is not self.active and entry.in_flight == 0 and idle > self.idle_ttl:
+                del self._versions[version]
+                self._retire(entry)
+
+        still_used, collected = [], []
+        for entry in self._retired:
+            if entry.in_flight > 0:
+                still_used.append(entry)
+                continue
+            collected.append(entry)
+            for callback in self._on_unload:
+                callback(entry)
+            entry.model = None
+        self._retired = still_used
+
+        # Copies figées des versions déchargées (une même copie peut servir une version rechargée)
+        live = {entry.artifact for entry in [*self._versions.values(), *self._retired]}
+        root = self.snapshot_dir + os.sep
+        for entry in collected:
+            if entry.artifact not in live and entry.artifact.startswith(root) and os.path.exists(entry.artifact):
+                shutil.rmtree(os.path.dirname(entry.artifact), ignore_errors=True)
+
+    def _remove_stale_snapshots(self):
+        """
+        Supprime les copies figées laissées par des processus API terminés.
+        """
+
+        root = os.path.dirname(self.snapshot_dir)
+        if not os.path.isdir(root):
+            return
+        for name in os.listdir(root):
+            if not name.isdigit() or int(name) == os.getpid():
+                continue
+            try:
+                os.kill(int(name), 0)
+            except ProcessLookupError:
+                shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+            except PermissionError:
+                pass
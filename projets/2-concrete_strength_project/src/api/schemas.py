@@ -1,17 +1,30 @@
 # src/api/schemas.py
 
-from pydantic import BaseModel, conlist
-from typing import List
+from pydantic import BaseModel, Field, conlist, field_validator
+from typing import Dict, List, Optional
+
+from src.api.neighbors import MAX_NEIGHBORS
+from src.api.optimization import INGREDIENTS, MAX_POPULATION, MAX_TIME_BUDGET
+from src.features import ALL_FEATURES, BASE_FEATURES
 
 class PredictionInput(BaseModel):
     """
     Schéma d'entrée pour une prédiction unique.
 
     Attributs:
-        features (List[float]): Liste de 11 valeurs numériques correspondant aux features nécessaires,
-                                incluant les features dérivées (water_cement_ratio, binder, fine_to_coarse_ratio).
+        features (List[float]): Les 8 features de base dans l'ordre BASE_FEATURES
+                                (cement, slag, fly_ash, water, superplasticizer, coarse_aggregate, fine_aggregate, age).
+                                Les features dérivées sont calculées par l'API ; par compatibilité, une liste
+                                de 11 valeurs est encore acceptée, mais ses 3 dernières valeurs sont ignorées.
     """
-    features: conlist(float, min_length=11, max_length=11)  # type: ignore
+    features: conlist(float, min_length=len(BASE_FEATURES), max_length=len(ALL_FEATURES))  # type: ignore
+
+    @field_validator("features")
+    @classmethod
+    def check_length(cls, features):
+        if len(features) not in (len(BASE_FEATURES), len(ALL_FEATURES)):
+            raise ValueError(f"{len(BASE_FEATURES)} features de base attendues (ou {len(ALL_FEATURES)} avec les dérivées).")
+        return features
 
 class PredictionOutput(BaseModel):
     """
@@ -32,3 +45,234 @@ class BatchPredictionOutput(BaseModel):
     """
     
     predicted_strengths_MPa: List[float]
+
+class MixOptimizationInput(BaseModel):
+    """
+    Schéma d'entrée pour la recherche de formulation (/optimize-mix).
+
+    Attributs:
+        target_strength_MPa (float): Résistance à atteindre (MPa).
+        age (float): Âge (jours) auquel la résistance doit être atteinte (28 par défaut).
+        bounds (Dict[str, List[float]]): Bornes [min, max] (kg/m³) par constituant ; bornes du jeu d'entraînement par défaut.
+                                         Un constituant peut être fixé avec min = max.
+        costs (Dict[str, float]): Coût par kg de chaque constituant (par défaut : ciment seul, à 1).
+        population (int): Nombre de mélanges évalués par génération.
+        time_budget_s (float): Durée maximale de la recherche (s).
+        max_generations (int): Nombre maximal de générations.
+        max_pareto (int): Nombre maximal de mélanges renvoyés sur le front de Pareto.
+        seed (int, optionnel): Graine pour une recherche reproductible.
+    """
+
+    target_strength_MPa: float = Field(..., gt=0)
+    age: float = Field(28.0, gt=0)
+    bounds: Dict[str, conlist(float, min_length=2, max_length=2)] = {}  # type: ignore
+    costs: Optional[Dict[str, float]] = None
+    population: int = Field(1000, ge=10, le=MAX_POPULATION)
+    time_budget_s: float = Field(2.0, gt=0, le=MAX_TIME_BUDGET)
+    max_generations: int = Field(200, ge=0, le=100_000)
+    max_pareto: int = Field(20, ge=1, le=500)
+    seed: Optional[int] = None
+
+    @field_validator("bounds")
+    @classmethod
+    def check_bounds(cls, bounds):
+        for name, (low, high) in bounds.items():
+            if name not in INGREDIENTS:
+                raise ValueError(f"Constituant inconnu : {name} (attendu : {', '.join(INGREDIENTS)})")
+            if not 0 <= low <= high:
+                raise ValueError(f"Bornes invalides pour {name} : 0 <= min <= max attendu.")
+        return bounds
+
+    @field_validator("costs")
+    @classmethod
+    def check_costs(cls, costs):
+        for name, cost in (costs or {}).items():
+            if name not in INGREDIENTS:
+                raise ValueError(f"Constituant inconnu : {name} (attendu : {', '.join(INGREDIENTS)})")
+            if cost < 0:
+                raise ValueError(f"Coût négatif pour {name}.")
+        return costs
+
+class MixCandidate(BaseModel):
+    """
+    Mélange proposé par la recherche de formulation.
+
+    Attributs:
+        mix (Dict[str, float]): Dosage de chaque constituant (kg/m³).
+        predicted_strength_MPa (float): Résistance prédite à l'âge demandé.
+        cost (float): Coût du mélange selon les coûts fournis.
+    """
+
+    mix: Dict[str, float]
+    predicted_strength_MPa: float
+    cost: float
+
+class MixOptimizationOutput(BaseModel):
+    """
+    Schéma de sortie de la recherche de formulation.
+
+    Attributs:
+        feasible (bool): Au moins un mélange atteint la résistance cible.
+        best (MixCandidate, optionnel): Mélange conforme le moins cher.
+        pareto (List[MixCandidate]): Front de Pareto coût / résistance des mélanges conformes, par coût croissant.
+        max_strength_MPa (float): Meilleure résistance prédite rencontrée (utile si aucun mélange n'est conforme).
+        generations (int): Générations effectuées.
+        evaluations (int): Mélanges évalués par le modèle.
+        elapsed_s (float): Durée de la recherche (s).
+    """
+
+    feasible: bool
+    best: Optional[MixCandidate]
+    pareto: List[MixCandidate]
+    max_strength_MPa: float
+    generations: int
+    evaluations: int
+    elapsed_s: float
+
+# Âges d'échéance usuels (jours) utilisés par défaut pour les courbes de résistance
+STANDARD_AGES = [1.0, 3.0, 7.0, 14.0, 28.0, 56.0, 90.0, 180.0, 365.0]
+
+class StrengthCurveInput(BaseModel):
+    """
+    Schéma d'entrée pour les courbes de montée en résistance (/strength-curve).
+
+    Attributs:
+        mixes (List[List[float]]): Mélanges, chacun donnant les 7 constituants dans l'ordre BASE_FEATURES
+                                   (sans l'âge) ; une liste de 8 valeurs est acceptée, son âge est ignoré.
+        ages (List[float]): Grille d'âges (jours) évaluée pour chaque mélange.
+    """
+
+    mixes: List[conlist(float, min_length=len(BASE_FEATURES) - 1, max_length=len(BASE_FEATURES))] = Field(..., min_length=1)  # type: ignore
+    ages: List[float] = Field(default_factory=lambda: list(STANDARD_AGES), min_length=1, max_length=1000)
+
+    @field_validator("mixes")
+    @classmethod
+    def check_mixes(cls, mixes):
+        if len({len(mix) for mix in mixes}) > 1:
+            raise ValueError("Tous les mélanges doivent avoir le même nombre de valeurs (7 ou 8).")
+        return mixes
+
+    @field_validator("ages")
+    @classmethod
+    def check_ages(cls, ages):
+        if any(age <= 0 for age in ages):
+            raise ValueError("Les âges doivent être strictement positifs.")
+        return ages
+
+class StrengthCurveOutput(BaseModel):
+    """
+    Schéma de sortie des courbes de résistance, en tableaux colonnaires.
+
+    Attributs:
+        ages (List[float]): Grille d'âges évaluée.
+        predicted_strengths_MPa (List[List[float]]): Une ligne par mélange, une valeur par âge de la grille.
+    """
+
+    ages: List[float]
+    predicted_strengths_MPa: List[List[float]]
+
+class SensitivityInput(BaseModel):
+    """
+    Schéma d'entrée de l'analyse de sensibilité locale (/sensitivity).
+
+    Attributs:
+        features (List[float]): Mélange de référence, 8 features de base dans l'ordre BASE_FEATURES.
+        vary (List[str], optionnel): Features de base à faire varier (toutes par défaut).
+        n_points (int): Nombre de points de la grille de chaque feature.
+        span (float): Demi-largeur de la grille, en fraction de la plage de la feature.
+    """
+
+    features: conlist(float, min_length=len(BASE_FEATURES), max_length=len(BASE_FEATURES))  # type: ignore
+    vary: Optional[List[str]] = None
+    n_points: int = Field(21, ge=2, le=1000)
+    span: float = Field(0.2, gt=0, le=1)
+
+    @field_validator("vary")
+    @classmethod
+    def check_vary(cls, vary):
+        if vary is not None:
+            unknown = set(vary) - set(BASE_FEATURES)
+            if unknown:
+                raise ValueError(f"Features inconnues : {sorted(unknown)} (attendues : {BASE_FEATURES}).")
+            if not vary:
+                raise ValueError("Au moins une feature à faire varier est requise.")
+        return vary
+
+class FeatureCurve(BaseModel):
+    """
+    Courbe de réponse du modèle à une feature.
+
+    Attributs:
+        values (List[float]): Valeurs de la feature évaluées.
+        predicted_strengths_MPa (List[float]): Prédiction (ou prédiction moyenne) à chaque valeur.
+        slope_MPa_per_unit (float, optionnel): Pente locale (régression linéaire sur la grille).
+        elasticity (float, optionnel): Variation relative de la prédiction pour une variation relative de la feature.
+    """
+
+    values: List[float]
+    predicted_strengths_MPa: List[float]
+    slope_MPa_per_unit: Optional[float] = None
+    elasticity: Optional[float] = None
+
+class SensitivityOutput(BaseModel):
+    """
+    Schéma de sortie de l'analyse de sensibilité locale.
+
+    Attributs:
+        base_prediction_MPa (float): Prédiction du mélange de référence.
+        sensitivities (Dict[str, FeatureCurve]): Courbe, pente et élasticité par feature.
+    """
+
+    base_prediction_MPa: float
+    sensitivities: Dict[str, FeatureCurve]
+
+class PartialDependenceOutput(BaseModel):
+    """
+    Schéma de sortie des courbes de dépendance partielle globales.
+
+    Attributs:
+        reference (str): Source des données de référence (chemin du CSV ou 'synthetic').
+        reference_rows (int): Nombre de mélanges de référence moyennés.
+        cached (bool): Courbes servies depuis le cache du modèle.
+        curves (Dict[str, FeatureCurve]): Courbe de dépendance partielle par feature.
+    """
+
+    reference: str
+    reference_rows: int
+    cached: bool
+    curves: Dict[str, FeatureCurve]
+
+class SimilarMixesInput(BaseModel):
+    """
+    Schéma d'entrée de la recherche des mélanges historiques similaires (/similar-mixes).
+
+    Attributs:
+        mixes (List[List[float]]): Mélanges recherchés, 8 features de base chacun dans l'ordre BASE_FEATURES.
+        k (int): Nombre de mélanges historiques renvoyés par mélange.
+    """
+
+    mixes: List[conlist(float, min_length=len(BASE_FEATURES), max_length=len(BASE_FEATURES))] = Field(..., min_length=1, max_length=10_000)  # type: ignore
+    k: int = Field(5, ge=1, le=MAX_NEIGHBORS)
+
+class SimilarMix(BaseModel):
+    """
+    Mélange historique testé en laboratoire.
+
+    Attributs:
+        id (int): Identifiant du mélange dans la source (table ou CSV).
+        mix (Dict[str, float]): Features de base du mélange.
+        measured_strength_MPa (float): Résistance mesurée.
+        distance (float): Distance au mélange recherché, dans l'espace des features standardisées.
+    """
+
+    id: int
+    mix: Dict[str, float]
+    measured_strength_MPa: float
+    distance: float
+
+class SimilarMixesOutput(BaseModel):
+    """
+    Schéma de sortie : pour chaque mélange recherché, ses voisins historiques du plus proche au plus éloigné.
+    """
+
+    neighbors: List[List[SimilarMix]]
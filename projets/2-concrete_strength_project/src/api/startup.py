@@ -0,0 +1,106 @@
+# src/api/startup.py
+
+import os
+import threading
+from contextlib import contextmanager
+from time import perf_counter
+from typing import Callable, Optional
+
+"""
+Suivi du démarrage de l'API : disponibilité (readiness) distincte de la vivacité (liveness),
+et décomposition du temps de démarrage par phase (imports, chargement du modèle, chauffe, exécuteur).
+
+En mode paresseux (API_LAZY_STARTUP=1), les imports lourds (pandas, joblib, sklearn, xgboost) et le
+chargement du modèle sont exécutés dans un thread de fond : uvicorn répond immédiatement aux sondes
+de vivacité, et les endpoints de prédiction renvoient 503 tant que le modèle n'est pas prêt et chauffé.
+"""
+
+API_LAZY_STARTUP = os.getenv("API_LAZY_STARTUP", "0") == "1"
+
+
+class StartupState:
+    """
+    État du démarrage : phases chronométrées, disponibilité et éventuelle erreur.
+    """
+
+    def __init__(self):
+        self.started_at = perf_counter()
+        self.phases = {}
+        self.ready = False
+        self.error: Optional[str] = None
+        self.ready_after: Optional[float] = None
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @contextmanager
+    def phase(self, name: str):
+        """
+        Chronomètre une phase du démarrage (les durées d'une même phase s'additionnent ;
+        une phase imbriquée, comme la chauffe dans le chargement du modèle, est aussi comptée dans la phase parente).
+        """
+
+        with self._lock:
+            self.phases.setdefault(name, 0.0)
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = perf_counter() - start
+            with self._lock:
+                self.phases[name] = self.phases.get(name, 0.0) + elapsed
+
+    def mark_ready(self):
+        with self._lock:
+            self.ready = True
+            self.ready_after = perf_counter() - self.started_at
+        self.report()
+
+    def mark_failed(self, error: Exception):
+        with self._lock:
+            self.error = str(error)
+        print(f"Échec du démarrage : {error}")
+
+    def run_in_background(self, target: Callable[[], None]) -> threading.Thread:
+        """
+        Exécute la séquence de démarrage dans un thread, puis marque l'API comme prête (ou en échec).
+        """
+
+        def run():
+            try:
+                target()
+            except Exception as e:
+                self.mark_failed(e)
+            else:
+                self.mark_ready()
+
+        self._thread = threading.Thread(target=run, name="api-startup", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Attend la fin du démarrage en arrière-plan (utile pour les scripts et l'arrêt).
+        """
+
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return self.ready
+
+    def describe(self) -> dict:
+        with self._lock:
+            return {
+                "ready": self.ready,
+                "error": self.error,
+                "ready_after_s": round(self.ready_after, 3) if self.ready_after is not None else None,
+                "phases_s": {name: round(seconds, 3) for name, seconds in self.phases.items()},
+            }
+
+    def report(self):
+        """
+        Affiche la décomposition du temps de démarrage.
+        """
+
+        with self._lock:
+            parts = [f"{name} {seconds:.2f} s" for name, seconds in self.phases.items()]
+            total = self.ready_after if self.ready_after is not None else perf_counter() - self.started_at
+        print(f"Démarrage de l'API : {' | '.join(parts)} | prêt en {total:.2f} s")
@@ -0,0 +1,89 @@
+# src/benchmarks/inference.py
+
+import argparse
+import os
+import sys
+from time import perf_counter
+
+import joblib
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.features import add_derived_features
+from src.ml.native_inference import compile_pipeline
+
+"""
+Benchmark du moteur d'inférence natif face au pipeline joblib (sklearn/XGBoost).
+
+Pour chaque taille de lot, mesure la latence médiane de `pipeline.predict(DataFrame)`
+et de `NativeModel.predict(ndarray)`, puis vérifie l'écart maximal entre les deux prédictions.
+
+Exemple d'exécution (depuis la racine du projet) :
+    python -m src.benchmarks.inference --model models/best_model.joblib --sizes 1 100 10000
+"""
+
+MODEL_PATH = os.path.join("models", "best_model.joblib")
+DATA_PATH = os.path.join("data", "processed", "concrete_data_clean.csv")
+
+# Bornes approximatives des composants (kg/m³, jours) pour générer des mélanges synthétiques
+FEATURE_RANGES = {
+    "cement": (100, 540), "slag": (0, 360), "fly_ash": (0, 200), "water": (120, 250),
+    "superplasticizer": (0, 32), "coarse_aggregate": (800, 1150), "fine_aggregate": (590, 1000),
+    "age": (1, 365),
+}
+
+
+def make_inputs(feature_names, n_rows, seed=42):
+    """
+    Construit un DataFrame d'entrée : lignes du jeu nettoyé si disponible, sinon mélanges aléatoires.
+    """
+
+    if os.path.exists(DATA_PATH):
+        df = pd.read_csv(DATA_PATH)
+        return df.sample(n_rows, replace=True, random_state=seed)[feature_names].reset_index(drop=True)
+
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({name: rng.uniform(lo, hi, n_rows) for name, (lo, hi) in FEATURE_RANGES.items()})
+    return add_derived_features(df)[feature_names]
+
+
+def time_call(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = perf_counter()
+        fn()
+        timings.append(perf_counter() - start)
+    return float(np.median(timings))
+
+
+def main(model_path, sizes, repeat):
+    print(f"Chargement du pipeline depuis : {model_path}")
+    pipeline = joblib.load(model_path)
+
+    start = perf_counter()
+    native_model = compile_pipeline(pipeline)
+    print(f"Compilation native : {(perf_counter() - start) * 1000:.1f} ms ({type(pipeline[-1]).__name__})\n")
+
+    feature_names = list(pipeline.feature_names_in_)
+    print(f"{'lignes':>8} | {'joblib (ms)':>12} | {'natif (ms)':>11} | {'gain':>6} | {'écart max':>10}")
+    print("-" * 60)
+    for n_rows in sizes:
+        df = make_inputs(feature_names, n_rows)
+        X = df.to_numpy(dtype=np.float64)
+
+        max_diff = float(np.abs(pipeline.predict(df) - native_model.predict(X)).max())
+        t_joblib = time_call(lambda: pipeline.predict(df), repeat)
+        t_native = time_call(lambda: native_model.predict(X), repeat)
+        print(f"{n_rows:>8} | {t_joblib * 1000:>12.3f} | {t_native * 1000:>11.3f} | "
+              f"{t_joblib / t_native:>5.1f}x | {max_diff:>10.2e}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark du moteur d'inférence natif face au pipeline joblib.")
+    parser.add_argument("--model", default=MODEL_PATH, help="Chemin du pipeline .joblib à comparer.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 10, 100, 1000, 10000], help="Tailles de lot testées.")
+    parser.add_argument("--repeat", type=int, default=20, help="Nombre de répétitions par mesure.")
+    args = parser.parse_args()
+    main(args.model, args.sizes, args.repeat)
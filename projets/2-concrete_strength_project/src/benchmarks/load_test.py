@@ -0,0 +1,328 @@
+# src/benchmarks/load_test.py
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import socket
+import subprocess
+import sys
+import time
+from time import perf_counter
+
+import httpx
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.benchmarks.inference import FEATURE_RANGES
+from src.features import BASE_FEATURES
+
+"""
+Test de charge et détection de régressions de latence de l'API.
+
+Trois modes d'exécution :
+- par défaut, l'application `src.api.main:app` est chargée dans le processus et appelée via
+  `httpx.ASGITransport` (pas de réseau ; client et serveur partagent la boucle d'évènements) ;
+- `--spawn` démarre uvicorn sur un port libre de localhost et le pilote en HTTP ;
+- `--url` cible un serveur déjà lancé (mémoire du serveur non mesurée).
+
+Chaque scénario (`predict`, `predict-batch`) est joué pendant `--duration` secondes par `--concurrency`
+clients concurrents, après une phase de chauffe. Le rapport donne le débit (requêtes/s et lignes/s),
+les latences p50/p95/p99, le taux d'erreur et le pic mémoire (RSS) du serveur.
+
+Les résultats peuvent être sauvegardés en JSON (`--output`) puis comparés à une référence (`--baseline`) :
+le script échoue (code 1) si le débit baisse ou si p95/p99 ou la mémoire augmentent au-delà de `--tolerance`.
+
+Exemple d'exécution (depuis la racine du projet) :
+    python -m src.benchmarks.load_test --concurrency 16 --duration 20 --output benchmarks/baseline.json
+    python -m src.benchmarks.load_test --concurrency 16 --duration 20 --baseline benchmarks/baseline.json
+"""
+
+SCENARIOS = ("predict", "predict-batch")
+
+# Métriques comparées à la référence : (clé, sens de l'amélioration)
+COMPARED_METRICS = (
+    ("throughput_rps", "higher"),
+    ("p95_ms", "lower"),
+    ("p99_ms", "lower"),
+    ("peak_rss_mb", "lower"),
+)
+
+# Variables d'environnement de configuration de l'API enregistrées avec les résultats
+ENV_KEYS = {
+    "INFERENCE_ENGINE", "INFERENCE_EXECUTOR", "INFERENCE_WORKERS", "MODEL_MMAP", "PREDICT_BATCHING",
+    "PREDICT_BATCH_MAX_SIZE", "PREDICT_BATCH_MAX_WAIT_MS", "PREDICTION_CACHE_SIZE", "PREDICTION_CACHE_PRECISION",
+    "PREDICTION_CACHE_TTL", "PREDICTION_LOG_ENABLED", "GZIP_MIN_SIZE", "METRICS_ENABLED",
+}
+
+
+def make_mixes(n_rows, seed=0):
+    """
+    Génère des mélanges aléatoires (features de base uniquement).
+    """
+
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({name: rng.uniform(*FEATURE_RANGES[name], n_rows) for name in BASE_FEATURES})
+
+
+def build_requests(scenario, batch_rows, seed=0):
+    """
+    Prépare une liste de requêtes (méthode, chemin, kwargs httpx) parcourue cycliquement par les clients.
+    Les charges utiles sont sérialisées une fois pour toutes, hors de la mesure.
+    """
+
+    if scenario == "predict":
+        mixes = make_mixes(256, seed).round(2).to_numpy().tolist()
+        return [("POST", "/predict", {"json": {"features": mix}}) for mix in mixes], 1
+
+    csv = make_mixes(batch_rows, seed).round(2).to_csv(index=False).encode()
+    return [("POST", "/predict-batch", {"files": {"file": ("batch.csv", csv, "text/csv")}})], batch_rows
+
+
+async def run_scenario(client, scenario, concurrency, duration, warmup, batch_rows):
+    """
+    Joue un scénario : `concurrency` clients envoient des requêtes en boucle pendant `duration` secondes.
+
+    Returns:
+        dict: Débit, latences (ms), erreurs et nombre de requêtes.
+    """
+
+    requests, rows_per_request = build_requests(scenario, batch_rows)
+    latencies = []
+    errors = 0
+
+    async def worker(worker_id, deadline, record):
+        nonlocal errors
+        i = worker_id
+        while perf_counter() < deadline:
+            method, path, kwargs = requests[i % len(requests)]
+            i += concurrency
+            start = perf_counter()
+            try:
+                response = await client.request(method, path, **kwargs)
+                ok = response.status_code == 200
+            except httpx.HTTPError:
+                ok = False
+            if record:
+                latencies.append(perf_counter() - start)
+                errors += not ok
+
+    if warmup > 0:
+        deadline = perf_counter() + warmup
+        await asyncio.gather(*(worker(i, deadline, False) for i in range(concurrency)))
+
+    start = perf_counter()
+    deadline = start + duration
+    await asyncio.gather(*(worker(i, deadline, True) for i in range(concurrency)))
+    elapsed = perf_counter() - start
+
+    timings_ms = np.asarray(latencies) * 1000
+    n_requests = len(latencies)
+    ok_requests = n_requests - errors
+    p50, p95, p99 = np.percentile(timings_ms, [50, 95, 99]) if n_requests else (float("nan"),) * 3
+    return {
+        "scenario": scenario,
+        "concurrency": concurrency,
+        "rows_per_request": rows_per_request,
+        "duration_s": round(elapsed, 3),
+        "requests": n_requests,
+        "errors": errors,
+        "error_rate": round(errors / n_requests, 4) if n_requests else 0.0,
+        "throughput_rps": round(ok_requests / elapsed, 2),
+        "rows_per_s": round(ok_requests * rows_per_request / elapsed, 2),
+        "p50_ms": round(float(p50), 3),
+        "p95_ms": round(float(p95), 3),
+        "p99_ms": round(float(p99), 3),
+        "max_ms": round(float(timings_ms.max()), 3) if n_requests else float("nan"),
+    }
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port, timeout=60.0):
+    """
+    Démarre uvicorn sur localhost dans un sous-processus et attend qu'il réponde.
+    """
+
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "src.api.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning"],
+    )
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Le serveur s'est arrêté au démarrage (code {process.returncode}).")
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/", timeout=1.0)
+            return process
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    process.terminate()
+    raise TimeoutError("Le serveur n'a pas démarré à temps.")
+
+
+def peak_rss_mb(pid=None):
+    """
+    Pic de mémoire résidente (VmHWM) d'un processus, ou du processus courant si `pid` est None.
+    """
+
+    if pid is None:
+        # ru_maxrss est en kilo-octets sous Linux, en octets sous macOS
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return round(maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return None
+
+
+async def run(args):
+    server = None
+    server_pid = None
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=args.timeout)
+        mode = "url"
+    elif args.spawn:
+        port = free_port()
+        server = start_server(port)
+        server_pid = server.pid
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        client = httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=args.timeout, limits=limits)
+        mode = "spawn"
+    else:
+        from src.api.main import app
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://app", timeout=args.timeout)
+        mode = "in-process"
+
+    results = []
+    try:
+        if mode == "in-process":
+            # Le transport ASGI n'exécute pas le lifespan : démarrage explicite (exécuteur, batcher...)
+            async with app.router.lifespan_context(app):
+                for scenario in args.scenarios:
+                    results.append(await run_scenario(
+                        client, scenario, args.concurrency, args.duration, args.warmup, args.batch_rows))
+        else:
+            for scenario in args.scenarios:
+                results.append(await run_scenario(
+                    client, scenario, args.concurrency, args.duration, args.warmup, args.batch_rows))
+    finally:
+        await client.aclose()
+        peak = peak_rss_mb(server_pid) if mode != "url" else None
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+
+    for result in results:
+        result["peak_rss_mb"] = peak
+
+    return {
+        "mode": mode,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "env": {key: os.environ[key] for key in sorted(os.environ) if key in ENV_KEYS},
+        "results": results,
+    }
+
+
+def compare(report, baseline, tolerance):
+    """
+    Compare un rapport à une référence scénario par scénario.
+
+    Returns:
+        list[str]: Régressions détectées (vide si aucune).
+    """
+
+    if baseline.get("mode") != report["mode"]:
+        print(f"Attention : référence mesurée en mode '{baseline.get('mode')}', rapport en mode '{report['mode']}'.")
+    baseline_env, report_env = baseline.get("env", {}), report.get("env", {})
+    for key in sorted(set(baseline_env) | set(report_env)):
+        if baseline_env.get(key) != report_env.get(key):
+            print(f"Attention : configuration différente, {key} = {baseline_env.get(key)!r} (référence) "
+                  f"/ {report_env.get(key)!r} (rapport).")
+
+    regressions = []
+    reference = {result["scenario"]: result for result in baseline.get("results", [])}
+    for result in report["results"]:
+        base = reference.get(result["scenario"])
+        if base is None:
+            print(f"[{result['scenario']}] absent de la référence, comparaison ignorée.")
+            continue
+        for key, better in COMPARED_METRICS:
+            current, previous = result.get(key), base.get(key)
+            if current is None or previous is None or not previous:
+                continue
+            change = (current - previous) / previous
+            worse = change < -tolerance if better == "higher" else change > tolerance
+            status = "RÉGRESSION" if worse else "ok"
+            print(f"[{result['scenario']}] {key:<15} {previous:>10.2f} -> {current:>10.2f} ({change:+.1%}) {status}")
+            if worse:
+                regressions.append(f"{result['scenario']}.{key} : {previous} -> {current} ({change:+.1%})")
+    return regressions
+
+
+def print_report(report):
+    print(f"\nMode : {report['mode']} | CPU : {report['cpu_count']} | Python {report['python']}")
+    print(f"{'scénario':<14} | {'req/s':>9} | {'lignes/s':>10} | {'p50 (ms)':>9} | {'p95 (ms)':>9} | "
+          f"{'p99 (ms)':>9} | {'erreurs':>7} | {'RSS max (Mo)':>12}")
+    print("-" * 100)
+    for r in report["results"]:
+        rss = f"{r['peak_rss_mb']:.1f}" if r["peak_rss_mb"] is not None else "n/a"
+        print(f"{r['scenario']:<14} | {r['throughput_rps']:>9.1f} | {r['rows_per_s']:>10.1f} | {r['p50_ms']:>9.2f} | "
+              f"{r['p95_ms']:>9.2f} | {r['p99_ms']:>9.2f} | {r['errors']:>7} | {rss:>12}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Test de charge et détection de régressions de latence de l'API.")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS), help="Scénarios à jouer.")
+    parser.add_argument("--concurrency", type=int, default=8, help="Nombre de clients concurrents.")
+    parser.add_argument("--duration", type=float, default=10.0, help="Durée de mesure par scénario (s).")
+    parser.add_argument("--warmup", type=float, default=2.0, help="Durée de chauffe non mesurée par scénario (s).")
+    parser.add_argument("--batch-rows", type=int, default=1000, help="Lignes par fichier CSV pour /predict-batch.")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Délai maximal par requête (s).")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--url", help="URL d'un serveur déjà lancé (ex. http://localhost:8000).")
+    target.add_argument("--spawn", action="store_true", help="Démarre uvicorn sur localhost pour la mesure.")
+    parser.add_argument("--output", help="Fichier JSON où sauvegarder les résultats.")
+    parser.add_argument("--baseline", help="Fichier JSON de référence à comparer.")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Écart relatif toléré avant régression (0.10 = 10 %%).")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    print_report(report)
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nRésultats sauvegardés dans : {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        print(f"\nComparaison avec la référence : {args.baseline} (tolérance {args.tolerance:.0%})")
+        regressions = compare(report, baseline, args.tolerance)
+        if regressions:
+            print("\nRégressions détectées :")
+            for regression in regressions:
+                print(f" - {regression}")
+            sys.exit(1)
+        print("\nAucune régression détectée.")
+
+
+if __name__ == "__main__":
+    main()
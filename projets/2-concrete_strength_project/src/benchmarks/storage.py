@@ -0,0 +1,93 @@
+# src/benchmarks/storage.py
+
+import argparse
+import os
+import sys
+import tempfile
+from time import perf_counter
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.features import BASE_FEATURES, add_derived_features
+from src.storage import read_table, write_table
+
+"""
+Benchmark des formats de stockage : CSV, Parquet (float64 / float32) et Arrow IPC projeté en mémoire.
+
+Le jeu nettoyé (ou des mélanges synthétiques s'il est absent) est répliqué jusqu'à la taille demandée,
+écrit dans chaque format, puis relu : toutes les colonnes (lecture de l'entraînement) et seulement
+deux colonnes (projection). Affiche la taille des fichiers et le temps médian de lecture suivie d'un
+parcours des valeurs (somme par colonne) : sans ce parcours, la lecture Arrow projetée en mémoire serait
+quasi instantanée, les pages du fichier n'étant chargées qu'au premier accès.
+
+Exemple d'exécution (depuis la racine du projet) :
+    python -m src.benchmarks.storage --rows 10000 1000000
+"""
+
+DATA_PATH = os.path.join("data", "processed", "concrete_data_clean.csv")
+
+# Colonnes lues dans le scénario « projection »
+PROJECTED_COLUMNS = ["cement", "strength"]
+
+# (nom, extension, précision)
+VARIANTS = [
+    ("csv", ".csv", "float64"),
+    ("parquet", ".parquet", "float64"),
+    ("parquet f32", ".parquet", "float32"),
+    ("arrow", ".arrow", "float64"),
+    ("arrow f32", ".arrow", "float32"),
+]
+
+
+def make_dataset(n_rows, seed=42):
+    """
+    Jeu nettoyé rééchantillonné à n_rows lignes si disponible, sinon mélanges aléatoires.
+    """
+
+    rng = np.random.default_rng(seed)
+    if os.path.exists(DATA_PATH):
+        df = pd.read_csv(DATA_PATH)
+        return df.iloc[rng.integers(0, len(df), n_rows)].reset_index(drop=True)
+
+    df = pd.DataFrame({name: rng.uniform(1, 1000, n_rows) for name in BASE_FEATURES})
+    df = add_derived_features(df)
+    df["strength"] = rng.uniform(2, 80, n_rows)
+    return df
+
+
+def time_call(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = perf_counter()
+        fn()
+        timings.append(perf_counter() - start)
+    return float(np.median(timings))
+
+
+def main(sizes, repeat):
+    print(f"{'lignes':>9} | {'format':<12} | {'taille (Mo)':>11} | {'lecture (ms)':>12} | {'2 colonnes (ms)':>15} | {'gain':>6}")
+    print("-" * 81)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for n_rows in sizes:
+            df = make_dataset(n_rows)
+            baseline = None
+            for name, extension, precision in VARIANTS:
+                path = os.path.join(tmp_dir, f"{name.replace(' ', '_')}_{n_rows}{extension}")
+                write_table(df, path, precision)
+                t_full = time_call(lambda: read_table(path).sum(), repeat)
+                t_projected = time_call(lambda: read_table(path, columns=PROJECTED_COLUMNS).sum(), repeat)
+                baseline = baseline or t_full
+                print(f"{n_rows:>9} | {name:<12} | {os.path.getsize(path) / 1e6:>11.2f} | {t_full * 1000:>12.2f} | "
+                      f"{t_projected * 1000:>15.2f} | {baseline / t_full:>5.1f}x")
+                os.remove(path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark des formats de stockage (CSV, Parquet, Arrow).")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 100_000, 1_000_000], help="Tailles de jeu testées.")
+    parser.add_argument("--repeat", type=int, default=5, help="Nombre de répétitions par mesure.")
+    args = parser.parse_args()
+    main(args.rows, args.repeat)
@@ -0,0 +1,174 @@
+# src/benchmarks/worker_memory.py
+
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.api.model_loader import MODEL_PATH, load_mapped_model, load_model
+from src.benchmarks.inference import FEATURE_RANGES
+from src.features import ALL_FEATURES, BASE_FEATURES, build_feature_matrix
+
+"""
+Mesure de la mémoire par worker selon le mode de chargement du modèle.
+
+Lance N processus (comme N workers uvicorn/gunicorn) qui chargent tous le même modèle, prédisent un lot
+(pour toucher toutes les pages du modèle), puis relèvent simultanément leur mémoire dans
+/proc/self/smaps_rollup (Linux) :
+- RSS : mémoire résidente, pages partagées comprises (compte chaque page partagée dans chaque worker) ;
+- PSS : part proportionnelle, chaque page partagée étant divisée par le nombre de processus qui la projettent.
+  La somme des PSS est la mémoire réellement consommée par l'ensemble des workers.
+
+La colonne « modèle » est l'accroissement de PSS dû au chargement du modèle (bibliothèques importées avant).
+
+Modes comparés :
+- sklearn : `joblib.load` du pipeline (une copie par worker) ;
+- native : pipeline compilé en tableaux NumPy, copié dans chaque worker ;
+- mmap : tableaux compilés projetés en mémoire en lecture seule (pages partagées entre workers).
+
+Exemple d'exécution (depuis la racine du projet) :
+    python -m src.benchmarks.worker_memory --workers 4
+    python -m src.benchmarks.worker_memory --workers 4 --forest-trees 300 --check
+"""
+
+MODES = ("sklearn", "native", "mmap")
+
+
+def read_memory_kb():
+    """
+    Lit Rss et Pss (en ko) du processus courant.
+    """
+
+    values = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if parts[0] in ("Rss:", "Pss:"):
+                values[parts[0][:-1].lower()] = int(parts[1])
+    return values
+
+
+def worker(mode, model_path, mmap_dir, X, loaded, measure, results, done):
+    # Bibliothèques importées avant la première mesure : seul le modèle est compté dans l'écart
+    import joblib  # noqa: F401
+    import pandas  # noqa: F401
+    import sklearn.pipeline  # noqa: F401
+    import xgboost  # noqa: F401
+
+    before = read_memory_kb()
+    if mode == "mmap":
+        model = load_mapped_model(model_path, mmap_dir)
+    else:
+        model = load_model(model_path, engine=mode, mmap=False)
+    model.predict(pandas.DataFrame(X, columns=ALL_FEATURES) if mode == "sklearn" else X)
+
+    loaded.wait()
+    measure.wait()
+    after = read_memory_kb()
+    results.put({"pid": os.getpid(), "rss": after["rss"], "pss": after["pss"], "model_pss": after["pss"] - before["pss"]})
+    done.wait()
+
+
+def measure_mode(mode, model_path, mmap_dir, X, n_workers):
+    """
+    Démarre n_workers processus pour un mode et retourne leurs relevés mémoire pris simultanément.
+    """
+
+    ctx = multiprocessing.get_context("spawn")
+    loaded = ctx.Barrier(n_workers + 1)
+    measure, done = ctx.Event(), ctx.Event()
+    results = ctx.Queue()
+    processes = [
+        ctx.Process(target=worker, args=(mode, model_path, mmap_dir, X, loaded, measure, results, done))
+        for _ in range(n_workers)
+    ]
+    for process in processes:
+        process.start()
+    try:
+        # Tous les workers ont chargé le modèle : relevé simultané
+        loaded.wait(timeout=300)
+        measure.set()
+        return [results.get(timeout=60) for _ in processes]
+    finally:
+        done.set()
+        for process in processes:
+            process.join(timeout=30)
+
+
+def train_synthetic_forest(n_trees, path, n_rows=5000, seed=0):
+    """
+    Entraîne une forêt aléatoire sur des mélanges synthétiques, pour mesurer un modèle volumineux.
+    """
+
+    import joblib
+    import pandas as pd
+    from sklearn.ensemble import RandomForestRegressor
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import StandardScaler
+
+    rng = np.random.default_rng(seed)
+    X = build_feature_matrix(np.column_stack([rng.uniform(*FEATURE_RANGES[name], n_rows) for name in BASE_FEATURES]))
+    y = 0.1 * X[:, 0] - 0.05 * X[:, 3] + 5 * np.log1p(X[:, 7]) + rng.normal(0, 3, n_rows)
+    pipeline = Pipeline([
+        ("scaler", StandardScaler()),
+        ("model", RandomForestRegressor(n_estimators=n_trees, random_state=seed, n_jobs=-1)),
+    ])
+    pipeline.fit(pd.DataFrame(X, columns=ALL_FEATURES), y)
+    joblib.dump(pipeline, path)
+    print(f"Forêt synthétique de {n_trees} arbres : {os.path.getsize(path) / 1e6:.1f} Mo")
+
+
+def main(model_path, n_workers, modes, n_rows, forest_trees, check):
+    if not os.path.exists("/proc/self/smaps_rollup"):
+        sys.exit("Mesure PSS indisponible : /proc/self/smaps_rollup est requis (Linux).")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if forest_trees:
+            model_path = os.path.join(tmp, "forest.joblib")
+            train_synthetic_forest(forest_trees, model_path)
+
+        # Compilation du modèle projeté faite une fois ici, hors des workers mesurés
+        mmap_dir = os.path.join(tmp, "mmap")
+        if "mmap" in modes:
+            load_mapped_model(model_path, mmap_dir)
+
+        rng = np.random.default_rng(0)
+        X = build_feature_matrix(np.column_stack([rng.uniform(*FEATURE_RANGES[name], n_rows) for name in BASE_FEATURES]))
+
+        print(f"\nModèle : {model_path} | {n_workers} workers | {n_rows} lignes prédites par worker\n")
+        print(f"{'mode':<8} | {'RSS/worker (Mo)':>15} | {'PSS/worker (Mo)':>15} | {'modèle/worker (Mo)':>18} | {'PSS total (Mo)':>14}")
+        print("-" * 84)
+        summary = {}
+        for mode in modes:
+            samples = measure_mode(mode, model_path, mmap_dir, X, n_workers)
+            rss = np.mean([s["rss"] for s in samples]) / 1024
+            pss = np.mean([s["pss"] for s in samples]) / 1024
+            model_pss = np.mean([s["model_pss"] for s in samples]) / 1024
+            total = sum(s["pss"] for s in samples) / 1024
+            summary[mode] = model_pss
+            print(f"{mode:<8} | {rss:>15.1f} | {pss:>15.1f} | {model_pss:>18.2f} | {total:>14.1f}")
+
+    if check and {"native", "mmap"} <= set(summary):
+        if summary["mmap"] >= summary["native"]:
+            sys.exit(f"\nÉchec : la projection mémoire ne réduit pas la mémoire du modèle par worker "
+                     f"({summary['mmap']:.2f} Mo contre {summary['native']:.2f} Mo).")
+        print(f"\nOK : mémoire du modèle par worker {summary['native']:.2f} Mo -> {summary['mmap']:.2f} Mo avec mmap.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mémoire par worker selon le mode de chargement du modèle.")
+    parser.add_argument("--model", default=MODEL_PATH, help="Chemin du pipeline .joblib.")
+    parser.add_argument("--workers", type=int, default=4, help="Nombre de processus workers simulés.")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES), help="Modes de chargement comparés.")
+    parser.add_argument("--rows", type=int, default=2000, help="Lignes prédites par chaque worker avant la mesure.")
+    parser.add_argument("--forest-trees", type=int, default=0,
+                        help="Mesure une forêt aléatoire synthétique de N arbres au lieu de --model.")
+    parser.add_argument("--check", action="store_true",
+                        help="Échoue si le mode mmap ne consomme pas moins de mémoire par worker que le mode native.")
+    args = parser.parse_args()
+    main(args.model, args.workers, args.modes, args.rows, args.forest_trees, args.check)
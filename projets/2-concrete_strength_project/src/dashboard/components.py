@@ -71,13 +71,13 @@ def display_footer():
 def create_input_form(input_names):
     """
     Crée un formulaire responsive avec 4 colonnes pour saisir les features.
-    Calcule et ajoute les features dérivées (water_cement_ratio, binder, fine_to_coarse_ratio).
+    Les features dérivées (water_cement_ratio, binder, fine_to_coarse_ratio) sont calculées par l'API.
 
     Args:
         input_names (list[str]): Noms des features de base.
 
     Returns:
-        list[float]: Liste des valeurs des features de base + features dérivées.
+        list[float]: Liste des valeurs des features de base.
     """
 
     cols = st.columns(4)
@@ -86,12 +86,7 @@ def create_input_form(input_names):
         val = cols[i % 4].number_input(name.replace("_", " ").capitalize(), value=0.0, format="%.2f")
         inputs.append(val)
 
-    cement, slag, fly_ash, water, superplasticizer, coarse, fine, age = inputs
-    binder = cement + slag + fly_ash
-    wcr = water / (binder + 1e-6)
-    f2c = fine / (coarse + 1e-6)
-
-    return inputs + [wcr, binder, f2c]
+    return inputs
 
 def call_prediction_api(api_url, features):
     """
@@ -99,7 +94,7 @@ def call_prediction_api(api_url, features):
 
     Args:
         api_url (str): URL de base de l'API.
-        features (list): Liste des features (avec dérivées).
+        features (list): Liste des 8 features de base.
 
     Returns:
         dict: {success: bool, value/message: str}
@@ -1,6 +1,13 @@
 # src/etl/1-download_data.py
 
+import argparse
+import hashlib
+import json
 import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
 import pandas as pd
 import requests
 
@@ -13,9 +20,16 @@ Fonctionnalités :
 - Détection automatique du type de fichier téléchargé.
 - Conversion automatique des fichiers Excel en CSV pour faciliter le traitement en aval.
 - Sauvegarde des fichiers dans le dossier 'data/raw/'.
+- Téléchargement en flux par blocs (jamais entièrement en mémoire), repris là où il s'était arrêté (HTTP Range).
+- Revalidation conditionnelle (ETag / Last-Modified, conservés dans `<fichier>.meta.json`) : un fichier inchangé
+  sur le serveur n'est pas retéléchargé, ni reconverti.
+- Vérification de la taille annoncée et, optionnellement, d'une empreinte SHA-256 attendue (`--sha256`).
+- Gros fichiers : téléchargement optionnel en plusieurs intervalles d'octets parallèles (`--workers N`).
 
-Usage :
-Lancer le script et suivre les instructions à l'écran pour choisir entre l'URL par défaut ou une URL personnalisée.
+Usage (non interactif) :
+    python src/etl/1-download_data.py                      # URL par défaut
+    python src/etl/1-download_data.py --url <URL .xls/.xlsx/.csv>
+    python src/etl/1-download_data.py --url <URL> --sha256 <empreinte> --workers 4
 """
 
 # URL par défaut du dataset Excel
@@ -23,16 +37,232 @@ DEFAULT_DATA_URL = "https://archive.ics.uci.edu/ml/machine-learning-databases/co
 
 # Chemins
 RAW_DIR = os.path.join("data", "raw")
-XLS_PATH = os.path.join(RAW_DIR, "concrete_data.xls")
 CSV_PATH = os.path.join(RAW_DIR, "concrete_data.csv")
 
-def download_file(url: str, dest_path: str):
-    try:
-        response = requests.get(url)
+# Taille des blocs lus et écrits (octets)
+CHUNK_BYTES = 1 << 20
+# Taille minimale d'un fichier pour le télécharger en intervalles parallèles (octets)
+PARALLEL_MIN_BYTES = 8 << 20
+# Délai maximal de connexion et entre deux blocs reçus (secondes)
+TIMEOUT = 30
+# Pas de compression de transfert : les décalages de reprise et d'intervalles (Range) comptent les octets du
+# fichier, et la taille annoncée (Content-Length) doit être celle du fichier écrit
+IDENTITY_ENCODING = {"Accept-Encoding": "identity"}
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(CHUNK_BYTES), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def read_json(path: str) -> dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+def write_json(path: str, data: dict):
+    with open(path + ".tmp", "w") as f:
+        json.dump(data, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+def remove_files(*paths: str):
+    for path in paths:
+        if os.path.exists(path):
+            os.remove(path)
+
+def validators(response) -> dict:
+    """
+    Validateurs HTTP de la ressource (ETag, Last-Modified) et taille totale annoncée.
+    """
+
+    size = None
+    if response.status_code == 206 and "/" in response.headers.get("Content-Range", ""):
+        total = response.headers["Content-Range"].rsplit("/", 1)[1]
+        size = int(total) if total.isdigit() else None
+    elif "Content-Length" in response.headers and "Content-Encoding" not in response.headers:
+        size = int(response.headers["Content-Length"])
+    return {"etag": response.headers.get("ETag"), "last_modified": response.headers.get("Last-Modified"), "size": size}
+
+def if_range(info: dict):
+    """
+    Valeur de l'en-tête If-Range : ETag fort si disponible, sinon Last-Modified.
+    """
+
+    etag = info.get("etag")
+    if etag and not etag.startswith("W/"):
+        return etag
+    return info.get("last_modified")
+
+def fetch_sequential(url: str, part_path: str, conditional: dict):
+    """
+    Télécharge (ou reprend) le fichier en flux vers `part_path`.
+
+    Returns:
+        dict | None: Validateurs de la ressource, ou None si elle n'a pas changé (304).
+    """
+
+    state_path = part_path + ".json"
+    state = read_json(state_path)
+    offset = os.path.getsize(part_path) if os.path.exists(part_path) and state.get("url") == url else 0
+    headers = {**IDENTITY_ENCODING, **conditional}
+    if offset and if_range(state):
+        headers["Range"] = f"bytes={offset}-"
+        headers["If-Range"] = if_range(state)
+        print(f"Reprise du téléchargement à l'octet {offset}")
+
+    with requests.get(url, headers=headers, stream=True, timeout=TIMEOUT) as response:
+        if response.status_code == 304:
+            return None
+        if response.status_code == 416:
+            # Fichier partiel invalide (plus long que la ressource) : reprise depuis le début
+            remove_files(part_path, state_path)
+            return fetch_sequential(url, part_path, conditional)
+        response.raise_for_status()
+
+        info = validators(response)
+        if response.status_code == 206:
+            if not response.headers.get("Content-Range", "").startswith(f"bytes {offset}-"):
+                raise IOError(f"Reprise refusée : intervalle inattendu ({response.headers.get('Content-Range')}).")
+            if info["size"] is None and state.get("size"):
+                info["size"] = state["size"]
+            mode = "ab"
+        else:
+            offset, mode = 0, "wb"
+        write_json(state_path, {"url": url, **info})
+        with open(part_path, mode) as f:
+            for chunk in response.iter_content(CHUNK_BYTES):
+                f.write(chunk)
+    return info
+
+def fetch_range(url: str, segment_path: str, start: int, end: int, validator: str):
+    """
+    Télécharge (ou reprend) l'intervalle d'octets [start, end] dans `segment_path`.
+    """
+
+    have = os.path.getsize(segment_path) if os.path.exists(segment_path) else 0
+    if have >= end - start + 1:
+        return
+    headers = {**IDENTITY_ENCODING, "Range": f"bytes={start + have}-{end}"}
+    if validator:
+        headers["If-Range"] = validator
+    with requests.get(url, headers=headers, stream=True, timeout=TIMEOUT) as response:
         response.raise_for_status()
-        with open(dest_path, "wb") as f:
-            f.write(response.content)
-        print(f"Fichier téléchargé avec succès : {dest_path}")
+        if response.status_code != 206:
+            raise IOError("Requête partielle non respectée : la ressource a changé pendant le téléchargement.")
+        with open(segment_path, "ab") as f:
+            for chunk in response.iter_content(CHUNK_BYTES):
+                f.write(chunk)
+
+def fetch_parallel(url: str, part_path: str, info: dict, workers: int):
+    """
+    Télécharge le fichier en `workers` intervalles d'octets parallèles (reprenables), puis les assemble.
+    """
+
+    state_path = part_path + ".json"
+    state = read_json(state_path)
+    expected = {"url": url, **info, "segments": workers}
+    segment_paths = [f"{part_path}.{i}" for i in range(workers)]
+    if state != expected:
+        # Nouvelle version de la ressource ou découpage différent : segments précédents inutilisables
+        remove_files(part_path, *[f"{part_path}.{i}" for i in range(max(workers, state.get("segments") or 0))])
+        write_json(state_path, expected)
+
+    size = info["size"]
+    bounds = [(i * size // workers, (i + 1) * size // workers - 1) for i in range(workers)]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(fetch_range, url, path, start, end, if_range(info))
+            for path, (start, end) in zip(segment_paths, bounds)
+        ]
+        for future in futures:
+            future.result()
+
+    with open(part_path, "wb") as out:
+        for path in segment_paths:
+            with open(path, "rb") as f:
+                shutil.copyfileobj(f, out, CHUNK_BYTES)
+    remove_files(*segment_paths)
+
+def download_file(url: str, dest_path: str, sha256: Optional[str] = None, workers: int = 1) -> bool:
+    """
+    Télécharge un fichier en flux, avec reprise, revalidation conditionnelle et vérification d'intégrité.
+
+    Le fichier est écrit par blocs dans `<dest>.part`, renommé en `<dest>` une fois complet et vérifié.
+    Les validateurs HTTP (ETag, Last-Modified), la taille et le SHA-256 sont conservés dans `<dest>.meta.json` :
+    à l'exécution suivante, la requête est conditionnelle (If-None-Match / If-Modified-Since) et un fichier
+    inchangé n'est pas retéléchargé. Un téléchargement interrompu reprend là où il s'était arrêté
+    (Range + If-Range, pour ne pas mélanger deux versions de la ressource).
+
+    Args:
+        url (str): URL du fichier.
+        dest_path (str): Fichier produit.
+        sha256 (str, optionnel): Empreinte SHA-256 attendue ; si le fichier local la possède déjà, aucun accès réseau.
+        workers (int): Nombre de requêtes d'intervalles parallèles pour les gros fichiers (si le serveur les accepte).
+
+    Returns:
+        bool: True si le fichier a été (re)téléchargé, False s'il était à jour.
+
+    Raises:
+        IOError: Si le téléchargement est incomplet (le fichier partiel est conservé pour reprise).
+        ValueError: Si l'empreinte SHA-256 ne correspond pas (le fichier partiel est supprimé).
+    """
+
+    meta_path = dest_path + ".meta.json"
+    part_path = dest_path + ".part"
+    sha256 = sha256.lower() if sha256 else None
+    meta = read_json(meta_path)
+
+    conditional = {}
+    if os.path.exists(dest_path):
+        local_sha256 = file_sha256(dest_path)
+        if sha256 and local_sha256 == sha256:
+            print(f"Fichier déjà présent et vérifié (SHA-256) : {dest_path}")
+            return False
+        # Revalidation seulement si le fichier local est intact et provient de la même URL
+        if meta.get("url") == url and meta.get("sha256") == local_sha256:
+            if meta.get("etag"):
+                conditional["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                conditional["If-Modified-Since"] = meta["last_modified"]
+
+    try:
+        info = None
+        if workers > 1:
+            headers = {**IDENTITY_ENCODING, **conditional}
+            with requests.head(url, headers=headers, allow_redirects=True, timeout=TIMEOUT) as response:
+                if response.status_code == 304:
+                    print(f"Fichier inchangé sur le serveur : {dest_path}")
+                    return False
+                response.raise_for_status()
+                info = validators(response)
+                ranges = response.headers.get("Accept-Ranges", "").lower() == "bytes"
+            if ranges and info["size"] and info["size"] >= PARALLEL_MIN_BYTES:
+                print(f"Téléchargement en {workers} intervalles parallèles ({info['size']} octets)...")
+                fetch_parallel(url, part_path, info, workers)
+            else:
+                info = None
+        if info is None:
+            info = fetch_sequential(url, part_path, conditional)
+            if info is None:
+                print(f"Fichier inchangé sur le serveur : {dest_path}")
+                return False
+
+        size = os.path.getsize(part_path)
+        if info["size"] is not None and size != info["size"]:
+            raise IOError(f"Téléchargement incomplet : {size} octets sur {info['size']} (reprise au prochain lancement).")
+        digest = file_sha256(part_path)
+        if sha256 and digest != sha256:
+            remove_files(part_path, part_path + ".json")
+            raise ValueError(f"Empreinte SHA-256 invalide : {digest} (attendue : {sha256}).")
+
+        os.replace(part_path, dest_path)
+        remove_files(part_path + ".json")
+        write_json(meta_path, {"url": url, "etag": info["etag"], "last_modified": info["last_modified"],
+                               "size": size, "sha256": digest})
+        print(f"Fichier téléchargé avec succès : {dest_path} ({size} octets, SHA-256 {digest[:12]}...)")
+        return True
     except Exception as e:
         print(f"Erreur lors du téléchargement : {e}")
         raise
@@ -46,35 +276,41 @@ def convert_excel_to_csv(xls_path: str, csv_path: str):
         print(f"Erreur lors de la conversion Excel : {e}")
         raise
 
-def main():
-    os.makedirs(RAW_DIR, exist_ok=True)
+def main(data_url: str = DEFAULT_DATA_URL, csv_path: str = CSV_PATH, sha256: Optional[str] = None, workers: int = 1):
+    """
+    Télécharge le jeu de données et le sauvegarde en CSV (sans rien refaire s'il n'a pas changé).
 
-    print("Souhaitez-vous utiliser l'URL par défaut ou une URL personnalisée ?")
-    print(f"[1] Oui (URL par défaut : {DEFAULT_DATA_URL})")
-    print("[2] Non, je veux entrer mon URL (Excel ou CSV)")
-    choice = input("Entrez 1 ou 2 : ").strip()
+    Args:
+        data_url (str): URL d'un fichier .xls, .xlsx ou .csv.
+        csv_path (str): Chemin du CSV brut produit.
+        sha256 (str, optionnel): Empreinte SHA-256 attendue du fichier téléchargé.
+        workers (int): Requêtes d'intervalles parallèles pour les gros fichiers.
 
-    if choice == "2":
-        user_url = input("Entrez l'URL de votre fichier (.xls, .xlsx ou .csv) : ").strip()
-        if not (user_url.lower().endswith(".xls") or user_url.lower().endswith(".xlsx") or user_url.lower().endswith(".csv")):
-            print("L'URL ne pointe pas vers un fichier .xls, .xlsx ou .csv.")
-            return
-        data_url = user_url
-    else:
-        data_url = DEFAULT_DATA_URL
+    Raises:
+        ValueError: Si l'URL ne pointe pas vers un fichier .xls, .xlsx ou .csv.
+    """
 
     file_extension = data_url.split(".")[-1].lower()
+    if file_extension not in ["csv", "xls", "xlsx"]:
+        raise ValueError(f"L'URL ne pointe pas vers un fichier .xls, .xlsx ou .csv : {data_url}")
 
+    os.makedirs(os.path.dirname(csv_path), exist_ok=True)
     print("Téléchargement du fichier...")
 
     if file_extension == "csv":
-        download_file(data_url, CSV_PATH)
-    elif file_extension in ["xls", "xlsx"]:
-        download_file(data_url, XLS_PATH)
-        print("Conversion du fichier Excel en CSV...")
-        convert_excel_to_csv(XLS_PATH, CSV_PATH)
+        download_file(data_url, csv_path, sha256, workers)
     else:
-        print("Format de fichier non pris en charge.")
+        xls_path = f"{os.path.splitext(csv_path)[0]}.{file_extension}"
+        if download_file(data_url, xls_path, sha256, workers) or not os.path.exists(csv_path):
+            print("Conversion du fichier Excel en CSV...")
+            convert_excel_to_csv(xls_path, csv_path)
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Télécharge le jeu de données brut (Excel ou CSV).")
+    parser.add_argument("--url", default=DEFAULT_DATA_URL, help="URL du fichier .xls, .xlsx ou .csv (UCI par défaut).")
+    parser.add_argument("--output", default=CSV_PATH, help="Chemin du CSV brut produit.")
+    parser.add_argument("--sha256", help="Empreinte SHA-256 attendue du fichier téléchargé.")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Requêtes d'intervalles parallèles pour les gros fichiers (si le serveur les accepte).")
+    args = parser.parse_args()
+    main(args.url, args.output, args.sha256, max(1, args.workers))
@@ -1,8 +1,18 @@
 # src/etl/2-clean_data.py
 
+import argparse
+import json
 import os
+import sys
 import pandas as pd
 
+# Permet d'importer le package `src` lorsque le script est lancé directement
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.etl.sketches import DEFAULT_RELATIVE_ACCURACY, ColumnStats
+from src.features import add_derived_features
+from src.storage import read_table, storage_format, write_table
+
 """
 Script de nettoyage et de création de nouvelles features pour le dataset de résistance en compression simple du béton.
 
@@ -15,18 +25,39 @@ Fonctions principales :
     * Quantité totale de liants (binder)
     * Rapport sables/graviers
 
-Usage :
-- Pour une imputation avec la médiane, lancer clean_and_engineer(df, impute_strategy='median')
+Mode par blocs (--chunksize) pour les fichiers qui ne tiennent pas en mémoire :
+- 1re lecture en flux : moyenne, médiane et quartiles de chaque colonne, en une seule passe, par des sketches
+  de quantiles fusionnables (erreur relative bornée, cf. src/etl/sketches.py) ;
+- 2e lecture en flux : imputation, écrêtage IQR et features dérivées bloc par bloc, écrits au fil de l'eau.
+La mémoire est bornée par la taille d'un bloc. Les statistiques par colonne sont sauvegardées en JSON
+(data/processed/cleaning_stats.json) pour être réutilisées. Contrairement au mode en mémoire, les quartiles
+sont calculés sur les valeurs présentes (avant imputation). Médiane et quartiles sont interpolés linéairement
+entre rangs comme pandas, à l'erreur relative du sketch près (0.5 %) ; une colonne sans aucune valeur présente
+n'est ni imputée ni écrêtée.
+
+Usage (non interactif) :
+    python src/etl/2-clean_data.py                      # imputation par la moyenne
+    python src/etl/2-clean_data.py --impute median
+    python src/etl/2-clean_data.py --chunksize 100000   # mode par blocs
 - Le jeu de données nettoyé est sauvegardé dans : data/processed/concrete_data_clean.csv
+- Entrée et sortie peuvent aussi être au format Parquet ou Arrow selon leur extension (cf. src/storage.py),
+  par exemple --output data/processed/concrete_data_clean.parquet (mode en mémoire uniquement)
 """
 
 RAW_CSV = os.path.join("data", "raw", "concrete_data.csv")
 PROCESSED_CSV = os.path.join("data", "processed", "concrete_data_clean.csv")
+STATS_PATH = os.path.join("data", "processed", "cleaning_stats.json")
+
+COLUMNS = [
+    "cement", "slag", "fly_ash", "water",
+    "superplasticizer", "coarse_aggregate", "fine_aggregate",
+    "age", "strength"
+]
 
 
 def load_data(path):
     print(f"Lecture du fichier brut : {path}")
-    return pd.read_csv(path)
+    return read_table(path)
 
 
 def impute_missing_values(df, strategy='mean'):
@@ -49,7 +80,7 @@ def impute_missing_values(df, strategy='mean'):
                 val = df[col].median()
             else:
                 val = df[col].mean()
-            df[col].fillna(val, inplace=True)
+            df[col] = df[col].fillna(val)
             print(f" - {col}: imputée avec {strategy} ({val:.2f})")
 
     return df
@@ -86,43 +117,119 @@ def treat_outliers_iqr(df):
 def clean_and_engineer(df, impute_strategy='mean'):
     print("Nettoyage des colonnes et ingénierie de features...")
 
-    df.columns = [
-        "cement", "slag", "fly_ash", "water",
-        "superplasticizer", "coarse_aggregate", "fine_aggregate",
-        "age", "strength"
-    ]
+    df.columns = COLUMNS
 
     df = impute_missing_values(df, strategy=impute_strategy)
     df = treat_outliers_iqr(df)
 
-    df["water_cement_ratio"] = df["water"] / df["cement"]
-    df["binder"] = df["cement"] + df["slag"] + df["fly_ash"]
-    df["fine_to_coarse_ratio"] = df["fine_aggregate"] / df["coarse_aggregate"]
-
-    return df
+    # Même calcul que l'API et le script de prédiction (noyau commun src/features.py)
+    return add_derived_features(df)
 
 
 def save_data(df, path):
-    os.makedirs(os.path.dirname(path), exist_ok=True)
-    df.to_csv(path, index=False)
+    write_table(df, path)
     print(f"Données nettoyées sauvegardées dans : {path}")
 
 
-def main():
-    df = load_data(RAW_CSV)
-    impute_strategy="mean"
+def read_chunks(path, chunksize):
+    # Colonnes renommées à la lecture, comme dans clean_and_engineer
+    return pd.read_csv(path, names=COLUMNS, header=0, chunksize=chunksize)
+
+
+def compute_column_stats(path, chunksize, relative_accuracy=DEFAULT_RELATIVE_ACCURACY):
+    """
+    Calcule en une seule lecture par blocs les statistiques de chaque colonne.
+
+    Args:
+        path (str): CSV brut.
+        chunksize (int): Nombre de lignes par bloc.
+        relative_accuracy (float): Erreur relative maximale des quantiles.
+
+    Returns:
+        dict: ColumnStats par colonne (fusionnables avec celles d'autres fichiers).
+    """
+
+    print(f"Statistiques par colonne en flux : {path}")
+    stats = {col: ColumnStats(relative_accuracy) for col in COLUMNS}
+    for chunk in read_chunks(path, chunksize):
+        for col in COLUMNS:
+            stats[col].update(chunk[col].to_numpy(dtype="float64"))
+    return stats
+
 
-    print("Souhaitez-vous impute les valeurs manquantes avec la moyenne ou avec la médiane?")
-    print(f"[1] pour la moyenne ('mean': choix par défaut)")
-    print("[2] pour la mediane 'median'")
-    choice = input("Entrez 1 ou 2 : ").strip()
+def save_column_stats(stats, path, impute_strategy, relative_accuracy=DEFAULT_RELATIVE_ACCURACY):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    artifact = {
+        "impute_strategy": impute_strategy,
+        "quantile_relative_accuracy": relative_accuracy,
+        "columns": {col: column.summary() for col, column in stats.items()},
+    }
+    with open(path, "w") as f:
+        json.dump(artifact, f, indent=2)
+    print(f"Statistiques par colonne sauvegardées dans : {path}")
+    return artifact
+
+
+def clean_chunked(input_path, output_path, impute_strategy="mean", chunksize=100_000, stats_path=STATS_PATH):
+    """
+    Nettoyage par blocs en deux lectures du fichier : statistiques, puis imputation, écrêtage et features dérivées.
 
-    if choice == "2":
-        impute_strategy="median"
+    Args:
+        input_path (str): CSV brut.
+        output_path (str): CSV nettoyé produit.
+        impute_strategy (str): 'mean' ou 'median'.
+        chunksize (int): Nombre de lignes par bloc.
+        stats_path (str): Fichier JSON des statistiques par colonne.
+    """
 
+    artifact = save_column_stats(compute_column_stats(input_path, chunksize), stats_path, impute_strategy)
+    columns = artifact["columns"]
+    fill_values = {}
+    for col in COLUMNS:
+        if not columns[col]["missing"]:
+            continue
+        value = columns[col][impute_strategy]
+        if value is None:
+            # Colonne entièrement vide : aucune valeur d'imputation, elle reste manquante (comme en mémoire)
+            print(f" - {col}: aucune valeur présente, colonne laissée manquante")
+            continue
+        fill_values[col] = value
+        print(f" - {col}: imputée avec {impute_strategy} ({value:.2f})")
+
+    print("Imputation, traitement des outliers (IQR) et ingénierie de features par blocs...")
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    rows = 0
+    with open(output_path, "w", newline="") as out:
+        for chunk in read_chunks(input_path, chunksize):
+            chunk = chunk.fillna(fill_values)
+            for col in COLUMNS:
+                if columns[col]["lower_bound"] is not None:
+                    chunk[col] = chunk[col].clip(columns[col]["lower_bound"], columns[col]["upper_bound"])
+            add_derived_features(chunk)
+            chunk.to_csv(out, index=False, header=(rows == 0))
+            rows += len(chunk)
+    print(f"Données nettoyées sauvegardées dans : {output_path} ({rows} lignes)")
+
+
+def main(impute_strategy="mean", input_path=RAW_CSV, output_path=PROCESSED_CSV, chunksize=None, stats_path=STATS_PATH):
+    if chunksize:
+        if storage_format(input_path) != "csv" or storage_format(output_path) != "csv":
+            raise ValueError("Le mode par blocs lit et écrit des fichiers CSV.")
+        clean_chunked(input_path, output_path, impute_strategy, chunksize, stats_path)
+        return
+    df = load_data(input_path)
     df_clean = clean_and_engineer(df, impute_strategy)
-    save_data(df_clean, PROCESSED_CSV)
+    save_data(df_clean, output_path)
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Nettoie le jeu de données brut et ajoute les features dérivées.")
+    parser.add_argument("--impute", choices=["mean", "median"], default="mean",
+                        help="Stratégie d'imputation des valeurs manquantes (moyenne par défaut).")
+    parser.add_argument("--input", default=RAW_CSV, help="Fichier brut (CSV, Parquet ou Arrow).")
+    parser.add_argument("--output", default=PROCESSED_CSV, help="Fichier nettoyé produit (format selon l'extension).")
+    parser.add_argument("--chunksize", type=int, default=None,
+                        help="Nettoyage par blocs de N lignes, en mémoire bornée (fichier entier en mémoire sinon).")
+    parser.add_argument("--stats", default=STATS_PATH, help="Statistiques par colonne produites en mode par blocs (JSON).")
+    args = parser.parse_args()
+    main(args.impute, args.input, args.output, args.chunksize, args.stats)
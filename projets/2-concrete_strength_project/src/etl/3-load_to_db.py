@@ -1,6 +1,13 @@
 # src/etl/3-load_to_db.py
 
+import argparse
+import io
 import os
+import queue
+import threading
+from time import perf_counter
+
+import numpy as np
 import pandas as pd
 import psycopg2
 from dotenv import load_dotenv
@@ -9,17 +16,29 @@ from dotenv import load_dotenv
 Script de chargement des données nettoyées dans une base PostgreSQL.
 
 Ce script lit un fichier CSV contenant les données prétraitées de résistance du béton,
-et les insère dans une table PostgreSQL en utilisant la commande COPY pour des performances optimales.
+et les insère dans une table PostgreSQL avec la commande COPY FROM STDIN.
 
 Fonctionnalités :
 - Connexion à la base de données via des variables d'environnement (fichier .env)
-- Suppression de la table si elle existe
-- Création d'une nouvelle table avec les bons types de colonnes
-- Insertion rapide des données (COPY FROM)
-- Nettoyage automatique du fichier temporaire utilisé pour l'insertion
+- Création de la table si elle n'existe pas (jamais supprimée), avec une colonne `row_hash` unique
+  (hash du contenu de la ligne)
+- Lecture du CSV par blocs, chaque bloc étant encodé dans un tampon en mémoire (aucun fichier temporaire)
+  au format COPY texte (CSV) ou binaire (`--format binary`, sans conversion des nombres en texte)
+- Chaque bloc est copié dans une table temporaire puis inséré avec ON CONFLICT (row_hash) DO NOTHING :
+  les lignes identiques ne sont chargées qu'une fois
+- Mode `upsert` (par défaut) : relancer le chargement n'ajoute que les lignes nouvelles (chargement incrémental)
+- Mode `replace` : la table est vidée (TRUNCATE) puis rechargée
+- Chargement parallèle (`--workers N`) : les blocs sont répartis entre N connexions
+- Le hash porte sur les valeurs telles que stockées (REAL, float32) : il ne dépend ni de la taille des blocs,
+  ni des types inférés à la lecture. Les lignes d'une table créée avant la colonne `row_hash` reçoivent
+  leur hash au premier chargement en mode `upsert` (les doublons qu'elles contiennent sont supprimés)
+- Débit affiché en lignes/s
 
 Assurez-vous que le serveur PostgreSQL est lancé et que les variables suivantes sont définies :
 - PG_HOST, PG_PORT, PG_USER, PG_PASSWORD, PG_DATABASE
+
+Exemple :
+    python src/etl/3-load_to_db.py --format binary --workers 4
 """
 
 # Charger les variables d'environnement
@@ -38,33 +57,31 @@ DB_PARAMS = {
 }
 
 TABLE_NAME = "concrete_strength"
-TEMP_CSV_PATH = "temp_concrete.csv"
 
-def load_to_postgres_copy(csv_path, table_name):
-    """
-    Charge un fichier CSV dans une table PostgreSQL en utilisant COPY FROM STDIN.
+COLUMNS = [
+    "cement", "slag", "fly_ash", "water", "superplasticizer", "coarse_aggregate", "fine_aggregate", "age", "strength",
+    "water_cement_ratio", "binder", "fine_to_coarse_ratio",
+]
 
-    Args:
-        csv_path (str): Chemin du fichier CSV à charger.
-        table_name (str): Nom de la table PostgreSQL cible.
-    """
+# Nombre de lignes lues et copiées par bloc
+CHUNK_ROWS = 100_000
 
-    print("Chargement du DataFrame...")
-    df = pd.read_csv(csv_path)
+MODES = ("upsert", "replace")
+FORMATS = ("csv", "binary")
 
-    print("Création d'un fichier CSV temporaire (sans en-têtes)...")
-    df.to_csv(TEMP_CSV_PATH, index=False, header=False)
+# En-tête et fin d'un flux COPY binaire (signature, drapeaux, longueur d'extension ; puis -1)
+BINARY_HEADER = b"PGCOPY\n\xff\r\n\x00" + np.array([0, 0], dtype=">i4").tobytes()
+BINARY_TRAILER = np.array([-1], dtype=">i2").tobytes()
 
-    print("Connexion à PostgreSQL...")
-    conn = psycopg2.connect(**DB_PARAMS)
-    cur = conn.cursor()
 
-    print(f"Suppression de la table '{table_name}' si elle existe...")
-    cur.execute(f"DROP TABLE IF EXISTS {table_name}")
+def create_table(cur, table_name):
+    """
+    Crée la table si elle n'existe pas et garantit la colonne `row_hash` et son index unique
+    (y compris sur une table créée par une version précédente du script).
+    """
 
-    print(f"Création de la table '{table_name}' avec schéma adapté...")
     cur.execute(f"""
-        CREATE TABLE {table_name} (
+        CREATE TABLE IF NOT EXISTS {table_name} (
             id SERIAL PRIMARY KEY,
             cement REAL,
             slag REAL,
@@ -80,27 +97,257 @@ def load_to_postgres_copy(csv_path, table_name):
             fine_to_coarse_ratio REAL
         );
     """)
+    cur.execute(f"ALTER TABLE {table_name} ADD COLUMN IF NOT EXISTS row_hash BIGINT")
+    cur.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS {table_name}_row_hash_key ON {table_name} (row_hash)")
 
-    print("Insertion des données via COPY FROM...")
-    with open(TEMP_CSV_PATH, 'r') as f:
-        cur.copy_expert(f"""
-            COPY {table_name} (
-                cement, slag, fly_ash, water, superplasticizer, coarse_aggregate, fine_aggregate, age, strength,
-                water_cement_ratio, binder, fine_to_coarse_ratio
-            )
-            FROM STDIN WITH CSV
-        """, f)
 
-    conn.commit()
-    cur.close()
-    conn.close()
-    os.remove(TEMP_CSV_PATH)
+def stored_values(chunk):
+    """
+    Colonnes COLUMNS converties en float32, c'est-à-dire les valeurs exactes des colonnes REAL.
+    """
 
-    print("Données chargées avec succès dans PostgreSQL.")
+    return chunk[COLUMNS].astype(np.float32)
 
-def main():
-    load_to_postgres_copy(CSV_PATH, TABLE_NAME)
 
-if __name__ == "__main__":
-    main()
+def row_hashes(chunk):
+    """
+    Hash 64 bits du contenu de chaque ligne (indépendant de sa position dans le fichier).
+
+    Calculé sur les valeurs stockées (float32) : une même ligne a le même hash quels que soient les types
+    inférés pour son bloc (int64 ou float64) et qu'elle soit lue du CSV ou relue de la table.
+    """
+
+    return pd.util.hash_pandas_object(stored_values(chunk), index=False).to_numpy().view(np.int64)
+
+
+def encode_chunk(chunk, fmt):
+    """
+    Encode un bloc (colonnes COLUMNS puis row_hash) dans un tampon en mémoire pour COPY FROM STDIN.
+
+    Args:
+        chunk (pd.DataFrame): Bloc de lignes.
+        fmt (str): 'csv' ou 'binary'.
+
+    Returns:
+        io.IOBase: Tampon positionné au début.
+    """
+
+    values = stored_values(chunk)
+    hashes = row_hashes(values)
+    if fmt == "csv":
+        # Valeurs float32 écrites en texte : relues à l'identique par la colonne REAL
+        buffer = io.StringIO()
+        values.assign(row_hash=hashes).to_csv(buffer, index=False, header=False)
+        buffer.seek(0)
+        return buffer
+
+    # Format binaire : pour chaque ligne, nombre de champs puis (longueur, valeur) par champ,
+    # construits d'un bloc dans un tableau structuré big-endian
+    fields = [("fields", ">i2")]
+    for i in range(len(COLUMNS)):
+        fields += [(f"len{i}", ">i4"), (f"value{i}", ">f4")]
+    fields += [("hash_len", ">i4"), ("hash", ">i8")]
+    rows = np.empty(len(chunk), dtype=fields)
+    rows["fields"] = len(COLUMNS) + 1
+    for i, col in enumerate(COLUMNS):
+        rows[f"len{i}"] = 4
+        rows[f"value{i}"] = values[col].to_numpy()
+    rows["hash_len"] = 8
+    rows["hash"] = hashes
+    return io.BytesIO(BINARY_HEADER + rows.tobytes() + BINARY_TRAILER)
+
+
+def backfill_hashes(cur, table_name, chunk_rows=CHUNK_ROWS):
+    """
+    Calcule le hash des lignes qui n'en ont pas (table créée avant la colonne `row_hash`).
+
+    Les hash sont calculés comme au chargement, à partir des valeurs stockées, puis écrits par une table
+    temporaire. Une ligne dont le hash existe déjà (ligne identique plus ancienne) est supprimée :
+    sans cela, l'index unique empêcherait la mise à jour et les chargements suivants la dupliqueraient.
+
+    Returns:
+        tuple[int, int]: Lignes mises à jour, doublons supprimés.
+    """
+
+    cur.execute(f"SELECT count(*) FROM {table_name} WHERE row_hash IS NULL")
+    if cur.fetchone()[0] == 0:
+        return 0, 0
+
+    cur.execute("CREATE TEMP TABLE backfill (id INTEGER PRIMARY KEY, row_hash BIGINT) ON COMMIT DROP")
+    with cur.connection.cursor(name="backfill_rows") as rows_cur:
+        rows_cur.execute(f"SELECT id, {', '.join(COLUMNS)} FROM {table_name} WHERE row_hash IS NULL ORDER BY id")
+        while True:
+            records = rows_cur.fetchmany(chunk_rows)
+            if not records:
+                break
+            chunk = pd.DataFrame.from_records(records, columns=["id", *COLUMNS])
+            buffer = io.StringIO()
+            pd.DataFrame({"id": chunk["id"], "row_hash": row_hashes(chunk)}).to_csv(buffer, index=False, header=False)
+            buffer.seek(0)
+            cur.copy_expert("COPY backfill (id, row_hash) FROM STDIN WITH (FORMAT csv)", buffer)
 
+    cur.execute(f"""
+        DELETE FROM {table_name} t USING backfill b
+        WHERE t.id = b.id
+          AND (EXISTS (SELECT 1 FROM {table_name} o WHERE o.row_hash = b.row_hash)
+               OR EXISTS (SELECT 1 FROM backfill d WHERE d.row_hash = b.row_hash AND d.id < b.id))
+    """)
+    deleted = cur.rowcount
+    cur.execute(f"UPDATE {table_name} t SET row_hash = b.row_hash FROM backfill b WHERE t.id = b.id")
+    return cur.rowcount, deleted
+
+
+def copy_sql(table_name, fmt):
+    options = "FORMAT binary" if fmt == "binary" else "FORMAT csv"
+    return f"COPY {table_name} ({', '.join(COLUMNS)}, row_hash) FROM STDIN WITH ({options})"
+
+
+def load_worker(chunks, table_name, fmt, results):
+    """
+    Consomme des blocs et les charge via une connexion dédiée (un commit par bloc).
+
+    Chaque bloc est copié dans une table temporaire de la session, puis seules les lignes dont le hash
+    est absent de la table cible y sont insérées (ON CONFLICT couvre les insertions concurrentes des
+    autres connexions et les doublons au sein du bloc).
+    """
+
+    conn = None
+    inserted = rows = 0
+    try:
+        conn = psycopg2.connect(**DB_PARAMS)
+        cur = conn.cursor()
+        cur.execute(
+            f"CREATE TEMP TABLE staging ON COMMIT DELETE ROWS AS "
+            f"SELECT {', '.join(COLUMNS)}, row_hash FROM {table_name} WITH NO DATA"
+        )
+        while True:
+            chunk = chunks.get()
+            if chunk is None:
+                break
+            cur.copy_expert(copy_sql("staging", fmt), encode_chunk(chunk, fmt))
+            # Le filtre NOT EXISTS évite de consommer des valeurs de la séquence `id` pour les lignes déjà présentes
+            cur.execute(f"""
+                INSERT INTO {table_name} ({', '.join(COLUMNS)}, row_hash)
+                SELECT {', '.join(COLUMNS)}, row_hash FROM staging s
+                WHERE NOT EXISTS (SELECT 1 FROM {table_name} t WHERE t.row_hash = s.row_hash)
+                ON CONFLICT (row_hash) DO NOTHING
+            """)
+            inserted += cur.rowcount
+            conn.commit()
+            rows += len(chunk)
+        results.append((rows, inserted, None))
+    except Exception as e:
+        results.append((rows, inserted, e))
+        # Vider la file pour ne pas bloquer le lecteur
+        while chunks.get() is not None:
+            pass
+    finally:
+        if conn is not None:
+            conn.close()
+
+
+def load_to_postgres_copy(csv_path, table_name, mode="upsert", fmt="csv", workers=1, chunk_rows=CHUNK_ROWS):
+    """
+    Charge un fichier CSV dans une table PostgreSQL par COPY FROM STDIN, bloc par bloc, depuis la mémoire.
+
+    Args:
+        csv_path (str): Chemin du fichier CSV à charger.
+        table_name (str): Nom de la table PostgreSQL cible.
+        mode (str): 'upsert' (ajout des seules lignes nouvelles, selon row_hash) ou 'replace' (TRUNCATE puis chargement).
+        fmt (str): Format COPY, 'csv' ou 'binary'.
+        workers (int): Nombre de connexions chargeant des blocs en parallèle.
+        chunk_rows (int): Nombre de lignes par bloc.
+
+    Returns:
+        dict: Lignes lues, lignes insérées, durée et débit.
+    """
+
+    if mode not in MODES:
+        raise ValueError(f"Mode inconnu : {mode} (attendu : {', '.join(MODES)})")
+    if fmt not in FORMATS:
+        raise ValueError(f"Format inconnu : {fmt} (attendu : {', '.join(FORMATS)})")
+
+    print("Connexion à PostgreSQL...")
+    conn = psycopg2.connect(**DB_PARAMS)
+    try:
+        with conn.cursor() as cur:
+            print(f"Préparation de la table '{table_name}' (mode {mode})...")
+            create_table(cur, table_name)
+            if mode == "replace":
+                cur.execute(f"TRUNCATE {table_name} RESTART IDENTITY")
+            else:
+                updated, deleted = backfill_hashes(cur, table_name, chunk_rows)
+                if updated or deleted:
+                    print(f"Hash calculé pour {updated} ligne(s) existante(s), {deleted} doublon(s) supprimé(s)")
+        conn.commit()
+    finally:
+        conn.close()
+
+    print(f"Insertion des données via COPY FROM STDIN ({fmt}, {workers} connexion(s), blocs de {chunk_rows} lignes)...")
+    start = perf_counter()
+    chunks = queue.Queue(maxsize=2 * workers)
+    results = []
+    threads = [
+        threading.Thread(target=load_worker, args=(chunks, table_name, fmt, results))
+        for _ in range(workers)
+    ]
+    for thread in threads:
+        thread.start()
+    try:
+        # Types explicites : ils ne dépendent pas du contenu de chaque bloc
+        dtypes = {col: np.float64 for col in COLUMNS}
+        for chunk in pd.read_csv(csv_path, usecols=COLUMNS, dtype=dtypes, chunksize=chunk_rows):
+            if any(error is not None for _, _, error in results):
+                break
+            chunks.put(chunk)
+    finally:
+        for _ in threads:
+            chunks.put(None)
+        for thread in threads:
+            thread.join()
+
+    errors = [error for _, _, error in results if error is not None]
+    if errors:
+        raise errors[0]
+
+    elapsed = perf_counter() - start
+    rows = sum(r for r, _, _ in results)
+    inserted = sum(i for _, i, _ in results)
+    report = {"rows": rows, "inserted": inserted, "elapsed_s": round(elapsed, 3), "rows_per_s": round(rows / elapsed) if elapsed else None}
+    print(f"Données chargées avec succès dans PostgreSQL : {rows} lignes lues, {inserted} insérées "
+          f"en {elapsed:.2f} s ({report['rows_per_s']} lignes/s).")
+    return report
+
+def table_signature(table_name):
+    """
+    Signature du contenu de la table : nombre de lignes et somme des hash (None si la table n'existe pas).
+
+    Permet de détecter une table vidée, supprimée ou modifiée depuis le dernier chargement.
+    """
+
+    conn = psycopg2.connect(**DB_PARAMS)
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT to_regclass(%s)", (table_name,))
+            if cur.fetchone()[0] is None:
+                return None
+            cur.execute(f"SELECT count(*), sum(row_hash) FROM {table_name}")
+            count, total = cur.fetchone()
+            return f"{count}:{total}"
+    finally:
+        conn.close()
+
+def main(csv_path=CSV_PATH, table_name=TABLE_NAME, mode="upsert", fmt="csv", workers=1, chunk_rows=CHUNK_ROWS):
+    return load_to_postgres_copy(csv_path, table_name, mode, fmt, workers, chunk_rows)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Charge les données nettoyées dans PostgreSQL par COPY.")
+    parser.add_argument("--input", default=CSV_PATH, help="CSV nettoyé à charger.")
+    parser.add_argument("--table", default=TABLE_NAME, help="Table cible.")
+    parser.add_argument("--mode", choices=MODES, default="upsert",
+                        help="upsert : n'ajoute que les lignes nouvelles (row_hash) ; replace : vide puis recharge.")
+    parser.add_argument("--format", dest="fmt", choices=FORMATS, default="csv", help="Format COPY.")
+    parser.add_argument("--workers", type=int, default=1, help="Connexions chargeant des blocs en parallèle.")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS, help="Nombre de lignes par bloc.")
+    args = parser.parse_args()
+    main(args.input, args.table, args.mode, args.fmt, max(1, args.workers), args.chunk_rows)
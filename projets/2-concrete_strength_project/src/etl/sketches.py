@@ -0,0 +1,168 @@
+# src/etl/sketches.py
+
+import math
+from collections import Counter
+from typing import Dict, Optional
+
+import numpy as np
+
+"""
+Statistiques de colonnes calculées en flux, par blocs, et fusionnables.
+
+Les quantiles sont estimés par un sketch à précision relative de type DDSketch : chaque valeur x > 0
+est rangée dans le bucket k = ceil(log_γ(x)), avec γ = (1 + α) / (1 - α), et restituée comme
+2γ^k / (γ + 1). Tout quantile renvoyé est alors à moins de α (en relatif) de la valeur exacte du rang
+demandé : |q̂ - q| <= α·|q|. Les valeurs négatives utilisent un second jeu de buckets (sur |x|) et
+les zéros sont comptés à part (restitués exactement).
+
+Comme pandas (méthode 'linear' par défaut de Series.quantile et Series.median), un quantile tombant entre
+deux rangs est interpolé linéairement entre les valeurs de ces deux rangs : l'écart au quantile calculé
+par pandas reste borné par α·max(|x_bas|, |x_haut|).
+
+La mémoire ne dépend pas du nombre de lignes mais de l'étendue des valeurs : environ
+ln(max/min) / ln(γ) buckets par colonne (≈ 1 000 pour α = 0.5 % sur six décades). Deux sketches de même α
+se fusionnent en additionnant leurs buckets, ce qui permet de traiter les fichiers de plusieurs
+centrales séparément puis de combiner leurs statistiques.
+
+La moyenne, le nombre de valeurs manquantes, le minimum et le maximum sont exacts.
+"""
+
+# Précision relative par défaut des quantiles (0.5 %)
+DEFAULT_RELATIVE_ACCURACY = 0.005
+
+
+class QuantileSketch:
+    """
+    Sketch de quantiles à précision relative garantie, mis à jour par blocs NumPy.
+
+    Args:
+        relative_accuracy (float): Erreur relative maximale α des quantiles (0 < α < 1).
+    """
+
+    def __init__(self, relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError(f"La précision relative doit être dans ]0, 1[ : {relative_accuracy}")
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.positive = Counter()
+        self.negative = Counter()
+        self.zeros = 0
+        self.count = 0
+
+    def update(self, values: np.ndarray):
+        """
+        Ajoute un bloc de valeurs (les NaN doivent avoir été retirés).
+        """
+
+        values = np.asarray(values, dtype=np.float64)
+        self.count += len(values)
+        self.zeros += int(np.count_nonzero(values == 0))
+        for store, part in ((self.positive, values[values > 0]), (self.negative, -values[values < 0])):
+            if len(part):
+                keys, counts = np.unique(np.ceil(np.log(part) / self._log_gamma).astype(np.int64), return_counts=True)
+                store.update(dict(zip(keys.tolist(), counts.tolist())))
+
+    def merge(self, other: "QuantileSketch"):
+        """
+        Fusionne un autre sketch de même précision dans celui-ci.
+        """
+
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Fusion impossible : les sketches n'ont pas la même précision relative.")
+        self.positive.update(other.positive)
+        self.negative.update(other.negative)
+        self.zeros += other.zeros
+        self.count += other.count
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Quantile q (0 <= q <= 1), à une erreur relative α près, interpolé linéairement entre les deux rangs
+        encadrants (comme pandas) ; None si le sketch est vide.
+        """
+
+        if self.count == 0:
+            return None
+        rank = q * (self.count - 1)
+        below = math.floor(rank)
+        low = self._rank_value(below)
+        if rank == below:
+            return low
+        return low + (rank - below) * (self._rank_value(below + 1) - low)
+
+    def _rank_value(self, rank: int) -> float:
+        # Valeur (à α près) de l'élément de rang `rank` (0-indexé) dans l'ordre croissant
+        seen = 0
+        # Négatifs : du plus grand |x| au plus petit
+        for key in sorted(self.negative, reverse=True):
+            seen += self.negative[key]
+            if seen > rank:
+                return -self._value(key)
+        seen += self.zeros
+        if seen > rank:
+            return 0.0
+        for key in sorted(self.positive):
+            seen += self.positive[key]
+            if seen > rank:
+                return self._value(key)
+        return self._value(max(self.positive))
+
+    def _value(self, key: int) -> float:
+        return 2 * self.gamma ** key / (self.gamma + 1)
+
+
+class ColumnStats:
+    """
+    Statistiques d'une colonne numérique accumulées par blocs : effectifs, moyenne, extrema et quantiles.
+
+    Args:
+        relative_accuracy (float): Précision relative des quantiles.
+    """
+
+    def __init__(self, relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY):
+        self.sketch = QuantileSketch(relative_accuracy)
+        self.rows = 0
+        self.missing = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        present = values[~np.isnan(values)]
+        self.rows += len(values)
+        self.missing += len(values) - len(present)
+        if len(present):
+            self.total += float(present.sum())
+            self.min = min(self.min, float(present.min()))
+            self.max = max(self.max, float(present.max()))
+            self.sketch.update(present)
+
+    def merge(self, other: "ColumnStats"):
+        self.sketch.merge(other.sketch)
+        self.rows += other.rows
+        self.missing += other.missing
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def summary(self) -> Dict[str, Optional[float]]:
+        """
+        Résumé : effectifs, moyenne, médiane, quartiles et bornes IQR [Q1 - 1.5·IQR, Q3 + 1.5·IQR].
+        """
+
+        count = self.rows - self.missing
+        q1, median, q3 = (self.sketch.quantile(q) for q in (0.25, 0.5, 0.75))
+        iqr = q3 - q1 if count else None
+        return {
+            "rows": self.rows,
+            "missing": self.missing,
+            "mean": self.total / count if count else None,
+            "median": median,
+            "q1": q1,
+            "q3": q3,
+            "lower_bound": q1 - 1.5 * iqr if count else None,
+            "upper_bound": q3 + 1.5 * iqr if count else None,
+            "min": self.min if count else None,
+            "max": self.max if count else None,
+        }
@@ -0,0 +1,177 @@
+# src/features.py
+
+from typing import Mapping
+
+import numpy as np
+
+"""
+Noyau unique de calcul des features du modèle, partagé par l'API, l'ETL, le script de prédiction
+et (via l'API) le dashboard.
+
+Features de base (8) : composition du mélange et âge.
+Features dérivées (3) :
+    * water_cement_ratio   = water / cement
+    * binder               = cement + slag + fly_ash
+    * fine_to_coarse_ratio = fine_aggregate / coarse_aggregate
+
+Les calculs sont vectorisés sur des tableaux NumPy et écrivent directement dans la matrice de sortie,
+sans copie de DataFrame. Les ratios sont plafonnés à une valeur physiquement plausible
+(MAX_WATER_CEMENT_RATIO, MAX_FINE_TO_COARSE_RATIO, au-delà de tout mélange réel et du jeu d'entraînement) :
+un dénominateur nul ou négatif (ciment ou graviers absents, ou valeur invalide) donne donc le plafond, et non
+un ratio de l'ordre de 1e8 ou un ratio négatif que le modèle traiterait comme une valeur réelle. Les valeurs
+manquantes (NaN) sont propagées.
+"""
+
+BASE_FEATURES = [
+    "cement", "slag", "fly_ash", "water",
+    "superplasticizer", "coarse_aggregate", "fine_aggregate", "age"
+]
+
+DERIVED_FEATURES = [
+    "water_cement_ratio",
+    "binder",
+    "fine_to_coarse_ratio"
+]
+
+ALL_FEATURES = BASE_FEATURES + DERIVED_FEATURES
+
+# Plafonds des ratios (le jeu d'entraînement va jusqu'à ~2.4 pour eau/ciment et ~1.2 pour sables/graviers)
+MAX_WATER_CEMENT_RATIO = 3.0
+MAX_FINE_TO_COARSE_RATIO = 3.0
+
+_CEMENT, _SLAG, _FLY_ASH, _WATER, _, _COARSE, _FINE, _AGE = range(len(BASE_FEATURES))
+_WCR, _BINDER, _F2C = range(len(BASE_FEATURES), len(ALL_FEATURES))
+
+
+def _fill_derived(cement, slag, fly_ash, water, coarse, fine, wcr, binder, f2c):
+    # Seul endroit où les formules des features dérivées sont écrites
+    with np.errstate(divide="ignore", invalid="ignore"):
+        np.divide(water, cement, out=wcr)
+        np.divide(fine, coarse, out=f2c)
+    # Dénominateur négatif ou nul (0/0 compris) : traité comme +inf, puis ramené au plafond
+    # (un dénominateur NaN échoue à la comparaison, NaN propagé par np.minimum)
+    np.copyto(wcr, np.inf, where=cement <= 0)
+    np.copyto(f2c, np.inf, where=coarse <= 0)
+    np.minimum(wcr, MAX_WATER_CEMENT_RATIO, out=wcr)
+    np.minimum(f2c, MAX_FINE_TO_COARSE_RATIO, out=f2c)
+    np.add(cement, slag, out=binder)
+    binder += fly_ash
+
+
+def derive_features(X: np.ndarray) -> np.ndarray:
+    """
+    Calcule en place les features dérivées d'une matrice (n_samples, 11).
+
+    Les 8 premières colonnes doivent contenir les features de base (ordre BASE_FEATURES) ;
+    les 3 dernières sont écrasées.
+
+    Args:
+        X (np.ndarray): Matrice float (n_samples, 11), modifiée en place.
+
+    Returns:
+        np.ndarray: La même matrice X.
+    """
+
+    _fill_derived(
+        X[:, _CEMENT], X[:, _SLAG], X[:, _FLY_ASH], X[:, _WATER], X[:, _COARSE], X[:, _FINE],
+        X[:, _WCR], X[:, _BINDER], X[:, _F2C],
+    )
+    return X
+
+
+def build_feature_matrix(base) -> np.ndarray:
+    """
+    Construit la matrice complète (n_samples, 11) à partir des features de base, en une seule allocation.
+
+    Args:
+        base (array-like): Matrice (n_samples, 8) ou (n_samples, 11) dont les 8 premières colonnes
+                           sont les features de base ; d'éventuelles dérivées fournies sont recalculées.
+
+    Returns:
+        np.ndarray: Matrice float64 contiguë dans l'ordre ALL_FEATURES.
+    """
+
+    base = np.asarray(base, dtype=np.float64)
+    if base.ndim == 1:
+        base = base.reshape(1, -1)
+    if base.shape[1] not in (len(BASE_FEATURES), len(ALL_FEATURES)):
+        raise ValueError(f"{base.shape[1]} colonnes reçues : {len(BASE_FEATURES)} ou {len(ALL_FEATURES)} attendues.")
+
+    X = np.empty((base.shape[0], len(ALL_FEATURES)), dtype=np.float64)
+    X[:, :len(BASE_FEATURES)] = base[:, :len(BASE_FEATURES)]
+    return derive_features(X)
+
+
+def build_age_grid(mixes, ages) -> np.ndarray:
+    """
+    Construit en une seule allocation la matrice (n_mixes * n_ages, 11) de tous les couples mélange × âge.
+
+    Les lignes sont ordonnées mélange par mélange : la ligne `i * n_ages + j` correspond au mélange i
+    à l'âge j, de sorte que les prédictions se remettent en forme par `reshape(n_mixes, n_ages)`.
+
+    Args:
+        mixes (array-like): Matrice (n_mixes, 7) des constituants (ordre BASE_FEATURES sans l'âge),
+                            ou (n_mixes, 8) dont la colonne d'âge est ignorée.
+        ages (array-like): Âges (jours) à évaluer.
+
+    Returns:
+        np.ndarray: Matrice float64 contiguë dans l'ordre ALL_FEATURES.
+    """
+
+    mixes = np.asarray(mixes, dtype=np.float64)
+    ages = np.asarray(ages, dtype=np.float64).ravel()
+    n_ingredients = _AGE
+    if mixes.ndim != 2 or mixes.shape[1] not in (n_ingredients, len(BASE_FEATURES)):
+        raise ValueError(f"Mélanges de forme {mixes.shape} : {n_ingredients} ou {len(BASE_FEATURES)} colonnes attendues.")
+
+    n_mixes, n_ages = mixes.shape[0], ages.shape[0]
+    X = np.empty((n_mixes * n_ages, len(ALL_FEATURES)), dtype=np.float64)
+    # Vues (n_mixes, n_ages, k) sur la matrice : diffusion sans copie intermédiaire
+    X.reshape(n_mixes, n_ages, -1)[:, :, :n_ingredients] = mixes[:, None, :n_ingredients]
+    X.reshape(n_mixes, n_ages, -1)[:, :, _AGE] = ages[None, :]
+    return derive_features(X)
+
+
+def assemble_features(columns: Mapping[str, np.ndarray]) -> np.ndarray:
+    """
+    Assemble des colonnes de base (tableaux 1-D, ex. DataFrame ou table Arrow) en matrice (n_samples, 11).
+
+    Args:
+        columns (Mapping[str, np.ndarray]): Une colonne par nom de BASE_FEATURES.
+
+    Returns:
+        np.ndarray: Matrice float64 contiguë dans l'ordre ALL_FEATURES.
+
+    Raises:
+        ValueError: Si les colonnes n'ont pas toutes la même longueur.
+    """
+
+    n_rows = len(columns[BASE_FEATURES[0]])
+    X = np.empty((n_rows, len(ALL_FEATURES)), dtype=np.float64)
+    for i, name in enumerate(BASE_FEATURES):
+        if len(columns[name]) != n_rows:
+            raise ValueError(f"La colonne '{name}' n'a pas le même nombre de lignes que les autres.")
+        X[:, i] = columns[name]
+    return derive_features(X)
+
+
+def add_derived_features(df):
+    """
+    Ajoute (ou remplace) les colonnes dérivées d'un DataFrame, en place et sans copier le DataFrame.
+
+    Args:
+        df (pd.DataFrame): Données contenant au moins BASE_FEATURES.
+
+    Returns:
+        pd.DataFrame: Le même DataFrame, enrichi des colonnes DERIVED_FEATURES.
+    """
+
+    base = {name: df[name].to_numpy(dtype=np.float64) for name in BASE_FEATURES}
+    derived = np.empty((len(DERIVED_FEATURES), len(df)), dtype=np.float64)
+    _fill_derived(
+        base["cement"], base["slag"], base["fly_ash"], base["water"],
+        base["coarse_aggregate"], base["fine_aggregate"], *derived,
+    )
+    for name, values in zip(DERIVED_FEATURES, derived):
+        df[name] = values
+    return df
@@ -1,7 +1,8 @@
 # src/ml/1-train_model.py
 
+import argparse
 import os
-import pandas as pd
+import sys
 from time import time
 import joblib
 
@@ -14,16 +15,24 @@ from sklearn.metrics import mean_absolute_error, root_mean_squared_error
 from sklearn.preprocessing import StandardScaler
 from sklearn.pipeline import Pipeline
 
+# Permet d'importer le package `src` lorsque le script est lancé directement
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.ml.search import successive_halving
+from src.storage import read_table
+
 """
 Ce script entraîne et évalue plusieurs modèles de régression (Régression Linéaire, Forêt Aléatoire, XGBoost)
 pour prédire la résistance à la compression du béton à partir de ses caractéristiques.
 
-Il utilise GridSearchCV pour optimiser les hyperparamètres de RandomForestRegressor et XGBRegressor,
-et sélectionne automatiquement le meilleur modèle selon le RMSE.
+Les hyperparamètres de RandomForestRegressor et XGBRegressor sont optimisés par successive halving
+(src/ml/search.py : scaler ajusté une fois par fold, familles entraînées en parallèle sur un pool de processus,
+budget de temps optionnel, temps journalisé par candidat), ou par GridSearchCV exhaustif (--search grid).
+Le meilleur modèle est sélectionné automatiquement selon le RMSE sur le jeu de test.
 
 Le modèle final est sauvegardé sous forme de fichier .joblib.
 
-Fichier attendu : data/processed/concrete_data_clean.csv
+Fichier attendu : data/processed/concrete_data_clean.csv (ou sa conversion .parquet / .arrow, cf. src/storage.py)
 Variable cible : 'strength'
 """
 
@@ -33,16 +42,16 @@ MODEL_PATH = "models/best_model.joblib"
 
 def load_data(path):
     """
-    Charge les données depuis un fichier CSV et divise le jeu de données en ensembles d'entraînement et de test.
+    Charge les données (CSV, Parquet ou Arrow) et divise le jeu de données en ensembles d'entraînement et de test.
 
     Args:
-        path (str): Chemin vers le fichier CSV contenant les données prétraitées.
+        path (str): Chemin vers le fichier contenant les données prétraitées.
 
     Returns:
         X_train, X_test, y_train, y_test: Jeux de données séparés pour l'entraînement et le test.
     """
 
-    df = pd.read_csv(path)
+    df = read_table(path)
     X = df.drop("strength", axis=1)
     y = df["strength"]
     return train_test_split(X, y, test_size=0.2, random_state=42)
@@ -65,7 +74,7 @@ def evaluate_model(model, X_test, y_test):
     mae = mean_absolute_error(y_test, y_pred)
     return rmse, mae
 
-def train_and_evaluate(X_train, X_test, y_train, y_test):
+def train_and_evaluate(X_train, X_test, y_train, y_test, search="halving", budget_s=None):
     """
     Entraîne plusieurs modèles (Régression Linéaire, Random Forest, XGBoost),
     optimise les hyperparamètres pour RandomForest et XGBoost,
@@ -73,6 +82,8 @@ def train_and_evaluate(X_train, X_test, y_train, y_test):
 
     Args:
         X_train, X_test, y_train, y_test: Jeux de données.
+        search (str): 'halving' (successive halving sur pool partagé) ou 'grid' (GridSearchCV exhaustif).
+        budget_s (float, optionnel): Budget souple en secondes de la recherche par successive halving.
 
     Returns:
         dict: Résultats pour chaque modèle avec le modèle entraîné, RMSE, MAE et meilleurs paramètres le cas échéant.
@@ -92,6 +103,13 @@ def train_and_evaluate(X_train, X_test, y_train, y_test):
     rmse, mae = evaluate_model(lr_pipe, X_test, y_test)
     results['LinearRegression'] = {"model": lr_pipe, "rmse": rmse, "mae": mae }
 
+    if search == "halving":
+        print("\nOptimisation de RandomForest et XGBoost (successive halving)...")
+        for name, info in successive_halving(X_train, y_train, budget_s=budget_s).items():
+            rmse, mae = evaluate_model(info["model"], X_test, y_test)
+            results[name] = {"model": info["model"], "rmse": rmse, "mae": mae, "best_params": info["best_params"]}
+        return results
+
     # --- Random Forest ---
     rf_params = {'model__n_estimators': [50, 100, 200], 'model__max_depth': [None, 10, 20]}
     rf_pipe = make_pipeline(RandomForestRegressor(random_state=42))
@@ -130,12 +148,12 @@ def train_and_evaluate(X_train, X_test, y_train, y_test):
 
     return results
 
-def main():
+def main(data_path=DATA_PATH, model_path=MODEL_PATH, search="halving", budget_s=None):
     print("\nChargement des données...")
-    X_train, X_test, y_train, y_test = load_data(DATA_PATH)
+    X_train, X_test, y_train, y_test = load_data(data_path)
 
     print("\nEntraînement des modèles...")
-    results = train_and_evaluate(X_train, X_test, y_train, y_test)
+    results = train_and_evaluate(X_train, X_test, y_train, y_test, search, budget_s)
 
     print("\nRésultats des modèles :")
     for name, info in results.items():
@@ -147,9 +165,19 @@ def main():
     best_model_name = min(results, key=lambda k: results[k]['rmse'])
     best_model = results[best_model_name]['model']
     print(f"\nMeilleur modèle : {best_model_name} (RMSE = {results[best_model_name]['rmse']:.2f})")
-    os.makedirs(os.path.dirname(MODEL_PATH), exist_ok=True)
-    joblib.dump(best_model, MODEL_PATH)
-    print(f"Modèle sauvegardé dans : {MODEL_PATH}\n")
+    os.makedirs(os.path.dirname(model_path), exist_ok=True)
+    joblib.dump(best_model, model_path)
+    print(f"Modèle sauvegardé dans : {model_path}\n")
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Entraîne les modèles et sauvegarde le meilleur.")
+    parser.add_argument("--input", default=DATA_PATH, help="Données prétraitées (CSV, Parquet ou Arrow).")
+    parser.add_argument("--model", default=MODEL_PATH, help="Chemin du modèle .joblib produit.")
+    parser.add_argument("--search", choices=["halving", "grid"], default="halving",
+                        help="Recherche d'hyperparamètres : successive halving (par défaut) ou grille exhaustive.")
+    parser.add_argument("--budget", type=float, default=None,
+                        help="Budget souple en secondes de la recherche par successive halving (aucun par défaut) : "
+                             "un palier en cours n'est jamais interrompu et le premier palier de chaque famille "
+                             "est toujours évalué.")
+    args = parser.parse_args()
+    main(args.input, args.model, args.search, args.budget)
@@ -1,64 +1,56 @@
 # src/ml/predict.py
 
 import os
-import pandas as pd
 import joblib
 import argparse
+import sys
 from typing import Union
 
+# Permet d'importer le package `src` lorsque le script est lancé directement
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.features import add_derived_features
+from src.ml.native_inference import compile_pipeline
+from src.storage import read_table
+
 """
 Script de prédiction de la résistance du béton à l'aide d'un modèle ML entraîné.
 
 Ce script prend en entrée un fichier CSV contenant les caractéristiques des mélanges de béton,
-calcule les variables dérivées nécessaires, charge un modèle entraîné (sous forme de pipeline),
+calcule les variables dérivées nécessaires (noyau commun `src/features.py`), charge un modèle entraîné (sous forme de pipeline),
 effectue les prédictions, puis sauvegarde les résultats dans un nouveau fichier CSV.
 
 Exemple d'exécution :
     python src/ml/predict.py --input data/to_predict/batch1.csv
+    python src/ml/predict.py --input data/to_predict/batch1.csv --engine native
 """
 
 # Constantes
 MODEL_PATH = "models/best_model.joblib"
 PREDICTION_PATH = "data/predictions/predicted_strength.csv"
 
-def add_derived_features(df: pd.DataFrame) -> pd.DataFrame:
-    """
-    Calcule les variables dérivées nécessaires à la prédiction :
-        - water_cement_ratio
-        - binder (liant total)
-        - fine_to_coarse_ratio
-
-    Args:
-        df (pd.DataFrame): Données d'entrée avec les colonnes d'origine.
-
-    Returns:
-        pd.DataFrame: Données enrichies des variables dérivées.
-    """
-
-    df = df.copy()
-    df["water_cement_ratio"] = df["water"] / df["cement"]
-    df["binder"] = df["cement"] + df["slag"] + df["fly_ash"]
-    df["fine_to_coarse_ratio"] = df["fine_aggregate"] / df["coarse_aggregate"]
-    return df
-
-def main(input_path: Union[str, os.PathLike]) -> None:
+def main(input_path: Union[str, os.PathLike], engine: str = "sklearn") -> None:
     """
     Charge les données, applique les transformations, effectue les prédictions,
     et sauvegarde les résultats dans un fichier CSV.
 
     Args:
-        input_path (str or Path): Chemin vers le fichier CSV à prédire.
+        input_path (str or Path): Chemin vers le fichier à prédire (CSV, Parquet ou Arrow).
+        engine (str): 'sklearn' (pipeline joblib) ou 'native' (pipeline compilé en tableaux NumPy).
     """
 
     if not os.path.exists(input_path):
         raise FileNotFoundError(f"Fichier d'entrée non trouvé : {input_path}")
 
     print(f"Chargement des données depuis : {input_path}")
-    df = pd.read_csv(input_path)
+    df = read_table(input_path)
     df = add_derived_features(df)
 
     print(f"Chargement du modèle depuis : {MODEL_PATH}")
     pipeline = joblib.load(MODEL_PATH)
+    if engine == "native":
+        print("Compilation du pipeline pour le moteur natif...")
+        pipeline = compile_pipeline(pipeline)
 
     print("Prédictions en cours...")
     predictions = pipeline.predict(df)
@@ -74,7 +66,13 @@ if __name__ == "__main__":
         "--input",
         type=str,
         required=True,
-        help="Chemin vers le fichier CSV d'entrée contenant les caractéristiques du béton."
+        help="Fichier d'entrée (CSV, Parquet ou Arrow) contenant les caractéristiques du béton."
+    )
+    parser.add_argument(
+        "--engine",
+        choices=["sklearn", "native"],
+        default="sklearn",
+        help="Moteur d'inférence : pipeline joblib ('sklearn', par défaut) ou moteur NumPy natif ('native')."
     )
     args = parser.parse_args()
-    main(args.input)
+    main(args.input, args.engine)
@@ -1,20 +1,24 @@
 # src/ml/3-evaluate_model.py
 
 import argparse
-import pandas as pd
 import joblib
 from sklearn.metrics import mean_absolute_error, mean_squared_error, root_mean_squared_error
 import os
 import sys
 
+# Permet d'importer le package `src` lorsque le script est lancé directement
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.storage import read_table
+
 MODEL_PATH = "models/best_model.joblib"
 
 def load_data(file_path):
     """
-    Charge les données depuis un fichier CSV.
+    Charge les données depuis un fichier CSV, Parquet ou Arrow.
 
     Args:
-        file_path (str): Chemin vers le fichier CSV.
+        file_path (str): Chemin vers le fichier de données.
 
     Returns:
         tuple: (X, y) où X est un DataFrame des features et y la série des cibles.
@@ -27,7 +31,7 @@ def load_data(file_path):
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"Fichier non trouvé : {file_path}")
 
-    df = pd.read_csv(file_path)
+    df = read_table(file_path)
     if "strength" not in df.columns:
         raise ValueError("Le fichier d'entrée doit contenir la colonne 'strength'.")
 
@@ -53,12 +57,12 @@ def evaluate(model, X, y):
     mae = mean_absolute_error(y, y_pred)
     return rmse, mae
 
-def main(input_path):
-    print(f"Chargement du modèle depuis : {MODEL_PATH}")
-    if not os.path.exists(MODEL_PATH):
-        print(f"Erreur : modèle non trouvé à {MODEL_PATH}")
+def main(input_path, model_path=MODEL_PATH):
+    print(f"Chargement du modèle depuis : {model_path}")
+    if not os.path.exists(model_path):
+        print(f"Erreur : modèle non trouvé à {model_path}")
         sys.exit(1)
-    model = joblib.load(MODEL_PATH)
+    model = joblib.load(model_path)
 
     try:
         print(f"Chargement des données depuis : {input_path}")
@@ -73,10 +77,12 @@ def main(input_path):
     print("\nRésultats de l'évaluation :")
     print(f"RMSE : {rmse:.2f}")
     print(f"MAE  : {mae:.2f}\n")
+    return {"rmse": rmse, "mae": mae}
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Évaluer un modèle de prédiction de résistance du béton.")
-    parser.add_argument("--input", required=True, help="Chemin vers le fichier CSV contenant les données d'évaluation (avec la colonne 'strength').")
+    parser.add_argument("--input", required=True, help="Fichier de données d'évaluation (CSV, Parquet ou Arrow, avec la colonne 'strength').")
+    parser.add_argument("--model", default=MODEL_PATH, help="Chemin du modèle .joblib à évaluer.")
     args = parser.parse_args()
 
-    main(args.input)
+    main(args.input, args.model)
@@ -0,0 +1,339 @@
+# src/ml/native_inference.py
+
+import json
+import os
+import shutil
+import tempfile
+from typing import Optional, Sequence
+
+import numpy as np
+
+"""
+Moteur d'inférence natif (NumPy pur) pour les pipelines entraînés par `src/ml/1-train_model.py`.
+
+Le pipeline `Pipeline(StandardScaler -> RandomForest / XGBRegressor / LinearRegression)` est
+« abaissé » une fois pour toutes en tableaux NumPy plats, puis évalué directement sur une
+matrice float contiguë, sans construction de DataFrame ni dispatch sklearn/XGBoost.
+
+- Régression linéaire : le scaler est replié dans les coefficients (un seul produit matriciel).
+- Forêts / boosting : le scaler est appliqué comme une transformation affine vectorisée,
+  puis tous les arbres sont parcourus en parallèle, niveau par niveau, à partir de tableaux
+  feature / seuil / enfant gauche / enfant droit / valeur de feuille concaténés.
+
+Les prédictions sont identiques à `pipeline.predict` à la tolérance flottante près.
+
+Un NativeModel peut être sauvegardé en fichiers .npy (`save`) puis rechargé en projection mémoire
+(`NativeModel.load(..., mmap_mode="r")`) : tous les processus qui chargent le même dossier partagent
+alors les mêmes pages physiques (cache de pages du noyau) au lieu d'en garder chacun une copie.
+
+Exemple :
+    native_model = compile_pipeline(joblib.load("models/best_model.joblib"))
+    native_model.predict(X)
+"""
+
+# Nombre de lignes évaluées simultanément lors du parcours des arbres (borne la mémoire temporaire)
+TREE_CHUNK_ROWS = 256
+
+
+class NativeModel:
+    """
+    Modèle compilé en tableaux NumPy, évaluable sans pandas, sklearn ni xgboost.
+
+    Attributs:
+        kind (str): 'linear' ou 'trees'.
+        feature_names (list[str] | None): Ordre des colonnes attendu en entrée.
+        arrays (dict[str, np.ndarray]): Paramètres du modèle sous forme de tableaux plats.
+        meta (dict): Métadonnées scalaires (biais, agrégation, profondeur maximale, ...).
+    """
+
+    def __init__(self, kind: str, arrays: dict, meta: dict, feature_names: Optional[Sequence[str]] = None):
+        self.kind = kind
+        self.arrays = arrays
+        self.meta = meta
+        self.feature_names = list(feature_names) if feature_names is not None else None
+
+    def predict(self, X) -> np.ndarray:
+        """
+        Prédit la résistance pour une matrice d'échantillons.
+
+        Args:
+            X (np.ndarray | pd.DataFrame | list): Matrice (n_samples, n_features). Un DataFrame est
+                                                  réordonné selon `feature_names`.
+
+        Returns:
+            np.ndarray: Prédictions (float32 pour XGBoost, float64 sinon), de longueur n_samples.
+        """
+
+        X = self._as_matrix(X)
+        if self.kind == "linear":
+            return X @ self.arrays["coef"] + self.meta["intercept"]
+        return self._predict_trees(X)
+
+    def save(self, directory: str):
+        """
+        Sauvegarde le modèle dans un dossier : un fichier .npy par tableau et `model.json` pour le reste.
+
+        L'écriture passe par un dossier temporaire renommé à la fin : plusieurs processus peuvent
+        tenter la même sauvegarde simultanément sans jamais exposer un dossier incomplet.
+
+        Args:
+            directory (str): Dossier de destination (ignoré s'il existe déjà).
+        """
+
+        parent = os.path.dirname(os.path.abspath(directory))
+        os.makedirs(parent, exist_ok=True)
+        tmp_dir = tempfile.mkdtemp(prefix=".tmp-", dir=parent)
+        try:
+            os.chmod(tmp_dir, 0o755)
+            for name, array in self.arrays.items():
+                np.save(os.path.join(tmp_dir, f"{name}.npy"), np.ascontiguousarray(array), allow_pickle=False)
+            with open(os.path.join(tmp_dir, "model.json"), "w") as f:
+                json.dump({
+                    "kind": self.kind,
+                    "meta": self.meta,
+                    "feature_names": self.feature_names,
+                    "arrays": sorted(self.arrays),
+                }, f)
+            os.rename(tmp_dir, directory)
+        except OSError:
+            # Un autre processus a terminé la même sauvegarde avant nous
+            if not os.path.exists(os.path.join(directory, "model.json")):
+                raise
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    @classmethod
+    def load(cls, directory: str, mmap_mode: Optional[str] = "r") -> "NativeModel":
+        """
+        Recharge un modèle sauvegardé par `save`.
+
+        Args:
+            directory (str): Dossier du modèle.
+            mmap_mode (str | None): 'r' pour projeter les tableaux en mémoire en lecture seule
+                                    (pages partagées entre processus), None pour les copier en mémoire.
+
+        Returns:
+            NativeModel: Modèle prêt à prédire.
+        """
+
+        with open(os.path.join(directory, "model.json")) as f:
+            spec = json.load(f)
+        arrays = {
+            name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mmap_mode, allow_pickle=False)
+            for name in spec["arrays"]
+        }
+        return cls(spec["kind"], arrays, spec["meta"], spec["feature_names"])
+
+    def _as_matrix(self, X) -> np.ndarray:
+        if hasattr(X, "columns") and self.feature_names is not None:
+            X = X[self.feature_names].to_numpy(dtype=np.float64)
+        X = np.ascontiguousarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        n_features = self.meta["n_features"]
+        if X.shape[1] != n_features:
+            raise ValueError(f"{X.shape[1]} features reçues, {n_features} attendues.")
+        return X
+
+    def _predict_trees(self, X: np.ndarray) -> np.ndarray:
+        a = self.arrays
+        Xs = (X - a["mean"]) / a["scale"]
+        Xs = Xs.astype(np.float32)
+
+        out = np.empty(X.shape[0], dtype=np.float64)
+        for start in range(0, X.shape[0], TREE_CHUNK_ROWS):
+            block = Xs[start:start + TREE_CHUNK_ROWS]
+            leaves = self._traverse(block)
+            values = a["value"][leaves]
+            if self.meta["aggregate"] == "mean":
+                out[start:start + len(block)] = values.mean(axis=1)
+            else:
+                out[start:start + len(block)] = values.sum(axis=1)
+
+        out += self.meta["bias"]
+        if self.meta["output_dtype"] == "float32":
+            return out.astype(np.float32)
+        return out
+
+    def _traverse(self, block: np.ndarray) -> np.ndarray:
+        a = self.arrays
+        strict = self.meta["strict"]
+        n_rows, n_features = block.shape
+        flat = block.ravel()
+        row_offsets = (np.arange(n_rows, dtype=np.intp) * n_features)[:, None]
+        node = np.broadcast_to(a["roots"], (n_rows, a["roots"].shape[0])).astype(np.intp)
+
+        # Les feuilles pointent sur elles-mêmes : max_depth itérations suffisent pour tous les arbres.
+        # `children` entrelace [gauche, droite] : l'enfant suivi est children[2 * node + aller_à_droite].
+        for _ in range(self.meta["max_depth"]):
+            x = flat[a["feature"][node] + row_offsets]
+            threshold = a["threshold"][node]
+            go_right = x >= threshold if strict else x > threshold
+            missing = np.isnan(x)
+            if missing.any():
+                go_right = np.where(missing, ~a["default_left"][node], go_right)
+            node = a["children"][2 * node + go_right]
+        return node
+
+
+def _scaler_params(steps, n_features):
+    mean = np.zeros(n_features)
+    scale = np.ones(n_features)
+    for name, step in steps:
+        if step is None or step == "passthrough":
+            continue
+        if type(step).__name__ != "StandardScaler":
+            raise TypeError(f"Étape de pipeline non supportée par le moteur natif : {name} ({type(step).__name__})")
+        # Composition de scalers successifs : x' = (x - m1) / s1 puis x'' = (x' - m2) / s2
+        step_mean = step.mean_ if step.mean_ is not None and step.with_mean else np.zeros(n_features)
+        step_scale = step.scale_ if step.scale_ is not None and step.with_std else np.ones(n_features)
+        mean = mean + step_mean * scale
+        scale = scale * step_scale
+    return mean.astype(np.float64), scale.astype(np.float64)
+
+
+def _pack_trees(trees, threshold_dtype):
+    """
+    Concatène une liste d'arbres (dicts de tableaux par nœud) en tableaux plats avec racines décalées.
+    """
+
+    feature, threshold, left, right, value, default_left, roots = [], [], [], [], [], [], []
+    offset = 0
+    max_depth = 0
+    for tree in trees:
+        n_nodes = len(tree["left"])
+        is_leaf = tree["left"] < 0
+        node_ids = np.arange(n_nodes)
+
+        feature.append(np.where(is_leaf, 0, tree["feature"]))
+        threshold.append(np.where(is_leaf, 0, tree["threshold"]))
+        left.append(np.where(is_leaf, node_ids, tree["left"]) + offset)
+        right.append(np.where(is_leaf, node_ids, tree["right"]) + offset)
+        value.append(tree["value"])
+        default_left.append(tree["default_left"])
+        roots.append(offset)
+
+        max_depth = max(max_depth, _tree_depth(tree["left"], tree["right"]))
+        offset += n_nodes
+
+    return {
+        "feature": np.concatenate(feature).astype(np.intp),
+        "threshold": np.concatenate(threshold).astype(threshold_dtype),
+        "children": np.stack([np.concatenate(left), np.concatenate(right)], axis=1).ravel().astype(np.intp),
+        "value": np.concatenate(value).astype(np.float64),
+        "default_left": np.concatenate(default_left).astype(bool),
+        "roots": np.asarray(roots, dtype=np.int32),
+    }, max_depth
+
+
+def _tree_depth(left, right):
+    depth = np.zeros(len(left), dtype=np.int64)
+    # Les nœuds enfants ont toujours un indice supérieur à leur parent (sklearn et xgboost)
+    for node in range(len(left)):
+        if left[node] >= 0:
+            depth[left[node]] = depth[node] + 1
+            depth[right[node]] = depth[node] + 1
+    return int(depth.max())
+
+
+def _sklearn_forest_trees(estimator):
+    trees = []
+    for est in estimator.estimators_:
+        t = est.tree_
+        missing_left = getattr(t, "missing_go_to_left", None)
+        trees.append({
+            "feature": t.feature,
+            "threshold": t.threshold,
+            "left": t.children_left,
+            "right": t.children_right,
+            "value": t.value[:, 0, 0],
+            "default_left": missing_left if missing_left is not None else np.zeros(t.node_count, dtype=bool),
+        })
+    return trees
+
+
+def _xgboost_trees(estimator):
+    booster = estimator.get_booster()
+    model = json.loads(booster.save_raw("json"))["learner"]
+    objective = model["objective"]["name"]
+    if objective not in ("reg:squarederror", "reg:absoluteerror", "reg:pseudohubererror"):
+        raise TypeError(f"Objectif XGBoost non supporté par le moteur natif : {objective}")
+
+    gbm = model["gradient_booster"]
+    if gbm["name"] != "gbtree":
+        raise TypeError(f"Booster XGBoost non supporté par le moteur natif : {gbm['name']}")
+
+    raw_trees = gbm["model"]["trees"]
+    best_iteration = booster.attr("best_iteration")
+    if best_iteration is not None:
+        indptr = gbm["model"]["iteration_indptr"]
+        raw_trees = raw_trees[:indptr[int(best_iteration) + 1]]
+
+    trees = []
+    for t in raw_trees:
+        left = np.asarray(t["left_children"], dtype=np.int64)
+        conditions = np.asarray(t["split_conditions"], dtype=np.float32)
+        trees.append({
+            "feature": np.asarray(t["split_indices"], dtype=np.int64),
+            "threshold": conditions,
+            "left": left,
+            "right": np.asarray(t["right_children"], dtype=np.int64),
+            # Pour les feuilles, split_conditions contient la valeur de sortie (learning rate inclus)
+            "value": np.where(left < 0, conditions, 0.0),
+            "default_left": np.asarray(t["default_left"], dtype=bool),
+        })
+
+    base_score = model["learner_model_param"]["base_score"].strip("[]")
+    return trees, float(np.float32(base_score))
+
+
+def compile_pipeline(pipeline) -> NativeModel:
+    """
+    Abaisse un pipeline sklearn entraîné en un NativeModel.
+
+    Args:
+        pipeline: `Pipeline(StandardScaler -> estimateur)` ou estimateur seul
+                  (LinearRegression, RandomForestRegressor ou XGBRegressor).
+
+    Returns:
+        NativeModel: Modèle évaluable directement sur des tableaux NumPy.
+
+    Raises:
+        TypeError: Si une étape ou un estimateur n'est pas supporté.
+    """
+
+    steps = list(getattr(pipeline, "steps", [("model", pipeline)]))
+    estimator = steps[-1][1]
+    feature_names = getattr(pipeline, "feature_names_in_", None)
+    n_features = int(estimator.n_features_in_)
+    mean, scale = _scaler_params(steps[:-1], n_features)
+    estimator_name = type(estimator).__name__
+
+    if estimator_name == "LinearRegression":
+        coef = np.asarray(estimator.coef_, dtype=np.float64).ravel()
+        # y = coef . (x - mean) / scale + b  =  (coef / scale) . x + (b - coef . mean / scale)
+        folded_coef = coef / scale
+        intercept = float(estimator.intercept_) - float(folded_coef @ mean)
+        return NativeModel(
+            "linear",
+            {"coef": folded_coef},
+            {"intercept": intercept, "n_features": n_features},
+            feature_names,
+        )
+
+    if estimator_name == "RandomForestRegressor":
+        trees = _sklearn_forest_trees(estimator)
+        # sklearn compare float32(x) <= seuil float64
+        arrays, max_depth = _pack_trees(trees, np.float64)
+        meta = {"aggregate": "mean", "bias": 0.0, "strict": False, "output_dtype": "float64"}
+    elif estimator_name == "XGBRegressor":
+        trees, base_score = _xgboost_trees(estimator)
+        # xgboost compare float32(x) < seuil float32
+        arrays, max_depth = _pack_trees(trees, np.float32)
+        meta = {"aggregate": "sum", "bias": base_score, "strict": True, "output_dtype": "float32"}
+    else:
+        raise TypeError(f"Estimateur non supporté par le moteur natif : {estimator_name}")
+
+    arrays.update({"mean": mean, "scale": scale})
+    meta.update({"max_depth": max_depth, "n_features": n_features})
+    return NativeModel("trees", arrays, meta, feature_names)
@@ -0,0 +1,233 @@
+# src/ml/search.py
+
+import itertools
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from time import perf_counter
+from typing import Dict, List, Optional
+
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.metrics import root_mean_squared_error
+from sklearn.model_selection import KFold
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+from xgboost import XGBRegressor
+
+"""
+Recherche d'hyperparamètres par successive halving, sous budget de temps, pour RandomForest et XGBoost.
+
+Principe :
+- Chaque famille de modèles décrit une grille d'hyperparamètres et une ressource (nombre d'arbres ou de
+  tours de boosting, `n_estimators`). Tous les candidats sont d'abord évalués avec peu de ressource,
+  puis seul le meilleur tiers (ETA = 3) passe au palier suivant, avec trois fois plus de ressource,
+  jusqu'à la ressource maximale.
+- Les folds de validation croisée sont découpés une seule fois et le StandardScaler est ajusté une seule
+  fois par fold : les matrices standardisées sont envoyées une fois à chaque processus du pool, puis
+  réutilisées par tous les candidats de toutes les familles.
+- Toutes les familles partagent un même pool de processus : les évaluations (candidat, fold) d'un palier
+  de RandomForest et d'un palier de XGBoost s'exécutent en même temps.
+- Budget (secondes, optionnel) : limite souple, un palier en cours n'est jamais interrompu. Une fois le
+  budget écoulé, aucun nouveau palier n'est lancé, sauf le premier palier de chaque famille, toujours évalué
+  pour qu'aucune famille ne disparaisse des résultats ; chaque famille retient alors le meilleur candidat du
+  palier le plus élevé atteint.
+- Chaque évaluation est chronométrée ; le journal par candidat (palier, ressource, RMSE, temps cumulé
+  d'ajustement sur les folds) est affiché et renvoyé pour voir où passe le temps d'entraînement.
+
+Les meilleurs candidats sont enfin réentraînés sur tout le jeu d'entraînement, sous la forme
+Pipeline(StandardScaler -> modèle) attendue par l'API et le moteur d'inférence natif.
+"""
+
+# Facteur de réduction des candidats (et d'augmentation de la ressource) entre deux paliers
+ETA = 3
+
+CV_FOLDS = 3
+RANDOM_STATE = 42
+
+FAMILIES = {
+    "RandomForest": {
+        "grid": {"max_depth": [None, 10, 20], "min_samples_leaf": [1, 2, 4], "max_features": [1.0, 0.5]},
+        "max_resource": 200,
+    },
+    "XGBoost": {
+        "grid": {"max_depth": [3, 5, 7], "learning_rate": [0.05, 0.1, 0.2], "subsample": [0.8, 1.0]},
+        "max_resource": 200,
+    },
+}
+
+# Matrices standardisées par fold, chargées une fois par processus du pool
+_FOLDS = None
+
+
+def make_model(family: str, params: dict, n_estimators: int):
+    """
+    Modèle d'une famille avec ses hyperparamètres (un seul thread : le parallélisme vient du pool).
+    """
+
+    if family == "RandomForest":
+        return RandomForestRegressor(n_estimators=n_estimators, random_state=RANDOM_STATE, n_jobs=1, **params)
+    if family == "XGBoost":
+        return XGBRegressor(n_estimators=n_estimators, random_state=RANDOM_STATE, n_jobs=1, eval_metric="rmse", **params)
+    raise ValueError(f"Famille de modèles inconnue : {family}")
+
+
+def candidates(grid: Dict[str, list]) -> List[dict]:
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+
+def scaled_folds(X, y, n_splits: int = CV_FOLDS) -> list:
+    """
+    Découpe les folds et standardise chacun avec un StandardScaler ajusté une seule fois sur sa partie
+    d'entraînement.
+
+    Returns:
+        list: (X_train, y_train, X_valid, y_valid) standardisés, par fold.
+    """
+
+    X = np.ascontiguousarray(X, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    folds = []
+    for train_idx, valid_idx in KFold(n_splits, shuffle=True, random_state=RANDOM_STATE).split(X):
+        scaler = StandardScaler().fit(X[train_idx])
+        folds.append((scaler.transform(X[train_idx]), y[train_idx], scaler.transform(X[valid_idx]), y[valid_idx]))
+    return folds
+
+
+def _init_worker(folds):
+    global _FOLDS
+    _FOLDS = folds
+
+
+def _evaluate(family: str, params: dict, n_estimators: int, fold: int):
+    """
+    Ajuste un candidat sur un fold (scaler déjà appliqué) et renvoie (RMSE de validation, durée d'ajustement).
+    """
+
+    X_train, y_train, X_valid, y_valid = _FOLDS[fold]
+    start = perf_counter()
+    model = make_model(family, params, n_estimators).fit(X_train, y_train)
+    fit_s = perf_counter() - start
+    return root_mean_squared_error(y_valid, model.predict(X_valid)), fit_s
+
+
+def _refit(family: str, params: dict, n_estimators: int, X, y):
+    start = perf_counter()
+    pipeline = Pipeline([("scaler", StandardScaler()), ("model", make_model(family, params, n_estimators))])
+    pipeline.fit(X, y)
+    return pipeline, perf_counter() - start
+
+
+def rungs(n_candidates: int, max_resource: int, eta: int = ETA) -> List[int]:
+    """
+    Ressource de chaque palier : max_resource / eta^k, ..., max_resource / eta, max_resource.
+    """
+
+    n_rungs = int(math.log(n_candidates, eta) + 1e-9) + 1 if n_candidates > 1 else 1
+    resources = [max(1, max_resource // eta ** k) for k in reversed(range(n_rungs))]
+    return sorted(set(resources))
+
+
+def successive_halving(X, y, families: Optional[Dict[str, dict]] = None, budget_s: Optional[float] = None,
+                       n_jobs: Optional[int] = None, eta: int = ETA) -> Dict[str, dict]:
+    """
+    Recherche les meilleurs hyperparamètres de chaque famille par successive halving sur un pool partagé.
+
+    Args:
+        X (DataFrame): Features d'entraînement.
+        y (Series): Cible.
+        families (dict, optionnel): Familles à rechercher ({nom: {"grid", "max_resource"}}, FAMILIES par défaut).
+        budget_s (float, optionnel): Budget souple en secondes : au-delà, aucun nouveau palier n'est lancé
+            (le palier en cours se termine, et le premier palier de chaque famille est toujours évalué).
+        n_jobs (int, optionnel): Nombre de processus du pool (nombre de CPU par défaut).
+        eta (int): Facteur de réduction entre paliers.
+
+    Returns:
+        dict: Par famille : pipeline réentraîné ("model"), "best_params", "cv_rmse" et "log" (une entrée par
+        candidat et par palier : params, resource, rung, rmse, fit_s).
+    """
+
+    families = families or FAMILIES
+    start = perf_counter()
+    folds = scaled_folds(X, y)
+    print(f"Folds standardisés une fois ({len(folds)} scalers) en {perf_counter() - start:.2f} s")
+
+    state = {}
+    for name, spec in families.items():
+        pool_candidates = candidates(spec["grid"])
+        state[name] = {
+            "alive": pool_candidates,
+            "resources": rungs(len(pool_candidates), spec["max_resource"], eta),
+            "rung": 0,
+            "best": None,
+            "log": [],
+        }
+        print(f"{name} : {len(pool_candidates)} candidats, paliers n_estimators = {state[name]['resources']}")
+
+    stopped = set()
+    with ProcessPoolExecutor(max_workers=n_jobs or os.cpu_count(), initializer=_init_worker, initargs=(folds,)) as pool:
+        while True:
+            active = [name for name, s in state.items() if s["rung"] < len(s["resources"]) and name not in stopped]
+            if budget_s is not None and perf_counter() - start > budget_s:
+                # Une famille sans palier terminé n'aurait aucun candidat : son premier palier est évalué malgré tout
+                late = [name for name in active if state[name]["rung"] > 0]
+                if late:
+                    print(f"Budget de {budget_s:.0f} s écoulé : arrêt avant les paliers suivants de {', '.join(late)}")
+                stopped.update(late)
+                active = [name for name in active if name not in stopped]
+            if not active:
+                break
+
+            # Un palier de chaque famille active, toutes les évaluations (candidat, fold) soumises ensemble
+            futures = {}
+            for name in active:
+                s = state[name]
+                resource = s["resources"][s["rung"]]
+                for i, params in enumerate(s["alive"]):
+                    for fold in range(len(folds)):
+                        futures[name, i, fold] = pool.submit(_evaluate, name, params, resource, fold)
+
+            for name in active:
+                s = state[name]
+                resource = s["resources"][s["rung"]]
+                scored = []
+                for i, params in enumerate(s["alive"]):
+                    results = [futures[name, i, fold].result() for fold in range(len(folds))]
+                    entry = {
+                        "params": params,
+                        "resource": resource,
+                        "rung": s["rung"],
+                        "rmse": float(np.mean([rmse for rmse, _ in results])),
+                        "fit_s": round(sum(fit_s for _, fit_s in results), 4),
+                    }
+                    s["log"].append(entry)
+                    scored.append(entry)
+                    print(f"  [{name}] palier {s['rung']} n_estimators={resource:<4} RMSE={entry['rmse']:.3f} "
+                          f"ajustement={entry['fit_s']:.2f} s {params}")
+                scored.sort(key=lambda entry: entry["rmse"])
+                s["best"] = scored[0]
+                s["alive"] = [entry["params"] for entry in scored[:max(1, math.ceil(len(scored) / eta))]]
+                s["rung"] += 1
+
+        refits = {
+            name: pool.submit(_refit, name, s["best"]["params"], s["best"]["resource"], X, y)
+            for name, s in state.items() if s["best"] is not None
+        }
+        results = {}
+        for name, future in refits.items():
+            pipeline, refit_s = future.result()
+            s = state[name]
+            fit_total = sum(entry["fit_s"] for entry in s["log"])
+            print(f"{name} : meilleur {s['best']['params']} (n_estimators={s['best']['resource']}, "
+                  f"RMSE CV={s['best']['rmse']:.3f}) ; {len(s['log'])} évaluations, {fit_total:.2f} s d'ajustement "
+                  f"cumulé, réentraînement {refit_s:.2f} s")
+            results[name] = {
+                "model": pipeline,
+                "best_params": {**s["best"]["params"], "n_estimators": s["best"]["resource"]},
+                "cv_rmse": s["best"]["rmse"],
+                "log": s["log"],
+            }
+
+    print(f"Recherche terminée en {perf_counter() - start:.2f} s")
+    return results
@@ -0,0 +1,333 @@
+# src/pipeline.py
+
+import argparse
+import hashlib
+import importlib
+import json
+import os
+import sys
+from time import perf_counter
+from typing import Callable, List, Optional
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+"""
+Exécution de la chaîne complète : téléchargement → nettoyage → chargement en base → entraînement → évaluation.
+
+Chaque étape est décrite par ses fichiers d'entrée, ses paramètres, son code et ses fichiers de sortie.
+Son empreinte est le hash (SHA-256) du contenu de ses entrées, de ses paramètres, de ses fichiers source et,
+le cas échéant, de sa cible (variables d'environnement de connexion à la base) : une étape dont l'empreinte
+n'a pas changé depuis sa dernière exécution réussie (et dont les sorties sont intactes, fichiers comme table
+en base) est sautée. Comme les entrées d'une étape sont les sorties de la précédente, seules les étapes
+en aval d'un changement effectif sont relancées (une sortie régénérée à l'identique ne propage rien).
+
+L'état des exécutions est conservé dans data/.pipeline/state.json.
+
+Les options viennent des arguments ou d'un fichier de configuration JSON (les arguments sont prioritaires) :
+    {"url": "...", "impute": "median", "chunksize": 100000, "table": "concrete_strength", "load_mode": "upsert",
+     "search": "halving", "budget": 120}
+
+Exemples (depuis la racine du projet) :
+    python -m src.pipeline                         # toutes les étapes nécessaires
+    python -m src.pipeline --impute median         # nettoyage et étapes en aval relancés
+    python -m src.pipeline --to clean --dry-run    # étapes qui seraient exécutées
+    python -m src.pipeline --force train           # force l'entraînement (et l'évaluation si le modèle change)
+"""
+
+STATE_PATH = os.path.join("data", ".pipeline", "state.json")
+
+RAW_CSV = os.path.join("data", "raw", "concrete_data.csv")
+PROCESSED_CSV = os.path.join("data", "processed", "concrete_data_clean.csv")
+MODEL_PATH = os.path.join("models", "best_model.joblib")
+EVALUATION_PATH = os.path.join("data", "processed", "evaluation.json")
+
+DEFAULT_OPTIONS = {
+    "url": "https://archive.ics.uci.edu/ml/machine-learning-databases/concrete/compressive/Concrete_Data.xls",
+    "impute": "mean",
+    # Nettoyage par blocs de N lignes (None : fichier entier en mémoire)
+    "chunksize": None,
+    "table": "concrete_strength",
+    # Chargement en base : 'replace' (la table reflète le CSV nettoyé) ou 'upsert' (ajout des lignes nouvelles)
+    "load_mode": "replace",
+    "load_format": "binary",
+    "load_workers": 1,
+    # Entraînement : recherche d'hyperparamètres ('halving' ou 'grid') et budget souple en secondes (halving)
+    "search": "halving",
+    "budget": None,
+}
+
+# Variables de connexion identifiant la base cible du chargement
+DATABASE_ENV = ["PG_HOST", "PG_PORT", "PG_DATABASE", "PG_USER"]
+
+# Taille des blocs lus pour le hash des fichiers
+HASH_BLOCK_BYTES = 1 << 20
+
+
+def script(module: str):
+    """
+    Importe un script numéroté (ex. 'src.etl.2-clean_data') comme module.
+    """
+
+    return importlib.import_module(module)
+
+
+def file_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_BYTES), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class Stage:
+    """
+    Étape de la chaîne.
+
+    Args:
+        name (str): Nom de l'étape.
+        run (Callable): Fonction exécutant l'étape à partir des options.
+        inputs (list[str]): Fichiers lus.
+        outputs (list[str]): Fichiers produits.
+        params (list[str]): Options dont dépend l'étape.
+        sources (list[str]): Fichiers de code de l'étape (leur modification relance l'étape).
+        enabled (Callable, optionnel): Retourne None si l'étape peut s'exécuter, sinon la raison de son exclusion.
+        env (list[str], optionnel): Variables d'environnement identifiant la cible de l'étape (incluses dans l'empreinte).
+        signature (Callable, optionnel): Signature des sorties hors fichiers (ex. contenu d'une table), enregistrée
+            après l'exécution et comparée avant de sauter l'étape.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        run: Callable[[dict], None],
+        inputs: List[str],
+        outputs: List[str],
+        params: List[str],
+        sources: List[str],
+        enabled: Optional[Callable[[], Optional[str]]] = None,
+        env: Optional[List[str]] = None,
+        signature: Optional[Callable[[dict], Optional[str]]] = None,
+    ):
+        self.name = name
+        self.run = run
+        self.inputs = inputs
+        self.outputs = outputs
+        self.params = params
+        self.sources = sources
+        self.enabled = enabled or (lambda: None)
+        self.env = env or []
+        self.signature = signature
+
+    def fingerprint(self, options: dict) -> str:
+        """
+        Hash des entrées, des paramètres et du code de l'étape.
+
+        Raises:
+            FileNotFoundError: Si une entrée est absente.
+        """
+
+        digest = hashlib.sha256(self.name.encode())
+        for path in self.inputs + self.sources:
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"Entrée manquante pour l'étape '{self.name}' : {path}")
+            digest.update(f"{path}:{file_hash(path)}".encode())
+        digest.update(json.dumps({name: options[name] for name in self.params}, sort_keys=True).encode())
+        digest.update(json.dumps({name: os.getenv(name) for name in self.env}, sort_keys=True).encode())
+        return digest.hexdigest()
+
+    def record(self, options: dict) -> dict:
+        """
+        État des sorties après exécution : hash des fichiers et signature éventuelle.
+        """
+
+        record = {"outputs": {path: file_hash(path) for path in self.outputs}}
+        if self.signature is not None:
+            record["signature"] = self.signature(options)
+        return record
+
+    def outputs_intact(self, recorded: dict, options: dict) -> bool:
+        files = recorded.get("outputs", {})
+        if not all(os.path.exists(path) and file_hash(path) == files.get(path) for path in self.outputs):
+            return False
+        if self.signature is None:
+            return True
+        try:
+            current = self.signature(options)
+        except Exception as e:
+            print(f"[{self.name}] sorties non vérifiables ({e})")
+            return False
+        return current is not None and current == recorded.get("signature")
+
+
+def source_path(module: str) -> str:
+    return os.path.join(*module.split(".")) + ".py"
+
+
+def run_download(options):
+    script("src.etl.1-download_data").main(options["url"], RAW_CSV)
+
+
+def run_clean(options):
+    script("src.etl.2-clean_data").main(options["impute"], RAW_CSV, PROCESSED_CSV, options["chunksize"])
+
+
+def run_load(options):
+    script("src.etl.3-load_to_db").main(
+        PROCESSED_CSV, options["table"], options["load_mode"], options["load_format"], options["load_workers"]
+    )
+
+
+def run_train(options):
+    script("src.ml.1-train_model").main(PROCESSED_CSV, MODEL_PATH, options["search"], options["budget"])
+
+
+def run_evaluate(options):
+    metrics = script("src.ml.3-evaluate_model").main(PROCESSED_CSV, MODEL_PATH)
+    with open(EVALUATION_PATH, "w") as f:
+        json.dump(metrics, f, indent=2)
+
+
+def database_configured():
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    return None if os.getenv("PG_HOST") else "PG_HOST non défini"
+
+
+def table_signature(options):
+    return script("src.etl.3-load_to_db").table_signature(options["table"])
+
+
+# Lecture et écriture des jeux de données, partagées par le nettoyage, l'entraînement et l'évaluation
+STORAGE_SOURCE = os.path.join("src", "storage.py")
+
+STAGES = [
+    Stage("download", run_download, [], [RAW_CSV], ["url"], [source_path("src.etl.1-download_data")]),
+    Stage("clean", run_clean, [RAW_CSV], [PROCESSED_CSV], ["impute", "chunksize"],
+          [source_path("src.etl.2-clean_data"), os.path.join("src", "etl", "sketches.py"), os.path.join("src", "features.py"),
+           STORAGE_SOURCE]),
+    Stage("load", run_load, [PROCESSED_CSV], [], ["table", "load_mode", "load_format", "load_workers"],
+          [source_path("src.etl.3-load_to_db")], enabled=database_configured, env=DATABASE_ENV, signature=table_signature),
+    Stage("train", run_train, [PROCESSED_CSV], [MODEL_PATH], ["search", "budget"],
+          [source_path("src.ml.1-train_model"), source_path("src.ml.search"), STORAGE_SOURCE]),
+    Stage("evaluate", run_evaluate, [PROCESSED_CSV, MODEL_PATH], [EVALUATION_PATH], [],
+          [source_path("src.ml.3-evaluate_model"), STORAGE_SOURCE]),
+]
+
+STAGE_NAMES = [stage.name for stage in STAGES]
+
+
+def load_state(path: str = STATE_PATH) -> dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_state(state: dict, path: str = STATE_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + ".tmp", "w") as f:
+        json.dump(state, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def run_pipeline(options: dict, first: str, last: str, force: List[str], dry_run: bool = False) -> List[str]:
+    """
+    Exécute les étapes de `first` à `last`, en sautant celles dont l'empreinte n'a pas changé.
+
+    Args:
+        options (dict): Options des étapes (url, impute, table).
+        first (str): Première étape considérée.
+        last (str): Dernière étape considérée.
+        force (list[str]): Étapes exécutées même si leur empreinte n'a pas changé.
+        dry_run (bool): Affiche le plan sans rien exécuter.
+
+    Returns:
+        list[str]: Étapes exécutées (ou qui le seraient en mode dry-run ; les étapes à jour situées en aval
+        d'une étape planifiée n'y figurent pas, leur exécution dépendant du contenu régénéré).
+    """
+
+    state = load_state()
+    selected = STAGES[STAGE_NAMES.index(first):STAGE_NAMES.index(last) + 1]
+    executed = []
+
+    for stage in selected:
+        reason = stage.enabled()
+        if reason is not None:
+            print(f"[{stage.name}] ignorée ({reason})")
+            continue
+
+        try:
+            fingerprint = stage.fingerprint(options)
+        except FileNotFoundError:
+            if dry_run and executed:
+                # Entrée produite par une étape précédente du plan
+                print(f"[{stage.name}] à exécuter (entrées produites en amont)")
+                executed.append(stage.name)
+                continue
+            raise
+
+        recorded = state.get(stage.name, {})
+        up_to_date = recorded.get("fingerprint") == fingerprint and stage.outputs_intact(recorded, options)
+        if up_to_date and stage.name not in force:
+            if dry_run and executed:
+                # Ses entrées seront régénérées en amont : elle ne sera sautée que si elles restent identiques
+                print(f"[{stage.name}] à réexécuter si la sortie change (en aval de {executed[-1]})")
+            else:
+                print(f"[{stage.name}] à jour, sautée")
+            continue
+
+        executed.append(stage.name)
+        if dry_run:
+            print(f"[{stage.name}] à exécuter")
+            continue
+
+        print(f"[{stage.name}] exécution...")
+        start = perf_counter()
+        stage.run(options)
+        state[stage.name] = {
+            "fingerprint": fingerprint,
+            **stage.record(options),
+            "duration_s": round(perf_counter() - start, 3),
+        }
+        save_state(state)
+        print(f"[{stage.name}] terminée en {perf_counter() - start:.2f} s")
+
+    return executed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chaîne téléchargement → nettoyage → chargement → entraînement → évaluation.")
+    parser.add_argument("--config", help="Fichier de configuration JSON (url, impute, chunksize, table, load_mode, ...).")
+    parser.add_argument("--url", help="URL du jeu de données brut (.xls, .xlsx ou .csv).")
+    parser.add_argument("--impute", choices=["mean", "median"], help="Stratégie d'imputation du nettoyage.")
+    parser.add_argument("--chunksize", type=int, help="Nettoyage par blocs de N lignes (mémoire bornée).")
+    parser.add_argument("--table", help="Table PostgreSQL chargée.")
+    parser.add_argument("--load-mode", choices=["replace", "upsert"], help="Mode de chargement en base.")
+    parser.add_argument("--load-format", choices=["csv", "binary"], help="Format COPY du chargement en base.")
+    parser.add_argument("--load-workers", type=int, help="Connexions parallèles du chargement en base.")
+    parser.add_argument("--search", choices=["halving", "grid"], help="Recherche d'hyperparamètres de l'entraînement.")
+    parser.add_argument("--budget", type=float, help="Budget souple (s) de la recherche par successive halving.")
+    parser.add_argument("--from", dest="first", choices=STAGE_NAMES, default=STAGE_NAMES[0], help="Première étape.")
+    parser.add_argument("--to", dest="last", choices=STAGE_NAMES, default=STAGE_NAMES[-1], help="Dernière étape.")
+    parser.add_argument("--force", nargs="*", choices=STAGE_NAMES + ["all"], default=[],
+                        help="Étapes exécutées même si elles sont à jour ('all' pour toutes).")
+    parser.add_argument("--dry-run", action="store_true", help="Affiche les étapes à exécuter sans les lancer.")
+    args = parser.parse_args()
+
+    options = dict(DEFAULT_OPTIONS)
+    if args.config:
+        with open(args.config) as f:
+            options.update(json.load(f))
+    options.update({name: getattr(args, name) for name in DEFAULT_OPTIONS if getattr(args, name) is not None})
+
+    if STAGE_NAMES.index(args.first) > STAGE_NAMES.index(args.last):
+        parser.error(f"--from {args.first} est après --to {args.last}.")
+    force = STAGE_NAMES if "all" in args.force else args.force
+
+    executed = run_pipeline(options, args.first, args.last, force, args.dry_run)
+    print(f"\n{len(executed)} étape(s) {'à exécuter' if args.dry_run else 'exécutée(s)'} : {', '.join(executed) or 'aucune'}")
+
+
+if __name__ == "__main__":
+    main()
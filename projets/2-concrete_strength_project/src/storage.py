@@ -0,0 +1,186 @@
+# src/storage.py
+
+import argparse
+import importlib
+import os
+from typing import Optional, Sequence
+
+import pandas as pd
+
+"""
+Stockage colonnaire des jeux de données (brut, nettoyé, entrées d'entraînement et de prédiction).
+
+Le format est déduit de l'extension du fichier :
+- `.csv` : texte, relu et retypé à chaque lecture (format historique, toujours accepté) ;
+- `.parquet` : colonnaire compressé (zstd), le plus compact ;
+- `.arrow` / `.feather` : Arrow IPC non compressé, projeté en mémoire (mmap) : la lecture ne copie pas
+  le fichier, seules les pages des colonnes demandées sont chargées par le système.
+
+Les fichiers Parquet et Arrow sont écrits avec un schéma explicite : toutes les colonnes en float64
+(par défaut, valeurs identiques au CSV) ou en float32 (fichiers deux fois plus petits). Les lecteurs
+peuvent ne demander que les colonnes utiles (`columns=`), sans lire les autres.
+
+Parquet et Arrow nécessitent le paquet optionnel `pyarrow`.
+
+Conversion d'un CSV existant (depuis la racine du projet) :
+    python -m src.storage data/processed/concrete_data_clean.csv --format parquet
+    python -m src.storage data/raw/concrete_data.csv --format arrow --precision float32
+"""
+
+FORMATS = {".csv": "csv", ".parquet": "parquet", ".arrow": "arrow", ".feather": "arrow"}
+EXTENSIONS = {"csv": ".csv", "parquet": ".parquet", "arrow": ".arrow"}
+PRECISIONS = ("float64", "float32")
+
+# Compression des fichiers Parquet (les fichiers Arrow restent non compressés pour être projetés en mémoire)
+PARQUET_COMPRESSION = "zstd"
+
+
+def storage_format(path: str) -> str:
+    """
+    Format de stockage déduit de l'extension : 'csv', 'parquet' ou 'arrow'.
+
+    Raises:
+        ValueError: Si l'extension n'est pas reconnue.
+    """
+
+    extension = os.path.splitext(str(path))[1].lower()
+    if extension not in FORMATS:
+        raise ValueError(f"Extension non supportée : '{extension}' (attendu : {', '.join(FORMATS)})")
+    return FORMATS[extension]
+
+
+def with_format(path: str, fmt: str) -> str:
+    """
+    Même chemin avec l'extension du format demandé.
+    """
+
+    return os.path.splitext(str(path))[0] + EXTENSIONS[fmt]
+
+
+def schema(columns: Sequence[str], precision: str = "float64"):
+    """
+    Schéma Arrow explicite : toutes les colonnes dans la précision demandée.
+    """
+
+    if precision not in PRECISIONS:
+        raise ValueError(f"Précision inconnue : {precision} (attendu : {', '.join(PRECISIONS)})")
+    pa = _import_pyarrow("pyarrow")
+    return pa.schema([pa.field(col, getattr(pa, precision)()) for col in columns])
+
+
+def read_table(path: str, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """
+    Lit un jeu de données (CSV, Parquet ou Arrow) en DataFrame.
+
+    Args:
+        path (str): Fichier à lire (format déduit de l'extension).
+        columns (list[str], optionnel): Colonnes à lire (toutes sinon) ; les autres ne sont pas décodées.
+
+    Returns:
+        pd.DataFrame: Données, colonnes dans l'ordre demandé.
+
+    Raises:
+        FileNotFoundError: Si le fichier n'existe pas.
+        KeyError: Si une colonne demandée est absente (quel que soit le format).
+    """
+
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Fichier non trouvé : {path}")
+    columns = list(columns) if columns is not None else None
+    fmt = storage_format(path)
+
+    if fmt == "csv":
+        if columns is not None:
+            # En-tête seul : les colonnes sont vérifiées avant de lire les données
+            _check_columns(path, columns, pd.read_csv(path, nrows=0).columns)
+        df = pd.read_csv(path, usecols=columns)
+        return df[columns] if columns is not None else df
+
+    if fmt == "parquet":
+        pq = _import_pyarrow("pyarrow.parquet")
+        if columns is not None:
+            # Schéma seul (pied de fichier) : les colonnes sont vérifiées avant de lire les données
+            _check_columns(path, columns, pq.read_schema(path).names)
+        table = pq.read_table(path, columns=columns, memory_map=True)
+    else:
+        pa = _import_pyarrow("pyarrow")
+        # Les tampons de la table référencent directement la projection mémoire (pas de copie)
+        table = pa.ipc.open_file(pa.memory_map(str(path), "r")).read_all()
+        if columns is not None:
+            _check_columns(path, columns, table.column_names)
+            table = table.select(columns)
+    return table.to_pandas(split_blocks=True)
+
+
+def write_table(df: pd.DataFrame, path: str, precision: str = "float64"):
+    """
+    Écrit un DataFrame numérique au format déduit de l'extension (schéma explicite pour Parquet et Arrow).
+
+    Args:
+        df (pd.DataFrame): Données (colonnes numériques).
+        path (str): Fichier produit.
+        precision (str): 'float64' ou 'float32' (Parquet et Arrow).
+    """
+
+    fmt = storage_format(path)
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    if fmt == "csv":
+        df.to_csv(path, index=False)
+        return
+
+    pa = _import_pyarrow("pyarrow")
+    table = pa.Table.from_pandas(df, schema=schema(df.columns, precision), preserve_index=False)
+    # Écriture dans un fichier temporaire puis renommage : un lecteur ne voit jamais un fichier partiel
+    tmp_path = f"{path}.tmp"
+    if fmt == "parquet":
+        _import_pyarrow("pyarrow.parquet").write_table(table, tmp_path, compression=PARQUET_COMPRESSION)
+    else:
+        with pa.OSFile(tmp_path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, path)
+
+
+def convert(input_path: str, fmt: str = "parquet", output_path: Optional[str] = None, precision: str = "float64") -> str:
+    """
+    Convertit un fichier existant (CSV en général) vers un autre format de stockage.
+
+    Args:
+        input_path (str): Fichier source.
+        fmt (str): Format cible ('parquet', 'arrow' ou 'csv').
+        output_path (str, optionnel): Fichier produit (même nom, nouvelle extension par défaut).
+        precision (str): 'float64' ou 'float32'.
+
+    Returns:
+        str: Chemin du fichier produit.
+    """
+
+    output_path = output_path or with_format(input_path, fmt)
+    df = read_table(input_path)
+    write_table(df, output_path, precision)
+    print(f"{input_path} ({os.path.getsize(input_path) / 1e6:.2f} Mo) -> {output_path} "
+          f"({os.path.getsize(output_path) / 1e6:.2f} Mo, {len(df)} lignes, {precision})")
+    return output_path
+
+
+def _check_columns(path: str, columns: Sequence[str], available: Sequence[str]):
+    missing = [col for col in columns if col not in set(available)]
+    if missing:
+        raise KeyError(f"Colonnes absentes de {path} : {', '.join(missing)}")
+
+
+def _import_pyarrow(module: str):
+    try:
+        return importlib.import_module(module)
+    except ImportError:
+        raise ValueError("Formats Parquet et Arrow indisponibles : le paquet 'pyarrow' n'est pas installé.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convertit des jeux de données CSV en Parquet ou Arrow.")
+    parser.add_argument("inputs", nargs="+", help="Fichiers à convertir.")
+    parser.add_argument("--format", dest="fmt", choices=list(EXTENSIONS), default="parquet", help="Format cible.")
+    parser.add_argument("--precision", choices=PRECISIONS, default="float64", help="Précision des colonnes.")
+    args = parser.parse_args()
+    for input_path in args.inputs:
+        convert(input_path, args.fmt, precision=args.precision)
@@ -0,0 +1,7 @@
+# tests/conftest.py
+
+import os
+import sys
+
+# Permet d'importer le package `src` quel que soit le répertoire de lancement de pytest
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
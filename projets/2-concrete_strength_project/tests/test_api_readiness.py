@@ -0,0 +1,33 @@
+# tests/test_api_readiness.py
+
+import asyncio
+import importlib
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+
+@pytest.fixture
+def main(monkeypatch):
+    # Démarrage paresseux : le module s'importe sans charger de modèle
+    monkeypatch.setenv("API_LAZY_STARTUP", "1")
+    module = importlib.import_module("src.api.main")
+    monkeypatch.setattr(module.startup, "ready", False)
+    monkeypatch.setattr(module.startup, "error", None)
+    return module
+
+
+def test_requests_are_refused_until_startup_is_ready(main, monkeypatch):
+    from fastapi import HTTPException
+
+    # Modèle déjà actif, exécuteur pas encore démarré
+    monkeypatch.setattr(main.registry, "active", object())
+    with pytest.raises(HTTPException) as refused:
+        asyncio.run(main.checkout_model(None))
+    assert refused.value.status_code == 503
+    assert refused.value.headers["Retry-After"] == "1"
+
+    monkeypatch.setattr(main.startup, "error", "exécuteur indisponible")
+    with pytest.raises(HTTPException, match="exécuteur indisponible"):
+        asyncio.run(main.checkout_model(None))
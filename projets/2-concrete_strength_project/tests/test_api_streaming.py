@@ -0,0 +1,63 @@
+# tests/test_api_streaming.py
+
+import importlib
+import io
+import json
+
+import numpy as np
+import pytest
+
+pytest.importorskip("fastapi")
+
+HEADER = "cement,slag,fly_ash,water,superplasticizer,coarse_aggregate,fine_aggregate,age\n"
+ROW = "540,0,0,162,2.5,1040,676,28\n"
+
+
+class ConstantModel:
+    def predict(self, X):
+        return np.full(len(X), 42.0)
+
+
+@pytest.fixture
+def main(monkeypatch):
+    # Démarrage paresseux : le module s'importe sans charger de modèle ; exécuteur inline
+    monkeypatch.setenv("API_LAZY_STARTUP", "1")
+    module = importlib.import_module("src.api.main")
+    module.import_heavy_modules()
+    return module
+
+
+def stream(main, text, fmt):
+    from src.api.registry import ModelVersion
+
+    entry = ModelVersion("test", "test.joblib", "0" * 16, ConstantModel())
+    entry.in_flight = 1
+    chunks = main.pd.read_csv(io.StringIO(text), chunksize=2)
+    body = "".join(main.stream_predictions(chunks, next(chunks), fmt, entry))
+    assert entry.in_flight == 0
+    return body.splitlines()
+
+
+# Guillemet non fermé (erreur du parseur CSV) ou valeur non numérique (erreur de conversion)
+@pytest.mark.parametrize("bad_row", ["540,\"0,0,162,2.5,1040,676,28\n", "abc,0,0,162,2.5,1040,676,28\n"])
+def test_malformed_second_chunk_ends_ndjson_stream_with_error(main, bad_row):
+    lines = stream(main, HEADER + ROW * 2 + bad_row + ROW, "ndjson")
+
+    assert [json.loads(line)["row"] for line in lines[:2]] == [0, 1]
+    error = json.loads(lines[-1])
+    assert error["row"] == 2
+    assert error["error"]
+    assert len(lines) == 3
+
+
+def test_malformed_second_chunk_ends_csv_stream_with_error(main):
+    lines = stream(main, HEADER + ROW * 2 + "abc,0,0,162,2.5,1040,676,28\n", "csv")
+
+    assert lines[:3] == ["row,predicted_strength_MPa", "0,42.0", "1,42.0"]
+    assert lines[-1].startswith(f"{main.STREAM_ERROR_MARKER},2,\"")
+    assert len(lines) == 4
+
+
+def test_complete_stream_has_no_error_line(main):
+    lines = stream(main, HEADER + ROW * 3, "ndjson")
+    assert [json.loads(line) for line in lines] == [{"row": i, "predicted_strength_MPa": 42.0} for i in range(3)]
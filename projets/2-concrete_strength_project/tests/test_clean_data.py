@@ -0,0 +1,70 @@
+# tests/test_clean_data.py
+
+import importlib
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.etl.sketches import DEFAULT_RELATIVE_ACCURACY, ColumnStats
+
+cleaner = importlib.import_module("src.etl.2-clean_data")
+
+
+def make_raw(n_rows=401, seed=0):
+    """
+    Jeu brut aux colonnes d'échelles variées, avec des valeurs extrêmes à écrêter.
+    """
+
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({col: rng.lognormal(3, 0.6, n_rows) for col in cleaner.COLUMNS})
+    df.loc[:4, "water"] = 5_000.0
+    return df
+
+
+@pytest.mark.parametrize("n_rows", [400, 401])
+def test_sketch_quantiles_follow_pandas_linear_interpolation(n_rows):
+    values = make_raw(n_rows)["cement"]
+    stats = ColumnStats()
+    for start in range(0, n_rows, 64):
+        stats.update(values.iloc[start:start + 64].to_numpy())
+    summary = stats.summary()
+
+    # Écart borné par α fois la plus grande des deux valeurs encadrant le rang interpolé
+    for name, q in (("q1", 0.25), ("median", 0.5), ("q3", 0.75)):
+        expected = values.quantile(q)
+        bound = DEFAULT_RELATIVE_ACCURACY * values.quantile(q, interpolation="higher")
+        assert abs(summary[name] - expected) <= bound, name
+
+
+def test_sketch_interpolates_between_distant_ranks():
+    stats = ColumnStats()
+    stats.update(np.array([10.0, 20.0, 30.0, 40.0]))
+    summary = stats.summary()
+    # Rang médian 1.5 : 25 comme pandas, et non la valeur d'un rang voisin (20 ou 30)
+    assert summary["median"] == pytest.approx(25, rel=DEFAULT_RELATIVE_ACCURACY)
+    assert summary["q1"] == pytest.approx(17.5, rel=DEFAULT_RELATIVE_ACCURACY)
+    assert summary["q3"] == pytest.approx(32.5, rel=DEFAULT_RELATIVE_ACCURACY)
+
+
+def test_chunked_cleaning_matches_in_memory_cleaning(tmp_path):
+    raw = make_raw()
+    # Colonne entièrement vide : ni imputée ni écrêtée, dans les deux modes
+    raw["slag"] = np.nan
+    raw_path = tmp_path / "raw.csv"
+    raw.to_csv(raw_path, index=False)
+
+    chunked_path = tmp_path / "chunked.csv"
+    cleaner.clean_chunked(str(raw_path), str(chunked_path), "median", chunksize=50,
+                          stats_path=str(tmp_path / "stats.json"))
+    chunked = pd.read_csv(chunked_path)
+    in_memory = cleaner.clean_and_engineer(pd.read_csv(raw_path), "median")
+
+    assert chunked.columns.tolist() == in_memory.columns.tolist()
+    assert chunked["slag"].isna().all() and in_memory["slag"].isna().all()
+    for col in in_memory.columns:
+        scale = np.nanmax(np.abs(in_memory[col])) if in_memory[col].notna().any() else 0
+        np.testing.assert_allclose(chunked[col], in_memory[col], rtol=0,
+                                   atol=4 * DEFAULT_RELATIVE_ACCURACY * scale, err_msg=col)
+    # Valeurs extrêmes écrêtées à la même borne IQR (à l'erreur du sketch près)
+    assert chunked["water"].max() < 500
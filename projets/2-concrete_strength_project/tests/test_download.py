@@ -0,0 +1,134 @@
+# tests/test_download.py
+
+import hashlib
+import importlib
+import os
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+downloader = importlib.import_module("src.etl.1-download_data")
+
+DATA = bytes(range(256)) * 400
+
+
+class RangeHandler(BaseHTTPRequestHandler):
+    """
+    Serveur de fichiers minimal : ETag fort, If-None-Match (304), Range + If-Range (206), coupure simulée.
+    """
+
+    def log_message(self, *args):
+        pass
+
+    def do_HEAD(self):
+        self.respond(body=False)
+
+    def do_GET(self):
+        self.respond(body=True)
+
+    def respond(self, body):
+        site = self.server.site
+        data = site["data"]
+        etag = '"%s"' % hashlib.md5(data).hexdigest()
+        site["requests"].append((self.command, dict(self.headers)))
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+
+        start, end, status = 0, len(data) - 1, 200
+        requested = self.headers.get("Range")
+        if requested and self.headers.get("If-Range") in (None, etag):
+            match = re.match(r"bytes=(\d+)-(\d*)", requested)
+            start = int(match.group(1))
+            end = int(match.group(2)) if match.group(2) else len(data) - 1
+            status = 206
+        payload = data[start:end + 1]
+        self.send_response(status)
+        self.send_header("ETag", etag)
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Content-Length", str(len(payload)))
+        if status == 206:
+            self.send_header("Content-Range", f"bytes {start}-{end}/{len(data)}")
+        self.end_headers()
+        if not body:
+            return
+        if site["cut_after"] is not None:
+            # Connexion coupée en cours de transfert
+            payload, site["cut_after"] = payload[:site["cut_after"]], None
+            self.close_connection = True
+        self.wfile.write(payload)
+
+
+@pytest.fixture
+def site():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), RangeHandler)
+    server.site = {"data": DATA, "requests": [], "cut_after": None}
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    server.site["url"] = f"http://127.0.0.1:{server.server_address[1]}/concrete.csv"
+    yield server.site
+    server.shutdown()
+    server.server_close()
+
+
+def read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def test_interrupted_download_resumes_with_range(site, tmp_path, monkeypatch):
+    # Blocs de 4 Kio : seul le bloc en cours de réception est perdu à la coupure
+    monkeypatch.setattr(downloader, "CHUNK_BYTES", 4096)
+    dest = str(tmp_path / "concrete.csv")
+    site["cut_after"] = 10_000
+
+    with pytest.raises(Exception):
+        downloader.download_file(site["url"], dest)
+    assert not os.path.exists(dest)
+    assert os.path.getsize(dest + ".part") == 8192
+
+    assert downloader.download_file(site["url"], dest, hashlib.sha256(DATA).hexdigest())
+    assert read(dest) == DATA
+    _, headers = site["requests"][-1]
+    assert headers["Range"] == "bytes=8192-"
+    assert all(headers["Accept-Encoding"] == "identity" for _, headers in site["requests"])
+
+
+def test_unchanged_file_is_revalidated_with_304(site, tmp_path):
+    dest = str(tmp_path / "concrete.csv")
+    assert downloader.download_file(site["url"], dest)
+    assert not downloader.download_file(site["url"], dest)
+
+    _, headers = site["requests"][-1]
+    assert headers["If-None-Match"]
+    assert read(dest) == DATA
+
+    # Ressource modifiée : nouvel ETag, fichier retéléchargé
+    site["data"] = DATA[::-1]
+    assert downloader.download_file(site["url"], dest)
+    assert read(dest) == DATA[::-1]
+
+
+def test_checksum_mismatch_discards_download(site, tmp_path):
+    dest = str(tmp_path / "concrete.csv")
+    with pytest.raises(ValueError, match="SHA-256"):
+        downloader.download_file(site["url"], dest, "0" * 64)
+    assert not os.path.exists(dest)
+    assert not os.path.exists(dest + ".part")
+    assert not os.path.exists(dest + ".part.json")
+
+
+def test_parallel_ranges_request_identity_encoding(site, tmp_path, monkeypatch):
+    monkeypatch.setattr(downloader, "PARALLEL_MIN_BYTES", 1)
+    dest = str(tmp_path / "concrete.csv")
+    assert downloader.download_file(site["url"], dest, workers=4)
+    assert read(dest) == DATA
+
+    methods = [method for method, _ in site["requests"]]
+    assert methods == ["HEAD"] + ["GET"] * 4
+    assert all(headers["Accept-Encoding"] == "identity" for _, headers in site["requests"])
+    assert all("Range" in headers for method, headers in site["requests"] if method == "GET")
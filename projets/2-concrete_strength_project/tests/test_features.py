@@ -0,0 +1,32 @@
+# tests/test_features.py
+
+import numpy as np
+import pandas as pd
+
+from src.features import (
+    BASE_FEATURES, MAX_FINE_TO_COARSE_RATIO, MAX_WATER_CEMENT_RATIO, add_derived_features, build_feature_matrix,
+)
+
+# cement, slag, fly_ash, water, superplasticizer, coarse_aggregate, fine_aggregate, age
+MIXES = np.array([
+    [300.0, 0, 0, 150, 0, 1000, 800, 28],     # mélange valide
+    [-300.0, 0, 0, 150, 0, -1000, 800, 28],   # dénominateurs négatifs
+    [0.0, 0, 0, 0, 0, 0, 0, 28],              # 0 / 0
+    [np.nan, 0, 0, 150, 0, np.nan, 800, 28],  # valeurs manquantes
+])
+
+
+def test_non_positive_denominators_give_the_ratio_cap():
+    X = build_feature_matrix(MIXES)
+    wcr, f2c = X[:, len(BASE_FEATURES)], X[:, -1]
+
+    np.testing.assert_allclose(wcr[:3], [0.5, MAX_WATER_CEMENT_RATIO, MAX_WATER_CEMENT_RATIO])
+    np.testing.assert_allclose(f2c[:3], [0.8, MAX_FINE_TO_COARSE_RATIO, MAX_FINE_TO_COARSE_RATIO])
+    assert np.isnan(wcr[3]) and np.isnan(f2c[3])
+    # Features de base inchangées
+    np.testing.assert_array_equal(X[:, :len(BASE_FEATURES)], MIXES)
+
+
+def test_dataframe_and_matrix_paths_agree():
+    df = add_derived_features(pd.DataFrame(MIXES, columns=BASE_FEATURES))
+    np.testing.assert_array_equal(df.to_numpy(), build_feature_matrix(MIXES))
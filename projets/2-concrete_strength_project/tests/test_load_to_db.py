@@ -0,0 +1,136 @@
+# tests/test_load_to_db.py
+
+import importlib
+import uuid
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("psycopg2")
+pytest.importorskip("dotenv")
+
+loader = importlib.import_module("src.etl.3-load_to_db")
+
+
+def make_frame(n_rows=20, seed=0):
+    """
+    Lignes aux valeurs entières (sauf `strength`, et `age` sur la dernière ligne) : écrit par `write_csv` puis
+    lu par petits blocs, `age` est inféré int64 dans les premiers blocs et float64 dans le dernier.
+    """
+
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({col: rng.integers(1, 500, n_rows) for col in loader.COLUMNS})
+    df["strength"] = rng.uniform(2, 80, n_rows).round(2)
+    df["age"] = df["age"].astype(float)
+    df.loc[n_rows - 1, "age"] = 28.5
+    return df
+
+
+def write_csv(df, path):
+    # '%g' écrit 123.0 sous la forme 123 : seul le bloc contenant 28.5 est lu en float64
+    df.to_csv(path, index=False, float_format="%g")
+
+
+def decode_binary(data: bytes) -> pd.DataFrame:
+    assert data.startswith(loader.BINARY_HEADER)
+    assert data.endswith(loader.BINARY_TRAILER)
+    body = data[len(loader.BINARY_HEADER):-len(loader.BINARY_TRAILER)]
+    n_fields = len(loader.COLUMNS) + 1
+    fields = [("fields", ">i2")]
+    for i in range(len(loader.COLUMNS)):
+        fields += [(f"len{i}", ">i4"), (f"value{i}", ">f4")]
+    fields += [("hash_len", ">i4"), ("hash", ">i8")]
+    rows = np.frombuffer(body, dtype=fields)
+    assert (rows["fields"] == n_fields).all()
+    assert all((rows[f"len{i}"] == 4).all() for i in range(len(loader.COLUMNS)))
+    assert (rows["hash_len"] == 8).all()
+    df = pd.DataFrame({col: rows[f"value{i}"].astype(np.float32) for i, col in enumerate(loader.COLUMNS)})
+    df["row_hash"] = rows["hash"].astype(np.int64)
+    return df
+
+
+def test_hash_does_not_depend_on_inferred_dtypes():
+    df = make_frame()
+    as_float = df.astype(np.float64)
+    # Premier bloc lu seul : colonnes entières inférées int64
+    as_int = df.iloc[:5].astype({col: np.int64 for col in loader.COLUMNS if col != "strength"})
+    np.testing.assert_array_equal(loader.row_hashes(df), loader.row_hashes(as_float))
+    np.testing.assert_array_equal(loader.row_hashes(as_int), loader.row_hashes(as_float.iloc[:5]))
+
+
+def test_csv_and_binary_encoders_carry_the_same_rows():
+    df = make_frame()
+    expected = df[loader.COLUMNS].astype(np.float32)
+
+    binary = decode_binary(loader.encode_chunk(df, "binary").getvalue())
+    csv = pd.read_csv(loader.encode_chunk(df, "csv"), header=None, names=[*loader.COLUMNS, "row_hash"])
+
+    for decoded in (binary, csv):
+        assert len(decoded) == len(df)
+        np.testing.assert_array_equal(decoded[loader.COLUMNS].astype(np.float32).to_numpy(), expected.to_numpy())
+        np.testing.assert_array_equal(decoded["row_hash"].to_numpy(), loader.row_hashes(df))
+
+
+@pytest.fixture
+def table():
+    """
+    Table de test dans la base décrite par PG_HOST, PG_USER, ... (test sauté si elle est injoignable).
+    """
+
+    if not loader.DB_PARAMS["host"]:
+        pytest.skip("PG_HOST non défini")
+    try:
+        conn = loader.psycopg2.connect(**loader.DB_PARAMS)
+    except loader.psycopg2.OperationalError as e:
+        pytest.skip(f"PostgreSQL injoignable : {e}")
+    name = f"test_concrete_{uuid.uuid4().hex[:8]}"
+    yield conn, name
+    conn.rollback()
+    with conn.cursor() as cur:
+        cur.execute(f"DROP TABLE IF EXISTS {name}")
+    conn.commit()
+    conn.close()
+
+
+def count_rows(conn, name):
+    with conn.cursor() as cur:
+        cur.execute(f"SELECT count(*), count(row_hash) FROM {name}")
+        return cur.fetchone()
+
+
+@pytest.mark.parametrize("fmt", loader.FORMATS)
+def test_upsert_twice_with_different_chunk_rows_adds_nothing(table, tmp_path, fmt):
+    conn, name = table
+    path = tmp_path / "clean.csv"
+    write_csv(make_frame(50), path)
+
+    first = loader.load_to_postgres_copy(str(path), name, "upsert", fmt, workers=1, chunk_rows=1000)
+    second = loader.load_to_postgres_copy(str(path), name, "upsert", fmt, workers=2, chunk_rows=7)
+    other = loader.load_to_postgres_copy(str(path), name, "upsert", loader.FORMATS[fmt == "csv"], chunk_rows=13)
+
+    assert first["inserted"] == 50
+    assert second["inserted"] == other["inserted"] == 0
+    assert count_rows(conn, name) == (50, 50)
+
+
+def test_upsert_backfills_rows_loaded_before_row_hash(table, tmp_path):
+    conn, name = table
+    df = make_frame(30)
+    path = tmp_path / "clean.csv"
+    write_csv(df, path)
+
+    # Table d'une version précédente : pas de colonne row_hash, une ligne en double
+    legacy = pd.concat([df.iloc[:20], df.iloc[[3]]])
+    with conn.cursor() as cur:
+        cur.execute(f"CREATE TABLE {name} (id SERIAL PRIMARY KEY, {', '.join(f'{col} REAL' for col in loader.COLUMNS)})")
+        cur.executemany(
+            f"INSERT INTO {name} ({', '.join(loader.COLUMNS)}) VALUES ({', '.join(['%s'] * len(loader.COLUMNS))})",
+            legacy[loader.COLUMNS].astype(float).values.tolist(),
+        )
+    conn.commit()
+
+    report = loader.load_to_postgres_copy(str(path), name, "upsert", "binary", chunk_rows=8)
+
+    assert report["inserted"] == 10
+    assert count_rows(conn, name) == (30, 30)
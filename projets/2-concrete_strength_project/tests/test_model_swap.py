@@ -0,0 +1,63 @@
+# tests/test_model_swap.py
+
+import os
+
+import joblib
+import numpy as np
+from sklearn.dummy import DummyRegressor
+
+from src.api.executor import InferenceExecutor
+from src.api.registry import ModelRegistry
+
+X = np.zeros((3, 8))
+
+
+def constant_model(value):
+    return DummyRegressor(strategy="constant", constant=value).fit(X, [value] * 3)
+
+
+def test_in_flight_request_finishes_on_its_version_after_swap(tmp_path):
+    path = tmp_path / "best_model.joblib"
+    joblib.dump(constant_model(1.0), path)
+    registry = ModelRegistry(models_dir=str(tmp_path), engine="sklearn", idle_ttl=0)
+    registry.load("best_model", activate=True)
+
+    # Worker démarré sans préchargement : il ne charge l'ancienne version qu'à la première requête
+    executor = InferenceExecutor("process", workers=1)
+    executor.start()
+    try:
+        old = registry.checkout()
+        # Bascule à chaud : l'artefact est remplacé sur disque pendant que `old` est en cours
+        joblib.dump(constant_model(2.0), path)
+        registry.reload_if_changed()
+        assert registry.active.fingerprint != old.fingerprint
+
+        assert executor.predict_sync(old, X).tolist() == [1.0] * 3
+        with registry.acquire() as new:
+            assert executor.predict_sync(new, X).tolist() == [2.0] * 3
+
+        # Version retirée et libérée : sa copie figée est supprimée, celle de la version active conservée
+        registry.release(old)
+        assert not os.path.exists(old.artifact)
+        assert os.path.exists(registry.active.artifact)
+    finally:
+        executor.shutdown()
+
+
+def test_worker_started_after_swap_loads_in_flight_version(tmp_path):
+    path = tmp_path / "best_model.joblib"
+    joblib.dump(constant_model(1.0), path)
+    registry = ModelRegistry(models_dir=str(tmp_path), engine="sklearn", idle_ttl=0)
+    registry.load("best_model", activate=True)
+    old = registry.checkout()
+    joblib.dump(constant_model(2.0), path)
+    registry.reload_if_changed()
+
+    executor = InferenceExecutor("process", workers=1)
+    executor.start(preload=registry.active)
+    try:
+        assert executor.predict_sync(old, X).tolist() == [1.0] * 3
+        assert executor.predict_sync(registry.active, X).tolist() == [2.0] * 3
+    finally:
+        registry.release(old)
+        executor.shutdown()
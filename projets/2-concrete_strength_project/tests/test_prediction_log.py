@@ -0,0 +1,174 @@
+# tests/test_prediction_log.py
+
+import time
+
+import numpy as np
+import pytest
+
+from src.api.prediction_log import PredictionLog
+
+psycopg2_pool = pytest.importorskip("psycopg2.pool")
+
+
+class FakeConnection:
+    """
+    Connexion factice : compte les lignes reçues par COPY, échoue tant que le pool le demande.
+    """
+
+    def __init__(self, pool):
+        self.pool = pool
+
+    def cursor(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql):
+        pass
+
+    def copy_expert(self, sql, buffer):
+        if self.pool.failures > 0:
+            self.pool.failures -= 1
+            raise RuntimeError("base indisponible")
+        lines = buffer.read().splitlines()
+        if any(self.pool.poison in line for line in lines):
+            raise ValueError("ligne refusée par COPY")
+        self.pool.copies.append(len(lines))
+        self.pool.rows.extend(lines)
+
+    def commit(self):
+        pass
+
+
+class FakePool:
+    """
+    Remplaçant de ThreadedConnectionPool : une connexion factice par getconn, statistiques partagées.
+    """
+
+    instances = []
+
+    def __init__(self, minconn, maxconn, **params):
+        self.failures = 0
+        # Lots contenant ce texte toujours refusés (échec permanent)
+        self.poison = "poison"
+        self.copies = []
+        self.rows = []
+        self.closed_connections = 0
+        self.closed = False
+        FakePool.instances.append(self)
+
+    def getconn(self):
+        return FakeConnection(self)
+
+    def putconn(self, conn, close=False):
+        self.closed_connections += int(close)
+
+    def closeall(self):
+        self.closed = True
+
+
+@pytest.fixture
+def fake_pool(monkeypatch):
+    FakePool.instances = []
+    monkeypatch.setattr(psycopg2_pool, "ThreadedConnectionPool", FakePool)
+    return FakePool
+
+
+def block(n_rows, start=0):
+    X = np.arange(start * 8, (start + n_rows) * 8, dtype=np.float64).reshape(n_rows, 8)
+    return X, X[:, 0] / 10
+
+
+def wait_until(condition, timeout=10):
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        time.sleep(0.01)
+    assert condition()
+
+
+def test_rows_are_copied_in_batches(fake_pool):
+    log = PredictionLog(enabled=True, db_params={}, batch_rows=10, flush_interval=0.05, max_pending=1000)
+    log.start()
+    for i in range(5):
+        log.log("/predict", "v1", *block(5, start=i * 5))
+    wait_until(lambda: log.stats()["written_rows"] == 25)
+    log.stop(10)
+
+    pool = fake_pool.instances[0]
+    assert sum(pool.copies) == len(pool.rows) == 25
+    assert max(pool.copies) <= 10
+    assert log.stats()["pending_rows"] == 0
+    assert pool.closed
+    # Une ligne par prédiction, dans l'ordre de dépôt
+    assert [float(row.split(",")[3]) for row in pool.rows] == [i * 8.0 for i in range(25)]
+
+
+def test_blocks_are_dropped_when_queue_is_full(fake_pool):
+    log = PredictionLog(enabled=True, db_params={}, batch_rows=100, flush_interval=60, max_pending=10)
+    # Sans thread d'écriture, la file ne se vide pas : les blocs au-delà de la borne sont rejetés
+    for i in range(4):
+        log.log("/predict", "v1", *block(4, start=i * 4))
+    stats = log.stats()
+    assert stats["logged_rows"] == 8
+    assert stats["dropped_rows"] == 8
+    assert stats["pending_rows"] == 8
+
+    log.start()
+    log.stop(10)
+    assert log.stats()["written_rows"] == 8
+    assert len(fake_pool.instances[0].rows) == 8
+
+
+def test_pending_rows_are_flushed_on_stop(fake_pool):
+    # Ni le seuil de taille ni le délai ne sont atteints : seul l'arrêt déclenche l'écriture
+    log = PredictionLog(enabled=True, db_params={}, batch_rows=1000, flush_interval=60, max_pending=10_000)
+    log.start()
+    log.log("/predict", "v1", *block(3))
+    log.log("/predict/batch", "v1", *block(4, start=3))
+    assert log.stats()["written_rows"] == 0
+
+    start = time.time()
+    log.stop(10)
+    assert time.time() - start < 5
+    pool = fake_pool.instances[0]
+    assert log.stats()["written_rows"] == len(pool.rows) == 7
+    assert log.stats()["pending_rows"] == 0
+
+
+def test_failed_batch_is_retried_without_loss_or_duplicates(fake_pool):
+    log = PredictionLog(enabled=True, db_params={}, batch_rows=5, flush_interval=0.02, max_pending=1000)
+    log.start()
+    pool = fake_pool.instances[0]
+    pool.failures = 2
+    log.log("/predict", "v1", *block(5))
+    wait_until(lambda: log.stats()["written_rows"] == 5)
+    log.stop(10)
+
+    stats = log.stats()
+    assert stats["failed_flushes"] == 2
+    assert pool.closed_connections == 2
+    assert len(pool.rows) == 5
+    assert stats["pending_rows"] == 0
+
+
+def test_permanently_failing_batch_is_dropped_and_later_batches_are_written(fake_pool):
+    log = PredictionLog(enabled=True, db_params={}, batch_rows=5, flush_interval=0.01, max_pending=1000,
+                        max_attempts=3)
+    log.start()
+    pool = fake_pool.instances[0]
+    log.log("/predict", "poison", *block(5))
+    for i in range(1, 4):
+        log.log("/predict", "v1", *block(5, start=i * 5))
+    wait_until(lambda: log.stats()["written_rows"] == 15)
+    log.stop(10)
+
+    stats = log.stats()
+    assert stats["failed_flushes"] == 3
+    assert stats["dropped_rows"] == 5
+    assert stats["pending_rows"] == 0
+    assert len(pool.rows) == 15
+    assert not any("poison" in row for row in pool.rows)
@@ -0,0 +1,25 @@
+# tests/test_search.py
+
+import numpy as np
+
+from src.ml.search import successive_halving
+
+FAMILIES = {
+    "RandomForest": {"grid": {"max_depth": [2, 4, None]}, "max_resource": 9},
+    "XGBoost": {"grid": {"max_depth": [2, 3, 4]}, "max_resource": 9},
+}
+
+
+def test_expired_budget_still_evaluates_first_rung_of_every_family():
+    rng = np.random.default_rng(0)
+    X = rng.uniform(size=(90, 4))
+    y = X @ np.array([3.0, -1.0, 2.0, 0.5]) + rng.normal(scale=0.1, size=90)
+
+    results = successive_halving(X, y, FAMILIES, budget_s=0, n_jobs=2)
+
+    assert set(results) == set(FAMILIES)
+    for info in results.values():
+        # Budget écoulé dès le départ : seul le premier palier (3 candidats) est évalué
+        assert [entry["rung"] for entry in info["log"]] == [0, 0, 0]
+        assert info["best_params"]["n_estimators"] == 3
+        assert np.isfinite(info["model"].predict(X)).all()
@@ -0,0 +1,18 @@
+# tests/test_storage.py
+
+import pandas as pd
+import pytest
+
+from src.storage import read_table, write_table
+
+pytest.importorskip("pyarrow")
+
+
+@pytest.mark.parametrize("extension", [".csv", ".parquet", ".arrow"])
+def test_missing_columns_raise_key_error(tmp_path, extension):
+    path = str(tmp_path / f"data{extension}")
+    write_table(pd.DataFrame({"cement": [1.0, 2.0], "strength": [3.0, 4.0]}), path)
+
+    assert read_table(path, columns=["strength", "cement"]).columns.tolist() == ["strength", "cement"]
+    with pytest.raises(KeyError, match="water"):
+        read_table(path, columns=["cement", "water"])
@@ -0,0 +1,33 @@
+# tests/test_worker_memory.py
+
+import os
+
+import numpy as np
+import pytest
+
+from src.api.model_loader import load_mapped_model
+from src.benchmarks.worker_memory import FEATURE_RANGES, measure_mode, train_synthetic_forest
+from src.features import BASE_FEATURES, build_feature_matrix
+
+pytestmark = pytest.mark.skipif(
+    not os.path.exists("/proc/self/smaps_rollup"), reason="Mesure PSS indisponible (/proc/self/smaps_rollup requis)"
+)
+
+N_WORKERS = 3
+
+
+def test_mmap_workers_share_model_pages(tmp_path):
+    model_path = str(tmp_path / "forest.joblib")
+    mmap_dir = str(tmp_path / "mmap")
+    train_synthetic_forest(100, model_path, n_rows=3000)
+    load_mapped_model(model_path, mmap_dir)
+
+    rng = np.random.default_rng(0)
+    X = build_feature_matrix(np.column_stack([rng.uniform(*FEATURE_RANGES[name], 200) for name in BASE_FEATURES]))
+    model_pss = {
+        mode: np.mean([sample["model_pss"] for sample in measure_mode(mode, model_path, mmap_dir, X, N_WORKERS)])
+        for mode in ("native", "mmap")
+    }
+
+    # Pages du modèle partagées entre les workers : chacun n'en compte qu'une fraction dans sa PSS
+    assert model_pss["mmap"] < 0.75 * model_pss["native"], model_pss